@@ -1,14 +1,25 @@
-from flask import Flask, render_template, send_from_directory, jsonify, request
+import eventlet
+eventlet.monkey_patch()
+
+from flask import Flask, send_from_directory, jsonify, request
 from flask_socketio import SocketIO, emit
 from flask_cors import CORS
 import os
+import time
+import signal
 import logging
 from datetime import datetime
 from werkzeug.middleware.proxy_fix import ProxyFix
 
 from auth import AuthService
-from game import GameService
+from game import GameService, RESULTS_PAGE_SIZE
 from database import DatabaseService
+from state_store import create_state_store
+from static_assets import StaticAssets
+from metrics import metrics
+from clock import game_clock
+from checkpoint import Checkpoint
+from round_history import RoundHistory
 
 # Logging
 logging.basicConfig(
@@ -49,43 +60,127 @@ socketio = SocketIO(
     engineio_logger=False, 
     path='/wahlplakatgame/socket.io',
     ping_timeout=60,      # ← NEU: Warte 60s auf Pong
-    ping_interval=25      # ← NEU: Sende alle 25s ein Ping
+    ping_interval=25,     # ← NEU: Sende alle 25s ein Ping
+    # Multi-Worker: Emits laufen über eine Message Queue (z.B. zmq+tcp://127.0.0.1:5555+5556)
+    message_queue=os.environ.get('SOCKETIO_MESSAGE_QUEUE') or None
 )
 
+# Frontend einmalig hashen und vorkomprimieren
+static_assets = StaticAssets(FRONTEND_DIR).build()
+
 # Services initialisieren
+state_store = create_state_store()
 db_service = DatabaseService()
-auth_service = AuthService(db_service)
-game_service = GameService(db_service, socketio)
+if state_store.shared:
+    # Multi-Worker: jeder Prozess bekommt ein eigenes Punkte-Journal
+    db_service.score_journal.use_per_process_file()
+
+# Runden-Ledger mit Auswertungen pro Wahlspruch und Partei
+round_history = RoundHistory(state_store=state_store)
+if state_store.shared:
+    round_history.use_worker_file()
+
+# Warmstart (nur mit einem Worker): Korpus, Leaderboard, Sessions und Lobbies aus dem letzten Checkpoint
+checkpoint_interval = float(os.environ.get('CHECKPOINT_INTERVAL', 60))
+checkpoint = None
+if checkpoint_interval > 0 and not state_store.shared:
+    checkpoint = Checkpoint()
+    checkpoint.load()
+    checkpoint.register('corpus', db_service.corpus)
+    checkpoint.register('leaderboard', db_service.leaderboard)
+    checkpoint.register('history', round_history)
+db_service.warm_caches()
+# Korpus im Hintergrund mit der DB abgleichen (Importer, Löschungen) - Ziehen bleibt ohne DB-Zugriff
+db_service.corpus.start_interval_refresh(float(os.environ.get('CORPUS_REFRESH_INTERVAL', 60)))
+round_history.load()
+round_history.compact()  # Dateien früherer Prozesse einfalten
+round_history.start_interval_flush(float(os.environ.get('ROUND_HISTORY_FLUSH_INTERVAL', 5)))
+
+# Optional: Punkte zusätzlich periodisch flushen (Standard: einmal pro Runde)
+score_flush_interval = float(os.environ.get('SCORE_FLUSH_INTERVAL', 0))
+if score_flush_interval > 0:
+    db_service.score_journal.start_interval_flush(score_flush_interval)
+
+auth_service = AuthService(db_service, checkpoint=checkpoint, state_store=state_store)
+auth_service.sessions.start_interval_purge(float(os.environ.get('SESSION_PURGE_INTERVAL', 300)))
+game_service = GameService(db_service, socketio, state_store=state_store, checkpoint=checkpoint,
+                           history=round_history)
+game_service.start_heartbeat()
+
+if checkpoint:
+    def _shutdown():
+        """Deploy/Neustart: nach dem letzten Snapshot Punkte und Ledger sichern, dann Server beenden"""
+        db_service.flush_user_points()
+        round_history.flush()
+        logger.info(f"🛑 Checkpoint geschrieben ({checkpoint.last_snapshot_ms} ms) - beende")
+        socketio.stop()
+    
+    checkpoint.start(checkpoint_interval, on_stop=_shutdown)
+    
+    # Im Signal-Handler nur das Flag setzen, den Rest erledigt der Checkpoint-Loop
+    signal.signal(signal.SIGTERM, lambda signum, frame: checkpoint.request_stop())
+
+if state_store.shared:
+    # Punkte aus anderen Workern regelmäßig ins lokale Leaderboard übernehmen
+    db_service.leaderboard.start_interval_reload(float(os.environ.get('LEADERBOARD_RELOAD_INTERVAL', 30)))
 
 # ==================== HTTP ROUTES ====================
 
+def _serve_static(directory: str, filename: str):
+    """Vorbereitetes Asset ausliefern, unbekannte Dateien direkt von der Platte"""
+    asset, immutable = static_assets.get(f"{directory}/{filename}")
+    if asset is None:
+        return send_from_directory(os.path.join(FRONTEND_DIR, directory), filename)
+    return static_assets.respond(asset, request, immutable)
+
 @app.route('/')
 @app.route('/wahlplakatgame')
 @app.route('/wahlplakatgame/')
 def index():
     """Hauptseite"""
-    return render_template('index.html')
+    return static_assets.respond(static_assets.index, request)
 
 @app.route('/css/<path:filename>')
 @app.route('/wahlplakatgame/css/<path:filename>')
 def serve_css(filename):
     """CSS Dateien ausliefern"""
-    css_dir = os.path.join(FRONTEND_DIR, 'css')
-    return send_from_directory(css_dir, filename)
+    return _serve_static('css', filename)
 
 @app.route('/js/<path:filename>')
 @app.route('/wahlplakatgame/js/<path:filename>')
 def serve_js(filename):
     """JavaScript Dateien ausliefern"""
-    js_dir = os.path.join(FRONTEND_DIR, 'js')
-    return send_from_directory(js_dir, filename)
+    return _serve_static('js', filename)
 
 @app.route('/assets/<path:filename>')
 @app.route('/wahlplakatgame/assets/<path:filename>')
 def serve_assets(filename):
     """Assets ausliefern"""
-    assets_dir = os.path.join(FRONTEND_DIR, 'assets')
-    return send_from_directory(assets_dir, filename)
+    return _serve_static('assets', filename)
+
+@app.before_request
+def _start_timer():
+    request.start_time = time.perf_counter()
+
+@app.after_request
+def _record_request(response):
+    """Anzahl und Latenz pro Route (beide URL-Varianten zusammengefasst)"""
+    start = getattr(request, 'start_time', None)
+    if start is not None:
+        rule = request.url_rule.rule if request.url_rule else 'unmatched'
+        if rule.startswith('/wahlplakatgame/'):
+            rule = rule[len('/wahlplakatgame'):]
+        elif rule == '/wahlplakatgame':
+            rule = '/'
+        metrics.inc('http_requests_total', route=rule, method=request.method, status=response.status_code)
+        metrics.observe('http_request_seconds', time.perf_counter() - start, route=rule)
+    return response
+
+@app.route('/metrics')
+@app.route('/wahlplakatgame/metrics')
+def prometheus_metrics():
+    """Metriken im Prometheus-Textformat"""
+    return metrics.render(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
 
 @app.route('/health')
 @app.route('/wahlplakatgame/health')
@@ -94,7 +189,14 @@ def health():
     return jsonify({
         'status': 'ok',
         'timestamp': datetime.now().isoformat(),
-        'players_online': len(game_service.lobby.players)
+        'players_online': game_service.player_count(),
+        'lobbies': game_service.get_stats(),
+        'sessions': auth_service.sessions.get_stats(),
+        'password_hasher': auth_service.hasher.get_stats(),
+        'db_pool': db_service.executor.get_stats(),
+        'wire': game_service.wire.get_stats(),
+        'clock': game_clock.get_stats(),
+        'checkpoint': checkpoint.get_stats() if checkpoint else None
     })
 
 # ==================== AUTH API ====================
@@ -108,6 +210,8 @@ def register():
     password = data.get('password', '')
     
     result = auth_service.register_account(nickname, password)
+    if result.get('busy'):
+        return jsonify(result), 503
     return jsonify(result), 200 if result['success'] else 400
 
 @app.route('/api/auth/login', methods=['POST'])
@@ -120,6 +224,8 @@ def login():
     ip_address = request.remote_addr
     
     result = auth_service.login(nickname, password, ip_address)
+    if result.get('busy'):
+        return jsonify(result), 503
     return jsonify(result), 200 if result['success'] else 400
 
 @app.route('/api/auth/logout', methods=['POST'])
@@ -159,8 +265,23 @@ def check_username():
 def get_parteien():
     """Alle Parteien holen"""
     try:
-        parteien = db_service.get_alle_parteien()
-        return jsonify({'success': True, 'parteien': parteien})
+        index = db_service.get_parteien_index()
+        etag = index['etag']
+        
+        # Client hat bereits den aktuellen Stand -> 304 ohne Body
+        if request.if_none_match.contains(etag):
+            response = app.response_class(status=304)
+        else:
+            response = jsonify({
+                'success': True,
+                'parteien': index['parteien'],
+                'counts': index['counts'],
+                'version': index['version']
+            })
+        
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
     except Exception as e:
         logger.error(f"Fehler beim Holen der Parteien: {e}")
         return jsonify({'success': False, 'message': str(e)}), 500
@@ -171,36 +292,63 @@ def get_leaderboard():
     """Leaderboard holen"""
     limit = request.args.get('limit', 10, type=int)
     try:
-        top_users = db_service.get_top_users(limit=limit)
-        
-        leaderboard = []
-        for i, user in enumerate(top_users, 1):
-            leaderboard.append({
-                'rank': i,
-                'nickname': user.nickname,
-                'points': user.points
-            })
-        
+        leaderboard = db_service.get_leaderboard(limit=limit)
         return jsonify({'success': True, 'leaderboard': leaderboard})
     except Exception as e:
         logger.error(f"Fehler beim Holen des Leaderboards: {e}")
         return jsonify({'success': False, 'message': str(e)}), 500
 
+@app.route('/api/game/stats', methods=['GET'])
+@app.route('/wahlplakatgame/api/game/stats', methods=['GET'])
+def get_stats():
+    """Auswertung aller Runden: Trefferquote, Antwortzeiten und Verwechslungen pro Partei"""
+    return jsonify({'success': True, **round_history.summary()})
+
+@app.route('/api/game/stats/wahlsprueche', methods=['GET'])
+@app.route('/wahlplakatgame/api/game/stats/wahlsprueche', methods=['GET'])
+def get_wahlspruch_stats():
+    """Schwerste (order=hardest) bzw. leichteste (order=easiest) Wahlsprüche"""
+    order = request.args.get('order', 'hardest')
+    limit = max(1, min(request.args.get('limit', 20, type=int), 100))
+    min_answers = request.args.get('min_answers', 5, type=int)
+    if order not in ('hardest', 'easiest'):
+        return jsonify({'success': False, 'message': 'order muss hardest oder easiest sein'}), 400
+    
+    wahlsprueche = round_history.quote_ranking(order, limit, min_answers)
+    for stats in wahlsprueche:
+        entry = db_service.corpus.get(stats['wahlspruch_id'])
+        stats['spruch'] = entry.spruch if entry else None
+    return jsonify({'success': True, 'order': order, 'wahlsprueche': wahlsprueche})
+
+@app.route('/api/game/stats/wahlsprueche/<int:wahlspruch_id>', methods=['GET'])
+@app.route('/wahlplakatgame/api/game/stats/wahlsprueche/<int:wahlspruch_id>', methods=['GET'])
+def get_single_wahlspruch_stats(wahlspruch_id):
+    """Auswertung eines Wahlspruchs"""
+    stats = round_history.quote_stats(wahlspruch_id)
+    if stats is None:
+        return jsonify({'success': False, 'message': 'Noch keine Runden mit diesem Wahlspruch'}), 404
+    entry = db_service.corpus.get(wahlspruch_id)
+    stats['spruch'] = entry.spruch if entry else None
+    return jsonify({'success': True, **stats})
+
 # ==================== SOCKETIO EVENTS ====================
 
 @socketio.on('connect')
+@metrics.track_event('connect')
 def handle_connect():
     """Client verbunden"""
     logger.info(f"Client connected: {request.sid}")
     emit('connected', {'message': 'Verbindung erfolgreich'})
 
 @socketio.on('disconnect')
+@metrics.track_event('disconnect')
 def handle_disconnect():
     """Client getrennt"""
     logger.info(f"Client disconnected: {request.sid}")
     game_service.handle_disconnect(request.sid)
 
 @socketio.on('join_game')
+@metrics.track_event('join_game')
 def handle_join_game(data):
     """Spiel beitreten"""
     try:
@@ -216,7 +364,9 @@ def handle_join_game(data):
             user_id=user_info['user_id'],
             nickname=user_info['nickname'],
             sid=request.sid,
-            points=user_info['points']
+            points=user_info['points'],
+            wire_formats=data.get('wire'),
+            lobby_id=data.get('lobby_id')
         )
         
     except Exception as e:
@@ -224,6 +374,7 @@ def handle_join_game(data):
         emit('error', {'message': str(e)})
 
 @socketio.on('leave_game')
+@metrics.track_event('leave_game')
 def handle_leave_game(data):
     """Spiel verlassen"""
     try:
@@ -234,6 +385,7 @@ def handle_leave_game(data):
         logger.exception(f"Fehler bei leave_game: {e}")
 
 @socketio.on('submit_answer')
+@metrics.track_event('submit_answer')
 def handle_submit_answer(data):
     """Antwort abgeben"""
     try:
@@ -244,21 +396,35 @@ def handle_submit_answer(data):
         logger.exception(f"Fehler bei submit_answer: {e}")
         emit('error', {'message': str(e)})
 
+@socketio.on('request_player_list')
+@metrics.track_event('request_player_list')
+def handle_request_player_list():
+    """Vollständige Spielerliste anfordern (Client hat eine Lücke in den Deltas erkannt)"""
+    try:
+        game_service.send_player_list_snapshot(request.sid)
+    except Exception as e:
+        logger.exception(f"Fehler bei request_player_list: {e}")
+
+@socketio.on('request_round_results')
+@metrics.track_event('request_round_results')
+def handle_request_round_results(data=None):
+    """Vollständige Ergebnistabelle der letzten Runde seitenweise anfordern"""
+    try:
+        data = data or {}
+        game_service.send_round_results(
+            request.sid,
+            page=int(data.get('page', 0)),
+            page_size=int(data.get('page_size', RESULTS_PAGE_SIZE))
+        )
+    except Exception as e:
+        logger.exception(f"Fehler bei request_round_results: {e}")
+
 @socketio.on('request_leaderboard')
+@metrics.track_event('request_leaderboard')
 def handle_request_leaderboard():
     """Leaderboard anfordern"""
     try:
-        top_users = db_service.get_top_users(limit=10)
-        
-        leaderboard = []
-        for i, user in enumerate(top_users, 1):
-            leaderboard.append({
-                'rank': i,
-                'nickname': user.nickname,
-                'points': user.points
-            })
-        
-        emit('leaderboard_update', {'leaderboard': leaderboard})
+        emit('leaderboard_update', game_service.get_leaderboard_snapshot())
     except Exception as e:
         logger.exception(f"Fehler bei request_leaderboard: {e}")
 
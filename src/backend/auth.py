@@ -1,8 +1,12 @@
-import hashlib
+import os
+import time
 import secrets
+import eventlet
 from typing import Dict, Optional
 from datetime import datetime
 import logging
+from session_store import SessionStore
+from passwords import PasswordHasher, HasherBusy
 
 logger = logging.getLogger(__name__)
 
@@ -10,13 +14,68 @@ logger = logging.getLogger(__name__)
 class AuthService:
     """Authentifizierungs-Service für Login und Registrierung"""
     
-    def __init__(self, db_service):
+    def __init__(self, db_service, checkpoint=None, state_store=None):
         self.db_service = db_service
-        self.active_sessions: Dict[str, int] = {}  # token -> user_id
+        self.shared = state_store is not None and state_store.shared
+        if self.shared:
+            # Multi-Worker: Die Sessions liegen in der gemeinsamen DB (users.session_token),
+            # jeder Worker cached sie nur kurz und ohne Verlängerung - Logout und neuer Login
+            # auf einem anderen Worker gelten so spätestens nach SESSION_SHARED_CACHE_TTL
+            self.sessions = SessionStore(
+                ttl=float(os.environ.get('SESSION_SHARED_CACHE_TTL', 30)),
+                sliding=False
+            )
+        else:
+            self.sessions = SessionStore()  # token -> user_id (LRU + TTL)
+        self.hasher = PasswordHasher()
+        self.checkpoint = checkpoint  # Warmstart: Sessions überleben einen Neustart
+        if checkpoint:
+            checkpoint.register('auth', self)
+    
+    # ==================== CHECKPOINT ====================
+    
+    def _log(self, *event):
+        if self.checkpoint:
+            self.checkpoint.append('auth', *event)
+    
+    def export_state(self) -> Dict:
+        return {'saved_at': time.time(), 'sessions': self.sessions.export()}
+    
+    def restore_state(self, state: Optional[Dict], events: list, age: float):
+        """Sessions aus Snapshot + Log übernehmen (Restlaufzeit um die Ausfallzeit gekürzt)"""
+        now = time.time()
+        restored = 0
+        if state:
+            restored = self.sessions.restore(state['sessions'], now - state['saved_at'])
+        for t, (op, *args) in events:
+            if op == 'put':
+                token, user_id = args
+                restored += self.sessions.restore([[token, user_id, self.sessions.ttl]], now - t)
+            elif op == 'revoke_user':
+                self.sessions.revoke_user(args[0])
+        logger.info(f"🔑 {restored} Sessions aus dem Checkpoint übernommen")
     
     def _hash_password(self, password: str) -> str:
-        """Passwort hashen mit SHA-256"""
-        return hashlib.sha256(password.encode('utf-8')).hexdigest()
+        """Passwort hashen (KDF im Thread-Pool, wirft HasherBusy bei Überlast)"""
+        return self.hasher.hash(password)
+    
+    def _busy_response(self) -> Dict:
+        return {
+            "success": False,
+            "busy": True,
+            "message": "Server ausgelastet, bitte versuche es gleich nochmal."
+        }
+    
+    def _rehash_password(self, user_id: int, password: str):
+        """Alten Passwort-Hash durch aktuellen ersetzen (im Hintergrund nach dem Login)"""
+        try:
+            self.db_service.update_user_password(user_id, self._hash_password(password))
+            self.hasher.rehashed += 1
+            logger.info(f"🔐 Passwort-Hash aktualisiert: User ID {user_id}")
+        except HasherBusy:
+            pass  # beim nächsten Login erneut versuchen
+        except Exception as e:
+            logger.exception(f"Fehler beim Neu-Hashen des Passworts: {e}")
     
     def _generate_session_token(self) -> str:
         """Sicheren Session-Token generieren"""
@@ -44,7 +103,10 @@ class AuthService:
                 }
             
             # Passwort hashen
-            hashed_password = self._hash_password(password)
+            try:
+                hashed_password = self._hash_password(password)
+            except HasherBusy:
+                return self._busy_response()
             
             # User erstellen
             success = self.db_service.create_new_user(nickname, hashed_password)
@@ -90,13 +152,20 @@ class AuthService:
             user = user[0]
             
             # Passwort prüfen
-            hashed_password = self._hash_password(password)
-            if user.password != hashed_password:
+            try:
+                valid, needs_rehash = self.hasher.verify(password, user.password)
+            except HasherBusy:
+                return self._busy_response()
+            
+            if not valid:
                 return {
                     "success": False,
                     "message": "Ungültiger Nickname oder Passwort."
                 }
             
+            if needs_rehash:
+                eventlet.spawn(self._rehash_password, user.id, password)
+            
             # Session Token generieren
             token = self._generate_session_token()
             
@@ -104,7 +173,8 @@ class AuthService:
             self.db_service.update_user_session(user.id, token, ip_address)
             
             # Session cachen
-            self.active_sessions[token] = user.id
+            self.sessions.put(token, user.id)
+            self._log('put', token, user.id)
             
             logger.info(f"Login erfolgreich: {nickname} von {ip_address}")
             
@@ -114,7 +184,7 @@ class AuthService:
                 "token": token,
                 "user_id": user.id,
                 "nickname": user.nickname,
-                "points": user.points,
+                "points": self.db_service.get_current_points(user.id, user.points),
                 "last_login_ip": user.last_login_ip,
                 "last_login_time": user.last_login_time.isoformat() if user.last_login_time else None
             }
@@ -142,9 +212,10 @@ class AuthService:
                     "message": "Ungültige Session."
                 }
             
-            # Aus Cache entfernen
-            if token in self.active_sessions:
-                del self.active_sessions[token]
+            # Aus Cache entfernen (der DB-Token gilt für alle Sessions des Users)
+            self.sessions.revoke(token)
+            self.sessions.revoke_user(user_id)
+            self._log('revoke_user', user_id)
             
             # Session Token in DB löschen
             self.db_service.update_user_session(user_id, "", "")
@@ -174,13 +245,25 @@ class AuthService:
             user_id = self._validate_session(token)
             
             if user_id:
+                # Nickname und Punkte aus dem Leaderboard-Index - ein Reconnect kostet so keine DB-Abfrage.
+                # Multi-Worker: Der Index kann bis zu LEADERBOARD_RELOAD_INTERVAL alt sein, wer von einem
+                # anderen Worker kommt, würde mit einem alten Punktestand weiterspielen -> aus der DB
+                entry = None if self.shared else self.db_service.leaderboard.get(user_id)
+                if entry:
+                    return {
+                        "valid": True,
+                        "user_id": entry.id,
+                        "nickname": entry.nickname,
+                        "points": entry.points
+                    }
+                
                 user = self.db_service.get_user_by_id(user_id)
                 if user:
                     return {
                         "valid": True,
                         "user_id": user[0].id,
                         "nickname": user[0].nickname,
-                        "points": user[0].points
+                        "points": self.db_service.get_current_points(user[0].id, user[0].points)
                     }
             
             return {"valid": False}
@@ -232,15 +315,22 @@ class AuthService:
         Returns:
             user_id oder None
         """
-        # Zuerst im Cache schauen
-        if token in self.active_sessions:
-            return self.active_sessions[token]
+        if not token:
+            return None
+        
+        # Zuerst im Cache schauen (auch bekannt ungültige Tokens)
+        cached = self.sessions.lookup(token)
+        if cached is SessionStore.INVALID:
+            return None
+        if cached is not None:
+            return cached
         
         # Sonst in DB prüfen
         user = self.db_service.get_user_by_session_token(token)
         if user:
             user_id = user[0].id
-            self.active_sessions[token] = user_id
+            self.sessions.put(token, user_id)
             return user_id
         
+        self.sessions.put_invalid(token)
         return None
@@ -0,0 +1,86 @@
+import os
+import threading
+import logging
+from typing import List, Tuple
+from clock import game_clock
+
+logger = logging.getLogger(__name__)
+
+
+class LobbyBroadcaster:
+    """
+    Ausgehender Scheduler pro Lobby
+
+    Nicht dringende Events (player_answered, player_list_delta, ...) werden
+    gepuffert und pro Tick als eine einzige 'lobby_batch' Nachricht gesendet.
+    Dringende Events (new_round, round_end) leeren zuerst den Puffer und gehen
+    dann sofort raus, damit die Reihenfolge erhalten bleibt.
+    """
+
+    def __init__(self, socketio, room: str, tick: float = None, wire=None):
+        self.socketio = socketio
+        self.room = room
+        self.wire = wire  # WireFormat: große Events pro Format kodieren
+        self.tick = tick if tick is not None else float(os.environ.get('BROADCAST_TICK_MS', 100)) / 1000.0
+        self.buffer: List[Tuple[str, dict]] = []
+        self.flush_timer = None
+        self.lock = threading.Lock()
+
+        # Statistik
+        self.events_queued = 0
+        self.sends = 0
+
+    def queue(self, event: str, payload: dict):
+        """Event puffern und spätestens nach einem Tick senden"""
+        if self.tick <= 0:
+            self._emit(event, payload)
+            return
+
+        with self.lock:
+            self.events_queued += 1
+            # Aufeinanderfolgende Deltas zu einem Event zusammenfassen
+            if event == 'player_list_delta' and self.buffer and self.buffer[-1][0] == event:
+                self.buffer[-1][1]['deltas'].extend(payload['deltas'])
+            else:
+                self.buffer.append((event, payload))
+
+            if self.flush_timer is None:
+                self.flush_timer = game_clock.schedule(self.tick, self.flush, name='broadcast')
+
+    def send_now(self, event: str, payload: dict):
+        """Dringendes Event: Puffer leeren, dann sofort senden"""
+        self.flush()
+        self._emit(event, payload)
+
+    def flush(self):
+        """Gepufferte Events als eine Nachricht senden"""
+        with self.lock:
+            if self.flush_timer is not None:
+                self.flush_timer.cancel()
+                self.flush_timer = None
+            events = self.buffer
+            self.buffer = []
+
+        if not events:
+            return
+        if len(events) == 1:
+            self._emit(*events[0])
+        else:
+            self._emit('lobby_batch', {'events': [[event, payload] for event, payload in events]})
+
+    def _emit(self, event: str, payload: dict):
+        self.sends += 1
+        if self.wire is not None:
+            self.wire.emit_to_room(event, payload, self.room)
+        else:
+            self.socketio.emit(event, payload, room=self.room)
+
+    def close(self):
+        """Offene Events senden und Timer stoppen"""
+        self.flush()
+
+    def get_stats(self) -> dict:
+        return {
+            'events_queued': self.events_queued,
+            'sends': self.sends
+        }
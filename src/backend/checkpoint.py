@@ -0,0 +1,269 @@
+import os
+import json
+import time
+import threading
+import logging
+from typing import Dict, List, Optional
+import eventlet
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+
+class Checkpoint:
+    """
+    Snapshot-Datei + Append-Only Event-Log für einen schnellen Warmstart
+
+    Services melden sich mit register(name, service) an. Der Snapshot enthält pro
+    Service einen Abschnitt (service.export_state()), dazwischen hängen die Services
+    kleine Events an das Log an (append). Beim Start liest load() den letzten
+    Snapshot und das Log, register() spielt beides sofort über
+    service.restore_state(state, events, age) ein - ohne DB-Zugriff.
+
+    Events tragen absolute Werte (Punktestand, Rundennummer, ...), doppelt
+    nachgespielte Events schaden daher nicht. Das macht das Schreiben des
+    Snapshots einfach: seq merken, Log rotieren, Abschnitte einsammeln, Datei
+    atomar ersetzen. Events, die währenddessen entstehen, landen im neuen Log.
+
+    Services mit einem Attribut version (bei jeder Änderung erhöht, z.B. Korpus
+    und Leaderboard) werden nur neu exportiert und serialisiert, wenn sich die
+    Version seit dem letzten Snapshot geändert hat - sonst wird der fertige
+    JSON-Abschnitt übernommen.
+
+    Dateien (JSON, ohne Leerzeichen):
+        checkpoint.snapshot   {"v": 1, "seq": 41, "written_at": 1700000000.0, "sections": {"auth": ..., ...}}
+        checkpoint.log        {"seq": 42, "t": 1700000001.5, "s": "auth", "e": ["put", "token", 7]}
+        checkpoint.log.old    Log der vorherigen Generation, bis der neue Snapshot geschrieben ist
+    """
+
+    def __init__(self, path: str = None):
+        path = path or os.environ.get('CHECKPOINT_PATH', 'checkpoint')
+        self.snapshot_path = f"{path}.snapshot"
+        self.log_path = f"{path}.log"
+        self.old_log_path = f"{path}.log.old"
+        self.services: Dict[str, object] = {}
+        self.section_cache: Dict[str, tuple] = {}  # name -> (version, json), nur für Services mit version
+        self.stop_requested = False  # vom Signal-Handler gesetzt, der Checkpoint-Loop fährt herunter
+        self.closed = False  # nach dem letzten Snapshot: keine Events mehr
+        self.seq = 0
+        self.file = None
+        self.lock = threading.Lock()
+        self.snapshot_lock = threading.Lock()
+
+        # Geladener Stand (bis alle Services ihn übernommen haben)
+        self.sections: Dict[str, dict] = {}
+        self.events: Dict[str, List[tuple]] = {}  # abschnitt -> [(t, event), ...]
+        self.last_activity = None  # Zeitpunkt des letzten Snapshots/Events (time.time)
+
+        # Statistik
+        self.appended = 0
+        self.snapshots = 0
+        self.sections_reused = 0
+        self.last_snapshot_ms = None
+        self.last_snapshot_bytes = None
+        self.restore_ms = None
+
+    # ==================== LADEN / EINSPIELEN ====================
+
+    def load(self):
+        """Letzten Snapshot und das Log danach lesen (nur beim Start)"""
+        start = time.perf_counter()
+        snapshot_seq = 0
+        if os.path.exists(self.snapshot_path):
+            try:
+                with open(self.snapshot_path, 'r', encoding='utf-8') as file:
+                    snapshot = json.load(file)
+                if snapshot.get('v') == SNAPSHOT_VERSION:
+                    snapshot_seq = snapshot['seq']
+                    self.sections = snapshot['sections']
+                    self.last_activity = snapshot['written_at']
+                else:
+                    logger.warning(f"⚠️  Checkpoint-Snapshot mit alter Version {snapshot.get('v')} ignoriert")
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"⚠️  Checkpoint-Snapshot nicht lesbar, starte ohne: {e}")
+
+        self.seq = snapshot_seq
+        replayed = 0
+        for path in (self.old_log_path, self.log_path):
+            if not os.path.exists(path):
+                continue
+            with open(path, 'r', encoding='utf-8') as file:
+                for line in file:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        logger.warning("⚠️  Unvollständige Zeile im Checkpoint-Log ignoriert")
+                        continue
+                    self.seq = max(self.seq, entry['seq'])
+                    if entry['seq'] <= snapshot_seq:
+                        continue  # steckt schon im Snapshot
+                    self.events.setdefault(entry['s'], []).append((entry['t'], entry['e']))
+                    self.last_activity = max(self.last_activity or 0, entry['t'])
+                    replayed += 1
+
+        self.restore_ms = round((time.perf_counter() - start) * 1000, 3)
+        if self.sections or replayed:
+            logger.info(f"♻️  Checkpoint geladen: {len(self.sections)} Abschnitte, {replayed} Events "
+                        f"({self.restore_ms} ms)")
+
+    def age(self) -> Optional[float]:
+        """Sekunden seit dem letzten gesicherten Zustand (None ohne Checkpoint)"""
+        return time.time() - self.last_activity if self.last_activity else None
+
+    def register(self, name: str, service):
+        """Service anmelden und sofort aus dem geladenen Stand wiederherstellen"""
+        self.services[name] = service
+        state = self.sections.pop(name, None)
+        events = self.events.pop(name, [])
+        if state is None and not events:
+            return
+        start = time.perf_counter()
+        try:
+            service.restore_state(state, events, self.age())
+        except Exception as e:
+            logger.exception(f"Fehler beim Wiederherstellen von '{name}' aus dem Checkpoint: {e}")
+            return
+        logger.info(f"♻️  {name} wiederhergestellt ({(time.perf_counter() - start) * 1000:.1f} ms)")
+
+    # ==================== SCHREIBEN ====================
+
+    def _open(self):
+        if self.file is None:
+            self.file = open(self.log_path, 'a', encoding='utf-8')
+
+    def append(self, section: str, *event):
+        """Event an das Log anhängen (gepuffert, flush() bzw. der Hintergrund-Loop schreibt es raus)"""
+        with self.lock:
+            if self.closed:
+                return
+            self._open()
+            self.seq += 1
+            self.file.write(json.dumps(
+                {'seq': self.seq, 't': round(time.time(), 3), 's': section, 'e': event},
+                separators=(',', ':'), default=str
+            ) + "\n")
+            self.appended += 1
+
+    def flush(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.flush()
+
+    def close(self):
+        """
+        Log schließen, alle weiteren Events verwerfen
+
+        Nach dem letzten Snapshot beim Herunterfahren: Beim Beenden des Servers
+        werden alle Clients getrennt - deren 'leave'/'close' Events würden die
+        Lobbies sonst beim nächsten Start wieder leeren.
+        """
+        with self.lock:
+            self.closed = True
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+    def _rotate(self) -> int:
+        """Aktuelles Log zur alten Generation machen -> seq bis einschließlich dort"""
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+            if os.path.exists(self.log_path):
+                if os.path.exists(self.old_log_path):
+                    # Letzter Snapshot ist gescheitert: beide Generationen behalten
+                    with open(self.log_path, 'r', encoding='utf-8') as src, \
+                            open(self.old_log_path, 'a', encoding='utf-8') as dst:
+                        dst.write(src.read())
+                    os.remove(self.log_path)
+                else:
+                    os.replace(self.log_path, self.old_log_path)
+            return self.seq
+
+    def _section(self, name: str, service) -> str:
+        """Abschnitt als JSON - bei unveränderter version aus dem letzten Snapshot"""
+        version = getattr(service, 'version', None)
+        cached = self.section_cache.get(name)
+        if version is not None and cached is not None and cached[0] == version:
+            self.sections_reused += 1
+            return cached[1]
+        # Version vor dem Export lesen: spätere Änderungen lösen beim nächsten Mal einen Export aus
+        data = json.dumps(service.export_state(), separators=(',', ':'), default=str)
+        if version is not None:
+            self.section_cache[name] = (version, data)
+        return data
+
+    def write_snapshot(self) -> bool:
+        """Alle Abschnitte einsammeln und den Snapshot atomar ersetzen"""
+        with self.snapshot_lock:
+            start = time.perf_counter()
+            seq = self._rotate()
+            try:
+                sections = ",".join(
+                    f"{json.dumps(name)}:{self._section(name, service)}"
+                    for name, service in self.services.items()
+                )
+                header = json.dumps({'v': SNAPSHOT_VERSION, 'seq': seq, 'written_at': time.time()},
+                                    separators=(',', ':'))
+                data = f'{header[:-1]},"sections":{{{sections}}}}}'
+                tmp_path = f"{self.snapshot_path}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as file:
+                    file.write(data)
+                    file.flush()
+                    os.fsync(file.fileno())
+                os.replace(tmp_path, self.snapshot_path)
+            except Exception as e:
+                logger.exception(f"Fehler beim Schreiben des Checkpoints: {e}")
+                return False
+            if os.path.exists(self.old_log_path):
+                os.remove(self.old_log_path)
+
+            self.snapshots += 1
+            self.last_snapshot_ms = round((time.perf_counter() - start) * 1000, 3)
+            self.last_snapshot_bytes = len(data)
+            return True
+
+    def request_stop(self):
+        """Herunterfahren anfordern - nur ein Flag, sicher aus einem Signal-Handler"""
+        self.stop_requested = True
+
+    def start(self, interval: float, flush_interval: float = 1.0, on_stop=None):
+        """
+        Log regelmäßig rausschreiben und alle interval Sekunden einen Snapshot anlegen
+
+        Nach request_stop() schreibt der Loop einen letzten Snapshot, schließt das
+        Log, ruft on_stop() auf (z.B. Punkte sichern und den Server beenden) und endet.
+        """
+        def _loop():
+            since_snapshot = 0.0
+            while True:
+                eventlet.sleep(flush_interval)
+                since_snapshot += flush_interval
+                if self.stop_requested:
+                    self.write_snapshot()
+                    self.close()
+                    if on_stop:
+                        on_stop()
+                    return
+                try:
+                    if since_snapshot >= interval:
+                        since_snapshot = 0.0
+                        self.write_snapshot()
+                    else:
+                        self.flush()
+                except Exception as e:
+                    logger.exception(f"Fehler im Checkpoint-Loop: {e}")
+
+        return eventlet.spawn(_loop)
+
+    def get_stats(self) -> dict:
+        return {
+            'seq': self.seq,
+            'appended': self.appended,
+            'snapshots': self.snapshots,
+            'sections_reused': self.sections_reused,
+            'last_snapshot_ms': self.last_snapshot_ms,
+            'last_snapshot_bytes': self.last_snapshot_bytes,
+            'restore_ms': self.restore_ms
+        }
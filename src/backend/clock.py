@@ -0,0 +1,326 @@
+import os
+import time
+import logging
+import threading
+from typing import Dict, List
+import eventlet
+from eventlet import event
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Aufbau des Rads: 256 Slots à einem Tick, darüber 3 Stufen mit je 64 Slots.
+# Bei 10 ms pro Tick reicht das bis ~7,7 Tage, spätere Fristen werden beim
+# Herunterreichen erneut einsortiert.
+ROOT_BITS = 8
+LEVEL_BITS = 6
+LEVELS = 3
+ROOT_SIZE = 1 << ROOT_BITS
+LEVEL_SIZE = 1 << LEVEL_BITS
+ROOT_MASK = ROOT_SIZE - 1
+LEVEL_MASK = LEVEL_SIZE - 1
+MAX_TICKS = (1 << (ROOT_BITS + LEVELS * LEVEL_BITS)) - 1
+
+
+class ClockStats:
+    """Gemeinsame Statistik beider Spieluhren (geplant, abgebrochen, ausgelöst, Verspätung)"""
+
+    def __init__(self):
+        self.pending = 0
+        self.scheduled = 0
+        self.cancelled = 0
+        self.fired = 0
+        self.lateness: Dict[str, List[float]] = {}  # name -> [anzahl, summe, max]
+
+    def _record_lateness(self, name: str, lateness: float):
+        lateness = max(0.0, lateness)
+        metrics.observe('timer_lateness_seconds', lateness, timer=name)
+        entry = self.lateness.get(name)
+        if entry is None:
+            entry = self.lateness[name] = [0, 0.0, 0.0]
+        entry[0] += 1
+        entry[1] += lateness
+        entry[2] = max(entry[2], lateness)
+
+    def get_stats(self) -> dict:
+        return {
+            'pending': self.pending,
+            'scheduled': self.scheduled,
+            'cancelled': self.cancelled,
+            'fired': self.fired,
+            'lateness_ms': {
+                name: {
+                    'mean': round(total / count * 1000, 3),
+                    'max': round(worst * 1000, 3)
+                }
+                for name, (count, total, worst) in self.lateness.items()
+            }
+        }
+
+
+class EventletTimer:
+    """Geplanter Aufruf der EventletClock (ein spawn_after-Greenlet)"""
+
+    __slots__ = ('clock', 'thread', 'done')
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.thread = None
+        self.done = False  # ausgelöst oder abgebrochen
+
+    def cancel(self):
+        self.clock.cancel(self)
+
+
+class EventletClock(ClockStats):
+    """
+    Spieluhr über eventlet.spawn_after (Standard)
+
+    Jede Frist ist ein eigener Timer im Eventlet-Hub, der genau zur Frist
+    aufwacht. Das ist pro Timer teurer als das TimerWheel, feuert aber
+    pünktlicher - siehe benchmarks/bench_clock.py.
+    """
+
+    def schedule(self, delay: float, func, *args, name: str = 'timer') -> EventletTimer:
+        """func(*args) nach delay Sekunden aufrufen (name: Label für die Statistik)"""
+        delay = max(0.0, delay)
+        timer = EventletTimer(self)
+        timer.thread = eventlet.spawn_after(delay, self._fire, timer, time.monotonic() + delay, name, func, args)
+        self.pending += 1
+        self.scheduled += 1
+        return timer
+
+    def cancel(self, timer: EventletTimer):
+        """Timer abbrechen; ist er schon fällig, wird der Callback nicht mehr ausgeführt"""
+        if timer.done:
+            return
+        timer.done = True
+        timer.thread.cancel()
+        self.pending -= 1
+        self.cancelled += 1
+
+    def _fire(self, timer: EventletTimer, deadline: float, name: str, func, args: tuple):
+        if timer.done:
+            return
+        timer.done = True
+        self.pending -= 1
+        self.fired += 1
+        self._record_lateness(name, time.monotonic() - deadline)
+        try:
+            func(*args)
+        except Exception as e:
+            logger.exception(f"Fehler im Timer '{name}': {e}")
+
+    def get_stats(self) -> dict:
+        return {'clock': 'spawn_after', **super().get_stats()}
+
+
+class Timer:
+    """Geplanter Aufruf im TimerWheel; cancel() nimmt ihn sofort aus seinem Slot"""
+
+    __slots__ = ('wheel', 'expires', 'deadline', 'func', 'args', 'name', 'slot', 'cancelled')
+
+    def __init__(self, wheel, expires: int, deadline: float, func, args: tuple, name: str):
+        self.wheel = wheel
+        self.expires = expires  # Tick, in dem der Timer fällig ist
+        self.deadline = deadline  # geplanter Zeitpunkt (time.monotonic)
+        self.func = func
+        self.args = args
+        self.name = name
+        self.slot = None  # Set im Rad, solange der Timer wartet
+        self.cancelled = False
+
+    def cancel(self):
+        self.wheel.cancel(self)
+
+    @property
+    def pending(self) -> bool:
+        return self.slot is not None
+
+
+class TimerWheel(ClockStats):
+    """
+    Hierarchisches Timer-Rad als gemeinsame Spieluhr (GAME_CLOCK=wheel)
+
+    Statt eines schlafenden Greenlets pro Frist (eventlet.spawn_after) liegen alle
+    Runden-, Pausen- und Broadcast-Timer in Slots. Ein einziges Greenlet rückt
+    Tick für Tick weiter und verteilt beim Überlauf die Timer der nächsthöheren
+    Stufe neu (wie die Timer-Wheels im Linux-Kernel). Planen und Abbrechen sind
+    O(1), abgebrochene Timer verschwinden sofort aus dem Rad.
+
+    Fällige Callbacks laufen in je einem kurzlebigen Greenlet, damit z.B. ein
+    round_end an 1000 Spieler die Uhr nicht aufhält. Ohne wartende Timer
+    schläft die Uhr nicht im Tick-Takt, sondern beendet ihr Greenlet.
+
+    Planen + Abbrechen kostet ~4 statt 15-50 µs, Timer feuern aber bis zu einem
+    Tick später: Im Dauerbetrieb (bench_clock.py --lobbies) liegt die Verspätung
+    bei jeder Lobby-Zahl über der von spawn_after. Nur sinnvoll, wenn sehr viele
+    Timer geplant und wieder abgebrochen werden.
+    """
+
+    def __init__(self, tick: float = None):
+        super().__init__()
+        self.tick = tick if tick is not None else float(os.environ.get('GAME_CLOCK_TICK_MS', 10)) / 1000.0
+        self.origin = time.monotonic()
+        self.current = 0  # nächster abzuarbeitender Tick
+        self.root: List[set] = [set() for _ in range(ROOT_SIZE)]
+        self.levels: List[List[set]] = [[set() for _ in range(LEVEL_SIZE)] for _ in range(LEVELS)]
+        self.runner = None
+        self.wake = None  # Event, auf das die schlafende Uhr wartet
+        self.wake_tick = 0  # Tick, zu dem sie von selbst aufwacht
+        self.lock = threading.Lock()
+
+        self.max_drift = 0.0  # wie weit die Uhr beim Aufwachen hinter ihrem Tick lag
+
+    def _tick_at(self, moment: float) -> int:
+        return int((moment - self.origin) / self.tick)
+
+    # ==================== PLANEN / ABBRECHEN ====================
+
+    def schedule(self, delay: float, func, *args, name: str = 'timer') -> Timer:
+        """func(*args) nach delay Sekunden aufrufen (name: Label für die Statistik)"""
+        deadline = time.monotonic() + max(0.0, delay)
+        # Aufrunden: ein Timer feuert nie vor seiner Frist
+        expires = -int(-(deadline - self.origin) // self.tick)
+        timer = Timer(self, expires, deadline, func, args, name)
+        with self.lock:
+            if self.runner is None:
+                # Uhr stand still - ohne wartende Timer darf sie einfach vorspringen
+                self.current = max(self.current, self._tick_at(time.monotonic()))
+                self.runner = eventlet.spawn(self._run)
+            self._add(timer)
+            self.pending += 1
+            self.scheduled += 1
+            if self.wake is not None and expires < self.wake_tick:
+                # Früher fällig als der Schlaf der Uhr dauert: wecken
+                self.wake.send()
+                self.wake = None
+        return timer
+
+    def cancel(self, timer: Timer):
+        """Timer abbrechen; ist er schon fällig, wird der Callback nicht mehr ausgeführt"""
+        with self.lock:
+            timer.cancelled = True
+            if timer.slot is None:
+                return
+            timer.slot.discard(timer)
+            timer.slot = None
+            self.pending -= 1
+            self.cancelled += 1
+
+    def _add(self, timer: Timer):
+        """In den passenden Slot einsortieren (Lock muss gehalten werden)"""
+        delta = timer.expires - self.current
+        if delta < 0:
+            slot = self.root[self.current & ROOT_MASK]
+        elif delta < ROOT_SIZE:
+            slot = self.root[timer.expires & ROOT_MASK]
+        else:
+            delta = min(delta, MAX_TICKS)
+            expires = self.current + delta
+            level = 0
+            while delta >= 1 << (ROOT_BITS + (level + 1) * LEVEL_BITS):
+                level += 1
+            slot = self.levels[level][(expires >> (ROOT_BITS + level * LEVEL_BITS)) & LEVEL_MASK]
+        slot.add(timer)
+        timer.slot = slot
+
+    def _cascade(self, level: int, index: int):
+        """Slot einer höheren Stufe leeren und seine Timer neu einsortieren"""
+        timers = self.levels[level][index]
+        self.levels[level][index] = set()
+        for timer in timers:
+            self._add(timer)
+
+    # ==================== UHRWERK ====================
+
+    def advance(self, now: float = None) -> int:
+        """Alle bis now fälligen Ticks abarbeiten -> Anzahl ausgelöster Timer"""
+        now = now if now is not None else time.monotonic()
+        target = self._tick_at(now)
+        due = []
+        with self.lock:
+            while self.current <= target:
+                index = self.current & ROOT_MASK
+                if index == 0:
+                    for level in range(LEVELS):
+                        level_index = (self.current >> (ROOT_BITS + level * LEVEL_BITS)) & LEVEL_MASK
+                        self._cascade(level, level_index)
+                        if level_index != 0:
+                            break
+                timers = self.root[index]
+                if timers:
+                    self.root[index] = set()
+                    for timer in timers:
+                        if timer.expires > self.current:
+                            self._add(timer)  # war über MAX_TICKS hinaus geplant
+                            continue
+                        timer.slot = None
+                        self.pending -= 1
+                        due.append(timer)
+                self.current += 1
+
+        for timer in due:
+            eventlet.spawn_n(self._fire, timer)
+        return len(due)
+
+    def _next_due_tick(self) -> int:
+        """Nächster belegter Tick, spätestens der nächste Überlauf (Lock muss gehalten werden)"""
+        tick = self.current
+        while tick & ROOT_MASK and not self.root[tick & ROOT_MASK]:
+            tick += 1
+        return tick
+
+    def _run(self):
+        while True:
+            with self.lock:
+                if self.pending == 0:
+                    self.runner = None
+                    return
+                self.wake_tick = self._next_due_tick()
+                wake = self.wake = event.Event()
+            wakeup = self.origin + self.wake_tick * self.tick
+            delay = wakeup - time.monotonic()
+            if delay > 0:
+                wake.wait(delay)
+            with self.lock:
+                self.wake = None
+            if wake.ready():
+                continue  # neuer, früherer Timer - Schlaf neu berechnen
+            drift = max(0.0, time.monotonic() - wakeup)
+            self.max_drift = max(self.max_drift, drift)
+            metrics.observe('clock_drift_seconds', drift)
+            try:
+                self.advance()
+            except Exception as e:
+                logger.exception(f"Fehler in der Spieluhr: {e}")
+
+    def _fire(self, timer: Timer):
+        if timer.cancelled:
+            return
+        self.fired += 1
+        # Verspätung gegenüber der Frist, inkl. Wartezeit im Eventlet-Hub
+        self._record_lateness(timer.name, time.monotonic() - timer.deadline)
+        try:
+            timer.func(*timer.args)
+        except Exception as e:
+            logger.exception(f"Fehler im Timer '{timer.name}': {e}")
+
+    def get_stats(self) -> dict:
+        return {
+            'clock': 'wheel',
+            'tick_ms': self.tick * 1000,
+            'max_drift_ms': round(self.max_drift * 1000, 3),
+            **super().get_stats()
+        }
+
+
+def create_game_clock():
+    """GAME_CLOCK=wheel: TimerWheel, sonst spawn_after (pünktlicher, siehe EventletClock)"""
+    if os.environ.get('GAME_CLOCK', 'spawn_after') == 'wheel':
+        logger.info("⏱️  Spieluhr: TimerWheel")
+        return TimerWheel()
+    return EventletClock()
+
+
+game_clock = create_game_clock()
@@ -0,0 +1,279 @@
+import random
+import hashlib
+from datetime import date
+import threading
+import logging
+from typing import Dict, List, Optional
+import eventlet
+
+logger = logging.getLogger(__name__)
+
+
+class WahlspruchEntry:
+    """Unveränderlicher Snapshot eines Wahlspruchs (ohne DB-Bindung)"""
+
+    __slots__ = ('id', 'spruch', 'partei', 'wahl', 'datum', 'quelle')
+
+    def __init__(self, id: int, spruch: str, partei: str, wahl: str = None,
+                 datum=None, quelle: str = None):
+        self.id = id
+        self.spruch = spruch
+        self.partei = partei
+        self.wahl = wahl
+        self.datum = datum
+        self.quelle = quelle
+
+    def __str__(self):
+        return f"{self.spruch} ({self.partei})"
+
+
+class ShuffleBag:
+    """
+    Shuffle-Bag Sampler
+
+    Jeder Eintrag wird genau einmal gezogen, bevor sich ein Eintrag wiederholt.
+    Ziehen ist O(1) (pop vom Ende), Neumischen passiert nur wenn der Beutel leer ist.
+    """
+
+    def __init__(self, rng: random.Random = None):
+        self.rng = rng or random.Random()
+        self.items: List = []
+        self.bag: List = []
+        self.last = None
+
+    def reset(self, items: List):
+        """Alle Einträge ersetzen und neu mischen"""
+        self.items = list(items)
+        self.bag = []
+
+    def add(self, item):
+        """Neuen Eintrag an zufälliger Stelle in den aktuellen Beutel einfügen"""
+        self.items.append(item)
+        if not self.bag:
+            return  # Kommt beim nächsten Neumischen mit rein
+        self.bag.append(item)
+        j = self.rng.randrange(len(self.bag))
+        self.bag[-1], self.bag[j] = self.bag[j], self.bag[-1]
+
+    def _refill(self):
+        self.bag = list(self.items)
+        self.rng.shuffle(self.bag)
+        # Keine direkte Wiederholung über die Beutel-Grenze hinweg
+        if len(self.bag) > 1 and self.bag[-1] is self.last:
+            self.bag[0], self.bag[-1] = self.bag[-1], self.bag[0]
+
+    def draw(self):
+        """Nächsten Eintrag ziehen (None wenn leer)"""
+        if not self.bag:
+            self._refill()
+        if not self.bag:
+            return None
+        self.last = self.bag.pop()
+        return self.last
+
+    def remaining(self) -> int:
+        return len(self.bag)
+
+    def __len__(self):
+        return len(self.items)
+
+
+class PartyIndex:
+    """
+    Inkrementell gepflegter Index aller Parteien mit Anzahl Wahlsprüche
+
+    Jede Änderung erhöht die Version und berechnet einen Inhalts-Hash neu,
+    der als ETag für /api/game/parteien dient.
+    """
+
+    def __init__(self):
+        self.counts: Dict[str, int] = {}  # partei -> anzahl
+        self.version = 0
+        self.etag = None
+        self._sorted: List[str] = []
+        self._rebuild()
+
+    def _rebuild(self):
+        self.version += 1
+        self._sorted = sorted(self.counts)
+        digest = hashlib.sha1(
+            "\n".join(f"{p}\t{self.counts[p]}" for p in self._sorted).encode('utf-8')
+        ).hexdigest()[:16]
+        self.etag = f"parteien-{digest}"
+
+    def reset(self, entries: List[WahlspruchEntry]):
+        self.counts = {}
+        for entry in entries:
+            if entry.partei:
+                self.counts[entry.partei] = self.counts.get(entry.partei, 0) + 1
+        self._rebuild()
+
+    def add(self, partei: str):
+        if not partei:
+            return
+        self.counts[partei] = self.counts.get(partei, 0) + 1
+        self._rebuild()
+
+    def parteien(self) -> List[str]:
+        return list(self._sorted)
+
+    def snapshot(self) -> dict:
+        """Parteien, Anzahl und ETag als konsistenter Snapshot"""
+        return {
+            'parteien': list(self._sorted),
+            'counts': dict(self.counts),
+            'version': self.version,
+            'etag': self.etag
+        }
+
+
+class WahlspruchCorpus:
+    """
+    In-Memory Cache aller Wahlsprüche
+
+    Lädt die Tabelle einmalig (lazy beim ersten Zugriff) und bedient Runden aus
+    einem Shuffle-Bag - Ziehen greift nie auf die DB zu. Änderungen (z.B. vom
+    Importer) erkennt refresh() im Hintergrund an Anzahl und höchster ID: neue
+    Zeilen werden nachgeladen, nach Löschungen wird komplett neu geladen.
+    """
+
+    FIELDS = ['spruch', 'partei', 'wahl', 'datum', 'quelle']
+
+    def __init__(self, db_service, rng: random.Random = None):
+        self.db_service = db_service
+        self.entries: Dict[int, WahlspruchEntry] = {}  # id -> entry
+        self.bag = ShuffleBag(rng)
+        self.parteien = PartyIndex()
+        self.max_id = 0
+        self.loaded = False
+        self.version = 0  # bei jeder Änderung der Einträge erhöht (Checkpoint exportiert nur dann neu)
+        self.lock = threading.Lock()
+
+    def _fetch(self, min_id: int = 0) -> List[WahlspruchEntry]:
+        """Wahlsprüche mit id > min_id aus der DB lesen"""
+        rows = self.db_service.read_rows("wahlspruch", ['id'] + self.FIELDS, min_id)
+        return [WahlspruchEntry(**row) for row in rows]
+
+    def _replace(self, entries: List[WahlspruchEntry]):
+        """Alle Einträge ersetzen (Lock muss gehalten werden)"""
+        self.entries = {e.id: e for e in entries}
+        self.max_id = max(self.entries, default=0)
+        self.bag.reset(entries)
+        self.parteien.reset(entries)
+        self.loaded = True
+        self.version += 1
+
+    def _ensure_loaded(self):
+        if self.loaded:
+            return
+        self._replace(self._fetch())
+        logger.info(f"📚 Wahlspruch-Korpus geladen: {len(self.entries)} Einträge")
+
+    def refresh(self) -> bool:
+        """
+        Mit der DB abgleichen (Hintergrund-Loop, DB-Zugriffe ohne Lock)
+
+        Returns:
+            True wenn sich der Korpus geändert hat
+        """
+        if not self.loaded:
+            return False
+        count, max_id = self.db_service.wahlspruch_fingerprint()
+        with self.lock:
+            known_count, known_max_id = len(self.entries), self.max_id
+        if (count, max_id) == (known_count, known_max_id):
+            return False
+
+        new_entries = self._fetch(known_max_id) if max_id > known_max_id else []
+        with self.lock:
+            for entry in new_entries:
+                self._add_entry(entry)
+            complete = len(self.entries) == count
+        if complete:
+            logger.info(f"📚 Wahlspruch-Korpus aktualisiert: +{len(new_entries)} Einträge")
+            return True
+
+        # Gelöscht (oder gelöscht und neu eingefügt): komplett neu laden
+        entries = self._fetch()
+        with self.lock:
+            self._replace(entries)
+        logger.info(f"📚 Wahlspruch-Korpus neu geladen: {len(entries)} Einträge")
+        return True
+
+    def start_interval_refresh(self, interval: float):
+        """refresh() periodisch im Hintergrund, damit draw() nie auf die DB wartet"""
+        def _loop():
+            while True:
+                eventlet.sleep(interval)
+                try:
+                    self.refresh()
+                except Exception as e:
+                    logger.exception(f"Fehler beim Abgleich des Wahlspruch-Korpus: {e}")
+
+        return eventlet.spawn(_loop)
+
+    def _add_entry(self, entry: WahlspruchEntry):
+        if entry.id in self.entries:
+            return
+        self.entries[entry.id] = entry
+        self.max_id = max(self.max_id, entry.id)
+        self.bag.add(entry)
+        self.parteien.add(entry.partei)
+        self.version += 1
+
+    def add(self, entry: WahlspruchEntry):
+        """Neu erstellten Wahlspruch übernehmen (ohne DB-Roundtrip)"""
+        with self.lock:
+            if self.loaded:
+                self._add_entry(entry)
+
+    def reload(self):
+        """Korpus komplett neu laden"""
+        with self.lock:
+            self.loaded = False
+            self._ensure_loaded()
+
+    def draw(self) -> Optional[WahlspruchEntry]:
+        """Nächsten Wahlspruch aus dem Shuffle-Bag ziehen"""
+        with self.lock:
+            self._ensure_loaded()
+            return self.bag.draw()
+
+    def parteien_snapshot(self) -> dict:
+        """Partei-Index lesen (lädt nur beim allerersten Zugriff aus der DB)"""
+        with self.lock:
+            self._ensure_loaded()
+            return self.parteien.snapshot()
+
+    def get(self, wahlspruch_id: int) -> Optional[WahlspruchEntry]:
+        with self.lock:
+            self._ensure_loaded()
+            return self.entries.get(wahlspruch_id)
+
+    def __len__(self):
+        with self.lock:
+            self._ensure_loaded()
+            return len(self.entries)
+
+    # ==================== CHECKPOINT ====================
+
+    def export_state(self) -> Optional[dict]:
+        with self.lock:
+            if not self.loaded:
+                return None
+            return {'entries': [
+                [e.id, e.spruch, e.partei, e.wahl, e.datum.isoformat() if e.datum else None, e.quelle]
+                for e in self.entries.values()
+            ]}
+
+    def restore_state(self, state: Optional[dict], events: list, age: float):
+        """Korpus aus dem Checkpoint übernehmen (Änderungen seither erkennt der nächste refresh())"""
+        if not state:
+            return
+        entries = [
+            WahlspruchEntry(id, spruch, partei, wahl, date.fromisoformat(datum) if datum else None, quelle)
+            for id, spruch, partei, wahl, datum, quelle in state['entries']
+        ]
+        with self.lock:
+            self._replace(entries)
+        logger.info(f"📚 Wahlspruch-Korpus aus Checkpoint: {len(self.entries)} Einträge")
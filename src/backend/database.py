@@ -1,47 +1,105 @@
-import sillyorm
+import sqlalchemy
 import os
-import random
+import atexit
 import logging
+from types import SimpleNamespace
 from datetime import datetime
 from models import User, Wahlspruch
+from db_executor import DBExecutor
+from migrations import Registry, migrate
+from metrics import metrics
+from corpus import WahlspruchCorpus, WahlspruchEntry
+from leaderboard import LeaderboardIndex
+from score_journal import ScoreJournal
 
 logger = logging.getLogger(__name__)
 
+USER_FIELDS = ['id', 'nickname', 'points', 'password', 'last_login_ip', 'last_login_time',
+               'session_token', 'registered_at']
+WAHLSPRUCH_FIELDS = ['id', 'spruch', 'partei', 'wahl', 'datum', 'quelle']
+SQLITE_FALLBACK_URL = "sqlite:///wahlplakatgame.db"
 
+
+def get_database_url() -> str:
+    """PostgreSQL aus DATABASE_URL, sonst die lokale SQLite-Datei"""
+    return os.environ.get('DATABASE_URL') or SQLITE_FALLBACK_URL
+
+
+def _search_rows(env, model: str, domain: list, fields: list) -> list:
+    """Suche als Liste fertiger Zeilen (Attribut-Zugriff wie bei Records, aber ohne DB-Zugriff)"""
+    return [SimpleNamespace(**row) for row in env[model].search(domain).read(fields)]
+
+
+@metrics.instrument_methods('db_call_seconds', exclude=('run',))
 class DatabaseService:
     """Database Service für WahlplakatGame"""
     
     def __init__(self):
-        self.env = self._get_environment()
+        self.registry = self._get_registry()
+        self.executor = DBExecutor(self.registry)
+        atexit.register(self.executor.close)
+        self.corpus = WahlspruchCorpus(self)
+        self.leaderboard = LeaderboardIndex(self)
+        self.score_journal = ScoreJournal(self)
     
-    def _get_environment(self):
-        """Environment initialisieren"""
+    def _get_registry(self):
+        """Registry und Tabellen initialisieren"""
         # Versuche PostgreSQL Connection String aus Umgebungsvariable
         pg_connection = os.environ.get('DATABASE_URL')
         print(f'PG connection ist: {pg_connection}')
         
         if pg_connection:
             logger.info("📊 Verwende PostgreSQL Datenbank")
-            registry = sillyorm.Registry(pg_connection)
+            registry = Registry(pg_connection)
         else:
             logger.info("📊 Verwende SQLite Datenbank (Fallback)")
-            registry = sillyorm.Registry("sqlite:///wahlplakatgame.db")
+            registry = Registry(SQLITE_FALLBACK_URL)
         
         registry.register_model(User)
         registry.register_model(Wahlspruch)
         registry.resolve_tables()
         registry.init_db_tables()
+        migrate(registry)
         
-        return registry.get_environment(autocommit=True)
+        return registry
+    
+    def run(self, func, *args, **kwargs):
+        """func(env, ...) auf einem gepoolten Environment im Thread-Pool ausführen"""
+        return self.executor.run(func, *args, **kwargs)
+    
+    def read_rows(self, model: str, fields: list, min_id: int = 0) -> list:
+        """
+        Ganze Tabelle (oder alle Zeilen mit id > min_id) als dicts lesen
+        
+        Nutzt SQLAlchemy Core statt sillyorm read(), das bei zehntausenden Zeilen sehr langsam wird.
+        """
+        table = self.registry.metadata.tables[model]
+        stmt = sqlalchemy.select(*(table.c[field] for field in fields)).order_by(table.c.id)
+        if min_id:
+            stmt = stmt.where(table.c.id > min_id)
+        
+        def _read(env):
+            with env.transaction():
+                return [dict(row._mapping) for row in env.connection.execute(stmt)]
+        
+        return self.run(_read)
+    
+    def warm_caches(self):
+        """In-Memory Caches (Korpus, Leaderboard) beim Serverstart befüllen (sofern nicht schon aus dem Checkpoint)"""
+        # Offene Punkte aus dem letzten Lauf zuerst nachspielen
+        self.score_journal.replay()
+        len(self.corpus)
+        if not self.leaderboard.loaded:
+            self.leaderboard.load()
     
     # ==================== USER METHODS ====================
     
     def create_new_user(self, nickname: str, password: str) -> bool:
         """User erstellen"""
-        try:
-            existing = self.env["user"].search([("nickname", "=", nickname)])
+        def _create(env):
+            existing = env["user"].search([("nickname", "=", nickname)])
             if existing:
-                return False
+                return None
             
             user_data = {
                 "nickname": nickname,
@@ -49,7 +107,17 @@ class DatabaseService:
                 "points": 0,
                 "registered_at": datetime.now()
             }
-            self.env["user"].create(user_data)
+            return env["user"].create(user_data).id
+        
+        try:
+            try:
+                user_id = self.run(_create)
+            except sqlalchemy.exc.IntegrityError:
+                # Unique-Index auf nickname: gleichzeitige Registrierung mit demselben Namen
+                return False
+            if user_id is None:
+                return False
+            self.leaderboard.add_user(user_id, nickname, 0)
             return True
         except Exception as e:
             logger.exception(f"Fehler beim Erstellen des Users: {e}")
@@ -57,99 +125,206 @@ class DatabaseService:
     
     def get_user_by_nickname(self, nickname: str):
         """User by Nickname"""
-        return self.env["user"].search([("nickname", "=", nickname)])
+        return self.run(_search_rows, "user", [("nickname", "=", nickname)], USER_FIELDS)
     
     def get_user_by_id(self, user_id: int):
         """User by ID"""
-        return self.env["user"].search([("id", "=", user_id)])
+        return self.run(_search_rows, "user", [("id", "=", user_id)], USER_FIELDS)
     
     def get_user_by_session_token(self, session_token: str):
         """User by Session Token"""
-        return self.env["user"].search([("session_token", "=", session_token)])
+        return self.run(_search_rows, "user", [("session_token", "=", session_token)], USER_FIELDS)
     
     def update_user_points(self, user_id: int, new_points: int) -> bool:
         """User Punkte updaten"""
         try:
-            user = self.env["user"].search([("id", "=", user_id)])
-            if not user:
+            if not self.run(self._write_user, user_id, {"points": new_points}):
                 return False
-            
-            user.write({"points": new_points})
+            self.leaderboard.set_points(user_id, new_points)
             return True
         except Exception as e:
             logger.exception(f"Fehler beim Updaten der Punkte: {e}")
             raise e
     
+    def queue_user_points(self, changes: list):
+        """
+        Punkteänderungen vormerken (Write-Behind, kein DB-Zugriff)
+        
+        Args:
+            changes: Liste von (user_id, delta, neuer_punktestand)
+        """
+        self.score_journal.record(changes)
+        for user_id, _, total in changes:
+            self.leaderboard.set_points(user_id, total)
+    
+    def flush_user_points(self) -> int:
+        """Vorgemerkte Punkte in einer Transaktion schreiben"""
+        return self.score_journal.flush()
+    
+    def apply_user_points(self, totals: dict):
+        """
+        Punktestände mehrerer User in einer Transaktion setzen (user_id -> punkte)
+        
+        Punkte steigen nur, daher wird nie ein höherer Stand überschrieben. So können
+        mehrere Worker (und Journal-Replays) gefahrlos in beliebiger Reihenfolge schreiben.
+        """
+        if not totals:
+            return
+        table = self.registry.metadata.tables["user"]
+        new_points = sqlalchemy.bindparam("new_points")
+        stmt = (
+            sqlalchemy.update(table)
+            .where(table.c.id == sqlalchemy.bindparam("uid"))
+            .values(points=sqlalchemy.case(
+                (sqlalchemy.func.coalesce(table.c.points, 0) < new_points, new_points),
+                else_=table.c.points
+            ))
+        )
+        params = [{"uid": user_id, "new_points": points} for user_id, points in totals.items()]
+        
+        def _apply(env):
+            with env.transaction():
+                env.connection.execute(stmt, params)
+        
+        self.run(_apply)
+        
+        # Ein aus dem Checkpoint geladenes Leaderboard kann älter sein als das Journal
+        for user_id, points in totals.items():
+            self.leaderboard.raise_points(user_id, points)
+    
+    def get_current_points(self, user_id: int, fallback: int = 0) -> int:
+        """Aktueller Punktestand inkl. noch nicht geschriebener Änderungen"""
+        points = self.leaderboard.points_of(user_id)
+        fallback = fallback or 0
+        if points is None:
+            return fallback
+        if fallback > points:
+            # DB ist weiter als der lokale Index (Punkte aus einem anderen Worker)
+            self.leaderboard.set_points(user_id, fallback)
+            return fallback
+        return points
+    
     def update_user_session(self, user_id: int, session_token: str, ip_address: str) -> bool:
         """User Session updaten"""
         try:
-            user = self.env["user"].search([("id", "=", user_id)])
-            if not user:
-                return False
-            
-            user.write({
+            return self.run(self._write_user, user_id, {
                 "session_token": session_token,
                 "last_login_ip": ip_address,
                 "last_login_time": datetime.now()
             })
-            return True
         except Exception as e:
             logger.exception(f"Fehler beim Updaten der Session: {e}")
             raise e
     
+    def update_user_password(self, user_id: int, password: str) -> bool:
+        """Passwort-Hash ersetzen"""
+        try:
+            return self.run(self._write_user, user_id, {"password": password})
+        except Exception as e:
+            logger.exception(f"Fehler beim Updaten des Passworts: {e}")
+            raise e
+    
+    @staticmethod
+    def _write_user(env, user_id: int, values: dict) -> bool:
+        user = env["user"].search([("id", "=", user_id)])
+        if not user:
+            return False
+        user.write(values)
+        return True
+    
     def get_top_users(self, limit: int = 10):
-        """Top Users by Points"""
-        return self.env["user"].search([], order_by="points", order_asc=False, limit=limit)
+        """Top Users by Points (aus dem In-Memory Leaderboard)"""
+        return self.leaderboard.top(limit)
+    
+    def get_leaderboard(self, limit: int = 10) -> list:
+        """Leaderboard als Liste mit Rang, Nickname und Punkten"""
+        return [
+            {
+                'rank': i,
+                'nickname': user.nickname,
+                'points': user.points
+            }
+            for i, user in enumerate(self.get_top_users(limit), 1)
+        ]
     
     # ==================== WAHLSPRUCH METHODS ====================
     
     def create_new_wahlspruch(self, text: str, partei: str, wahl: str = None, 
                              datum = None, quelle: str = None) -> bool:
         """Wahlspruch erstellen"""
-        try:
-            existing = self.env["wahlspruch"].search([("spruch", "=", text)])
+        wahlspruch_data = {
+            "spruch": text,
+            "partei": partei,
+            "wahl": wahl,
+            "datum": datum,
+            "quelle": quelle
+        }
+        
+        def _create(env):
+            existing = env["wahlspruch"].search([("spruch", "=", text)])
             if existing:
+                return None
+            return env["wahlspruch"].create(dict(wahlspruch_data)).id
+        
+        try:
+            wahlspruch_id = self.run(_create)
+            if wahlspruch_id is None:
                 return False
-            
-            wahlspruch_data = {
-                "spruch": text,
-                "partei": partei,
-                "wahl": wahl,
-                "datum": datum,
-                "quelle": quelle
-            }
-            self.env["wahlspruch"].create(wahlspruch_data)
+            self.corpus.add(WahlspruchEntry(id=wahlspruch_id, **wahlspruch_data))
             return True
         except Exception as e:
             logger.exception(f"Fehler beim Erstellen des Wahlspruchs: {e}")
             raise e
     
+    def bulk_create_wahlsprueche(self, batches) -> int:
+        """
+        Viele Wahlsprüche in einer Transaktion einfügen (für den Import, nicht für Spiel-Handler)
+
+        Args:
+            batches: Iterable von Listen mit Wahlspruch-dicts (spruch, partei, wahl, datum, quelle);
+                     jede Liste wird als ein Multi-Row INSERT geschrieben
+
+        Returns:
+            Anzahl eingefügter Zeilen
+        """
+        table = self.registry.metadata.tables["wahlspruch"]
+        created = 0
+        with self.registry.environment() as env:
+            with env.transaction():
+                for batch in batches:
+                    if batch:
+                        env.connection.execute(sqlalchemy.insert(table), batch)
+                        created += len(batch)
+        return created
+
     def get_all_wahlsprueche(self):
         """Alle Wahlsprüche"""
-        return self.env["wahlspruch"].search([])
+        return [SimpleNamespace(**row) for row in self.read_rows("wahlspruch", WAHLSPRUCH_FIELDS)]
     
     def get_alle_parteien(self) -> list:
-        """Alle einzigartigen Parteien"""
-        wahlsprueche = self.env["wahlspruch"].search([])
-        parteien = set()
-        
-        for wahlspruch in wahlsprueche:
-            if wahlspruch.partei:
-                parteien.add(wahlspruch.partei)
-        
-        return sorted(list(parteien))
+        """Alle einzigartigen Parteien (aus dem Partei-Index)"""
+        return self.corpus.parteien_snapshot()['parteien']
+    
+    def get_parteien_index(self) -> dict:
+        """Parteien mit Anzahl Wahlsprüche, Version und ETag"""
+        return self.corpus.parteien_snapshot()
     
     def get_wahlspruch_by_id(self, wahlspruch_id: int):
         """Wahlspruch by ID"""
-        return self.env["wahlspruch"].search([("id", "=", wahlspruch_id)])
+        return self.run(_search_rows, "wahlspruch", [("id", "=", wahlspruch_id)], WAHLSPRUCH_FIELDS)
     
     def get_random_wahlspruch(self):
-        """Zufälliger Wahlspruch"""
-        wahlsprueche = self.env["wahlspruch"].search([])
-        if wahlsprueche:
-            return random.choice(list(wahlsprueche))
-        return None
-    
-    def count_wahlsprueche(self) -> int:
-        """Anzahl Wahlsprüche"""
-        return self.env["wahlspruch"].search_count([])
+        """Zufälliger Wahlspruch (aus dem In-Memory Korpus, ohne Wiederholung bis der Beutel leer ist)"""
+        return self.corpus.draw()
+    
+    def wahlspruch_fingerprint(self) -> tuple:
+        """(Anzahl, höchste ID) der Wahlsprüche - ändert sich bei jedem Import und jeder Löschung"""
+        table = self.registry.metadata.tables["wahlspruch"]
+        stmt = sqlalchemy.select(sqlalchemy.func.count(), sqlalchemy.func.max(table.c.id)).select_from(table)
+        
+        def _read(env):
+            with env.transaction():
+                count, max_id = env.connection.execute(stmt).one()
+                return count, max_id or 0
+        
+        return self.run(_read)
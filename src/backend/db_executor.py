@@ -0,0 +1,115 @@
+import os
+import time
+import logging
+import eventlet
+from eventlet import tpool
+from eventlet.queue import LightQueue, Empty
+
+logger = logging.getLogger(__name__)
+
+
+class DBTimeout(Exception):
+    """DB-Aufruf hat das Zeitlimit überschritten (oder kein Pool-Slot frei)"""
+
+
+class DBExecutor:
+    """
+    Führt DB-Arbeit auf einem Pool von sillyorm-Environments in nativen Threads aus
+
+    Jedes Environment hat eine eigene Verbindung. Ein Aufruf leiht sich ein
+    Environment, führt die Funktion über eventlet.tpool aus und gibt es danach
+    zurück - der Eventlet-Hub (und damit alle WebSockets) läuft währenddessen
+    weiter. Die Funktion muss fertige Daten zurückgeben (dicts, Namespaces),
+    keine Recordsets: deren Attribute würden später wieder die DB abfragen.
+    """
+
+    def __init__(self, registry, size: int = None, timeout: float = None):
+        self.registry = registry
+        self.size = size or int(os.environ.get('DB_POOL_SIZE', 4))
+        self.timeout = timeout or float(os.environ.get('DB_QUERY_TIMEOUT', 10))
+        self.envs = LightQueue()
+        for _ in range(self.size):
+            self.envs.put(registry.get_environment(autocommit=True))
+
+        # Statistik
+        self.calls = 0
+        self.in_use = 0
+        self.max_in_use = 0
+        self.waiting = 0
+        self.waited = 0  # Aufrufe, die auf ein freies Environment warten mussten
+        self.timeouts = 0
+        self.errors = 0
+        self.wait_time = 0.0
+        self.query_time = 0.0
+
+    def _work(self, env, func, args, kwargs):
+        """Läuft als eigener Green Thread, damit das Environment auch nach einem Timeout zurückkommt"""
+        start = time.perf_counter()
+        try:
+            return tpool.execute(func, env, *args, **kwargs)
+        finally:
+            self.query_time += time.perf_counter() - start
+            self.in_use -= 1
+            self.envs.put(env)
+
+    def run(self, func, *args, **kwargs):
+        """
+        func(env, *args, **kwargs) in einem Worker-Thread ausführen
+
+        Raises:
+            DBTimeout: kein Environment frei oder Aufruf dauert länger als self.timeout
+        """
+        self.calls += 1
+        deadline = time.monotonic() + self.timeout
+
+        start = time.perf_counter()
+        self.waiting += 1
+        try:
+            try:
+                env = self.envs.get(block=False)
+            except Empty:
+                self.waited += 1
+                env = self.envs.get(timeout=self.timeout)
+        except Empty:
+            self.timeouts += 1
+            raise DBTimeout(f"Kein DB-Environment frei nach {self.timeout}s (Pool: {self.size})")
+        finally:
+            self.waiting -= 1
+            self.wait_time += time.perf_counter() - start
+
+        self.in_use += 1
+        self.max_in_use = max(self.max_in_use, self.in_use)
+        worker = eventlet.spawn(self._work, env, func, args, kwargs)
+        try:
+            with eventlet.Timeout(max(deadline - time.monotonic(), 0.001)):
+                return worker.wait()
+        except eventlet.Timeout:
+            # Der Thread läuft weiter und gibt sein Environment selbst zurück
+            self.timeouts += 1
+            raise DBTimeout(f"DB-Aufruf {getattr(func, '__name__', func)} dauerte länger als {self.timeout}s")
+        except Exception:
+            self.errors += 1
+            raise
+
+    def close(self):
+        """Alle freien Environments schließen"""
+        while True:
+            try:
+                self.envs.get(block=False).close()
+            except Empty:
+                break
+
+    def get_stats(self) -> dict:
+        return {
+            'size': self.size,
+            'in_use': self.in_use,
+            'max_in_use': self.max_in_use,
+            'waiting': self.waiting,
+            'saturation': round(self.in_use / self.size, 2),
+            'calls': self.calls,
+            'waited': self.waited,
+            'timeouts': self.timeouts,
+            'errors': self.errors,
+            'avg_wait_ms': round(self.wait_time / self.calls * 1000, 2) if self.calls else None,
+            'avg_query_ms': round(self.query_time / self.calls * 1000, 2) if self.calls else None
+        }
@@ -1,114 +1,317 @@
+import os
+import time
 import threading
 import logging
 import random
-from typing import Dict, Optional
+import heapq
+from collections import namedtuple
+from typing import Dict, List, Optional
 import eventlet
+from eventlet.queue import LightQueue, Full
+from state_store import MemoryStateStore, get_worker_id, worker_alive
+from broadcast import LobbyBroadcaster
+from wire import WireFormat
+from clock import game_clock
+from metrics import metrics
 
 logger = logging.getLogger(__name__)
 
+# round_end: so viele Spieler mit den meisten Punkten der Runde gehen an alle
+ROUND_END_MOVERS = int(os.environ.get('ROUND_END_MOVERS', 5))
+# Seitengröße für request_round_results
+RESULTS_PAGE_SIZE = 50
+RESULTS_PAGE_SIZE_MAX = 200
+# Wartende Befehle pro Lobby; ist die Queue voll, werden Antworten und Anfragen abgewiesen
+LOBBY_QUEUE_SIZE = int(os.environ.get('LOBBY_QUEUE_SIZE', 4096))
+# So viele Befehle arbeitet der Lobby-Loop am Stück ab, bevor Deltas und Snapshot rausgehen
+LOBBY_BATCH = 256
+
+# Rundenlänge und Pause zwischen zwei Runden (Sekunden)
+ROUND_SECONDS = 15.0
+INTERMISSION_SECONDS = 5.0
+
+# Warmstart: so lange bleiben wiederhergestellte Spieler ohne Verbindung in der Lobby
+REJOIN_GRACE = float(os.environ.get('CHECKPOINT_REJOIN_GRACE', 30))
+# Ältere Checkpoints stellen keine Lobbies/Runden mehr her (Sessions und Caches schon)
+CHECKPOINT_MAX_AGE = float(os.environ.get('CHECKPOINT_MAX_AGE', 300))
+# Multi-Worker: so oft geht geänderter Lobby-Zustand in den State Store (Sekunden)
+STATE_PUBLISH_INTERVAL = float(os.environ.get('STATE_PUBLISH_INTERVAL', 1.0))
+
+# Unveränderlicher Lesestand einer Lobby - der Lobby-Loop ersetzt ihn nach jedem Schub
+LobbySnapshot = namedtuple('LobbySnapshot', ['lobby_id', 'players', 'round_active', 'round_number', 'answers', 'wahlspruch_id'])
+
 
 class GameLobby:
-    """Zentrale Spiel-Lobby"""
+    """
+    Spiel-Lobby (eine von mehreren, jede mit eigenem Socket.IO Room und Timer)
     
-    def __init__(self, db_service, game_service_callback):
+    Single Writer: Der Zustand wird nur im Lobby-Loop (run) geändert, der Beitritte,
+    Antworten, Timer usw. der Reihe nach aus einer begrenzten Queue abarbeitet -
+    ohne Locks und in fester Reihenfolge. Von außen wird nur der unveränderliche
+    snapshot gelesen.
+    """
+    
+    def __init__(self, db_service, game_service_callback, lobby_id: int = 1):
+        self.lobby_id = lobby_id
+        self.room = f"lobby-{lobby_id}"
         self.db_service = db_service
-        self.game_service_callback = game_service_callback  # Callback für Timer
+        self.game_service_callback = game_service_callback  # Callback für das Rundenende per Timer
+        self.broadcaster = None  # LobbyBroadcaster, wird vom GameService gesetzt
         self.players: Dict[str, dict] = {}  # session_token -> player_info
         self.sid_to_token: Dict[str, str] = {}  # sid -> session_token
         self.current_wahlspruch = None
         self.current_quelle = None
         self.current_answers: Dict[str, str] = {}  # session_token -> partei
-        self.round_timer = None
+        self.answer_ms: Dict[str, int] = {}  # session_token -> ms seit Rundenstart (für das Runden-Ledger)
+        self.round_timer = None  # Timer der Spieluhr (Rundenende nach 15 Sekunden)
+        self.intermission_timer = None  # Timer der Spieluhr (nächste Runde nach der Pause)
         self.round_active = False
         self.round_number = 0
         self.current_round_id = 0  # ← NEU: Eindeutige ID für jede Runde
-        self.lock = threading.Lock()
+        self.round_started_at = None  # time.time() - für den Warmstart
+        self.round_ended_at = None
+        
+        # Zähler für O(1) Rundenende-Prüfung
+        self.eligible_count = 0  # Spieler mit can_answer
+        self.answered_count = 0  # davon bereits geantwortet
+        
+        # Versionierte Spielerliste: Clients bekommen einmal einen Snapshot,
+        # danach nur noch Deltas mit fortlaufender Sequenznummer
+        self.player_list_seq = 0
+        self.pending_deltas: List[dict] = []
+        self.next_player_key = 1
+        
+        # Vollständige Ergebnistabelle der letzten Runde (nur auf Anfrage, seitenweise)
+        self.last_results: List[dict] = []
+        self.last_results_sorted = True
+        self.last_results_round = 0
+        
+        # Lobby-Loop
+        self.commands = LightQueue(LOBBY_QUEUE_SIZE)  # (befehl, args, eingereiht_um)
+        self.closed = False
+        self.members = 0  # Spieler laut Routing im GameService (inkl. wartender Joins), nur unter dessen Lock
+        self.snapshot = LobbySnapshot(lobby_id, 0, False, 0, 0, None)
+        
+        # Geteilter Zustand (GameService)
+        self.clock_lease_until = 0.0  # time.monotonic() - bis dahin gehört die Runden-Uhr sicher diesem Worker
+        self.state_dirty = True  # Zustand seit der letzten Veröffentlichung geändert
     
-    def add_player(self, session_token: str, user_id: int, nickname: str, sid: str, points: int):
-        """Spieler hinzufügen"""
-        with self.lock:
-            self.players[session_token] = {
-                'user_id': user_id,
-                'nickname': nickname,
-                'sid': sid,
-                'answered': False,
-                'points': points,
-                'can_answer': True
-            }
-            self.sid_to_token[sid] = session_token
+    # ==================== LOBBY-LOOP ====================
+    
+    def post(self, command: str, *args) -> bool:
+        """Befehl einreihen, notfalls auf Platz warten (Timer, Beitritt, Verlassen)"""
+        if self.closed:
+            return False
+        if command == 'close':
+            self.closed = True  # danach wird nichts mehr angenommen
+        self.commands.put((command, args, time.perf_counter()))
+        return True
+    
+    def offer(self, command: str, *args) -> bool:
+        """Befehl eines Clients einreihen - False wenn die Queue voll ist"""
+        if self.closed:
+            return False
+        try:
+            self.commands.put_nowait((command, args, time.perf_counter()))
+        except Full:
+            metrics.inc('lobby_commands_rejected_total', command=command)
+            return False
+        return True
+    
+    def run(self, handlers: dict, after_batch):
+        """
+        Lobby-Loop: Befehle der Reihe nach abarbeiten, bis 'close' kommt
+        
+        Args:
+            handlers: befehl -> handler(lobby, *args)
+            after_batch: nach jedem Schub (alles Anliegende, max. LOBBY_BATCH) aufgerufen,
+                         dort gehen gesammelte Deltas raus und der Snapshot wird ersetzt
+        """
+        while True:
+            batch = [self.commands.get()]
+            while len(batch) < LOBBY_BATCH and self.commands.qsize():
+                batch.append(self.commands.get_nowait())
+            
+            for command, args, queued_at in batch:
+                metrics.inc('lobby_commands_total', command=command)
+                metrics.observe('lobby_command_wait_seconds', time.perf_counter() - queued_at)
+                try:
+                    handlers[command](self, *args)
+                except Exception as e:
+                    logger.exception(f"Fehler im Lobby-Loop [{self.room}] bei '{command}': {e}")
+                if command == 'close':
+                    return
             
+            try:
+                after_batch(self)
+            except Exception as e:
+                logger.exception(f"Fehler im Lobby-Loop [{self.room}] nach Befehlen: {e}")
+    
+    def publish_snapshot(self):
+        """Lesestand für alle außerhalb des Lobby-Loops neu setzen"""
+        self.snapshot = LobbySnapshot(
+            self.lobby_id,
+            len(self.players),
+            self.round_active,
+            self.round_number,
+            len(self.current_answers),
+            self.current_wahlspruch.id if self.current_wahlspruch else None
+        )
+    
+    # ==================== SPIELERLISTE (DELTAS) ====================
+    
+    def _public_player(self, player: dict) -> dict:
+        return {
+            'key': player['key'],
+            'nickname': player['nickname'],
+            'points': player['points'],
+            'answered': player['answered'],
+            'can_answer': player['can_answer']
+        }
+    
+    def _record_delta(self, op: str, **payload):
+        """Delta vormerken"""
+        self.player_list_seq += 1
+        delta = {'seq': self.player_list_seq, 'op': op}
+        delta.update(payload)
+        self.pending_deltas.append(delta)
+    
+    def drain_deltas(self) -> List[dict]:
+        """Vorgemerkte Deltas in Reihenfolge abholen"""
+        deltas = self.pending_deltas
+        self.pending_deltas = []
+        return deltas
+    
+    def get_player_list_snapshot(self) -> dict:
+        """Vollständige Spielerliste mit aktueller Sequenznummer"""
+        return {
+            'seq': self.player_list_seq,
+            'players': [self._public_player(p) for p in self.players.values()]
+        }
+    
+    def _uncount(self, player: dict):
+        """Spieler aus den Rundenzählern austragen"""
+        if player['can_answer']:
+            self.eligible_count -= 1
+            if player['answered']:
+                self.answered_count -= 1
+    
+    def _is_round_complete(self) -> bool:
+        """Alle antwortberechtigten Spieler haben geantwortet"""
+        return self.round_active and self.eligible_count > 0 and self.answered_count == self.eligible_count
+    
+    def is_round_complete(self) -> bool:
+        """O(1) Prüfung ob die Runde vorzeitig beendet werden kann"""
+        return self._is_round_complete()
+    
+    def add_player(self, session_token: str, user_id: int, nickname: str, sid: str, points: int):
+        """Spieler hinzufügen (Reconnect: Stand in der laufenden Runde bleibt erhalten)"""
+        previous = self.players.get(session_token)
+        if previous:
+            self._uncount(previous)
+            self.sid_to_token.pop(previous['sid'], None)
+            self._record_delta('remove', key=previous['key'])
+        
+        self.players[session_token] = {
+            'key': self.next_player_key,
+            'user_id': user_id,
+            'nickname': nickname,
+            'sid': sid,
+            'answered': False,
+            'points': points,
+            'can_answer': True
+        }
+        self.next_player_key += 1
+        self.sid_to_token[sid] = session_token
+        
+        player = self.players[session_token]
+        if previous:
+            player['answered'] = previous['answered']
+            player['can_answer'] = previous['can_answer']
+        elif self.round_active:
             # Wenn Runde aktiv, kann neuer Spieler diese Runde nicht antworten
-            if self.round_active:
-                self.players[session_token]['can_answer'] = False
+            player['can_answer'] = False
+        if player['can_answer']:
+            self.eligible_count += 1
+            if player['answered']:
+                self.answered_count += 1
+        
+        self._record_delta('add', player=self._public_player(self.players[session_token]))
     
     def remove_player(self, session_token: str = None, sid: str = None) -> Optional[dict]:
         """Spieler entfernen"""
-        with self.lock:
-            # Token finden falls nur SID gegeben
-            if sid and not session_token:
-                session_token = self.sid_to_token.get(sid)
+        # Token finden falls nur SID gegeben
+        if sid and not session_token:
+            session_token = self.sid_to_token.get(sid)
+        
+        if not session_token:
+            return None
+        
+        player_info = None
+        if session_token in self.players:
+            player_info = self.players[session_token].copy()
+            del self.players[session_token]
+            self._uncount(player_info)
             
-            if not session_token:
-                return None
+            if player_info['sid'] in self.sid_to_token:
+                del self.sid_to_token[player_info['sid']]
             
-            player_info = None
-            if session_token in self.players:
-                player_info = self.players[session_token].copy()
-                del self.players[session_token]
-                
-                if player_info['sid'] in self.sid_to_token:
-                    del self.sid_to_token[player_info['sid']]
-                
-                if session_token in self.current_answers:
-                    del self.current_answers[session_token]
+            if session_token in self.current_answers:
+                del self.current_answers[session_token]
             
-            return player_info
+            self._record_delta('remove', key=player_info['key'])
+        
+        return player_info
+    
+    def player_count(self) -> int:
+        """Anzahl Spieler"""
+        return len(self.players)
+    
+    def get_stats(self) -> dict:
+        """Kennzahlen für /health (aus dem Snapshot, von überall lesbar)"""
+        snapshot = self.snapshot
+        return {
+            'lobby_id': snapshot.lobby_id,
+            'players': snapshot.players,
+            'round_active': snapshot.round_active,
+            'round_number': snapshot.round_number,
+            'answers': snapshot.answers
+        }
     
     def get_player_list(self):
         """Spielerliste holen"""
-        with self.lock:
-            return [
-                {
-                    'nickname': p['nickname'],
-                    'points': p['points'],
-                    'answered': p['answered'],
-                    'can_answer': p['can_answer']
-                }
-                for p in self.players.values()
-            ]
+        return [self._public_player(p) for p in self.players.values()]
     
     def start_new_round(self):
         """Neue Runde starten"""
-        with self.lock:
-            self.round_number += 1
-            self.current_round_id += 1  # ← NEU: Erhöhe Round-ID
-            round_id = self.current_round_id  # ← Speichere für Timer-Callback
-            self.round_active = True
-            self.current_answers = {}
-            
-            # Reset answered status
-            for player in self.players.values():
-                player['answered'] = False
-                player['can_answer'] = True
-            
-            # Zufälligen Wahlspruch wählen
-            self.current_wahlspruch = self.db_service.get_random_wahlspruch()
-            
-            if not self.current_wahlspruch:
-                self.round_active = False
-                return None
-            
-            self.current_quelle = self.current_wahlspruch.quelle
-            
-            logger.info(f"🕐 Starte 15-Sekunden Timer für Runde {self.round_number} (ID: {round_id})")
-            
-        # Timer AUSSERHALB des Locks starten
-        # ← WICHTIG: Übergebe round_id an den Callback
-        self.round_timer = eventlet.spawn_after(
-            15.0,
-            self._timer_callback,
-            round_id  # ← Round-ID mitgeben
-        )
+        self.round_number += 1
+        self.current_round_id += 1  # ← NEU: Erhöhe Round-ID
+        round_id = self.current_round_id  # ← Speichere für Timer-Callback
+        self.round_active = True
+        self.round_started_at = time.time()
+        self.current_answers = {}
+        self.answer_ms = {}
+        
+        # Reset answered status
+        for player in self.players.values():
+            player['answered'] = False
+            player['can_answer'] = True
+        self.eligible_count = len(self.players)
+        self.answered_count = 0
+        self._record_delta('round_reset')
+        
+        # Zufälligen Wahlspruch wählen
+        self.current_wahlspruch = self.db_service.get_random_wahlspruch()
+        
+        if not self.current_wahlspruch:
+            self.round_active = False
+            return None
+        
+        self.current_quelle = self.current_wahlspruch.quelle
+        
+        logger.info(f"🕐 [{self.room}] Starte 15-Sekunden Timer für Runde {self.round_number} (ID: {round_id})")
+        
+        self.schedule_round_timer(ROUND_SECONDS)
         
         return {
             'round_number': self.round_number,
@@ -116,222 +319,913 @@ class GameLobby:
             'wahlspruch_id': self.current_wahlspruch.id
         }
     
+    def schedule_round_timer(self, delay: float):
+        """Rundenende planen, ein evtl. noch laufender Timer ist überholt"""
+        # Der Timer reiht nur 'round_timeout' in den Lobby-Loop ein
+        # ← WICHTIG: Übergebe round_id an den Callback
+        if self.round_timer is not None:
+            self.round_timer.cancel()
+        self.round_timer = game_clock.schedule(
+            delay,
+            self.post,
+            'round_timeout',
+            self.current_round_id,  # ← Round-ID mitgeben
+            name='round'
+        )
+    
     def _timer_callback(self, expected_round_id):
-        """Interner Timer-Callback - prüft ob dies noch die aktuelle Runde ist"""
-        with self.lock:
-            if expected_round_id != self.current_round_id:
-                logger.info(f"⏹️  Timer für alte Runde {expected_round_id} ignoriert (aktuell: {self.current_round_id})")
-                return
-            
-            if not self.round_active:
-                logger.info("⏹️  Runde bereits beendet - Timer ignoriert")
-                return
-            
-            logger.info(f"⏰ 15 Sekunden sind um für Runde {self.round_number} - beende Runde")
+        """'round_timeout' im Lobby-Loop - prüft ob dies noch die aktuelle Runde ist (Absicherung, überholte Timer werden abgebrochen)"""
+        if expected_round_id != self.current_round_id:
+            logger.info(f"⏹️  Timer für alte Runde {expected_round_id} ignoriert (aktuell: {self.current_round_id})")
+            return
         
-        # Callback ausführen (außerhalb des Locks)
-        self.game_service_callback()
+        if not self.round_active:
+            logger.info("⏹️  Runde bereits beendet - Timer ignoriert")
+            return
+        
+        logger.info(f"⏰ [{self.room}] 15 Sekunden sind um für Runde {self.round_number} - beende Runde")
+        
+        self.game_service_callback(self)
     
     def submit_answer(self, session_token: str, partei: str):
-        """Antwort registrieren"""
-        with self.lock:
-            if not self.round_active:
-                return False, "Keine aktive Runde"
-            
-            if session_token not in self.players:
-                return False, "Nicht in der Lobby"
-            
-            player = self.players[session_token]
-            
-            if not player['can_answer']:
-                return False, "Du bist während der laufenden Runde beigetreten"
-            
-            if player['answered']:
-                return False, "Du hast bereits geantwortet"
-            
-            self.current_answers[session_token] = partei
-            player['answered'] = True
-            
-            return True, "Antwort registriert"
+        """
+        Antwort registrieren
+        
+        Returns:
+            (success, message, nickname, round_complete) - round_complete ist True wenn
+            damit alle antwortberechtigten Spieler geantwortet haben
+        """
+        if not self.round_active:
+            return False, "Keine aktive Runde", None, False
+        
+        if session_token not in self.players:
+            return False, "Nicht in der Lobby", None, False
+        
+        player = self.players[session_token]
+        
+        if not player['can_answer']:
+            return False, "Du bist während der laufenden Runde beigetreten", None, False
+        
+        if player['answered']:
+            return False, "Du hast bereits geantwortet", None, False
+        
+        self.current_answers[session_token] = partei
+        self.answer_ms[session_token] = int((time.time() - self.round_started_at) * 1000)
+        player['answered'] = True
+        self.answered_count += 1
+        self._record_delta('answered', key=player['key'])
+        
+        return True, "Antwort registriert", player['nickname'], self._is_round_complete()
     
     def end_round(self):
-        """Runde beenden"""
-        with self.lock:
-            if not self.round_active:
-                return None
-            
-            self.round_active = False
-            
-            if not self.current_wahlspruch:
-                return None
-            
-            correct_partei = self.current_wahlspruch.partei
-            results = []
+        """
+        Runde beenden
+        
+        Returns:
+            {'shared': ..., 'personal': {sid: ...}} oder None - shared geht an die ganze Lobby
+            (unabhängig von der Spielerzahl klein), personal einzeln an jeden Spieler.
+            Die vollständige Tabelle bleibt in last_results für get_round_results(),
+            history ist die Runde für das Runden-Ledger.
+        """
+        if not self.round_active:
+            return None
+        
+        self.round_active = False
+        self.round_ended_at = time.time()
+        
+        # Vorzeitiges Ende: Der 15-Sekunden Timer wird nicht mehr gebraucht
+        if self.round_timer is not None:
+            self.round_timer.cancel()
+        
+        if not self.current_wahlspruch:
+            return None
+        
+        correct_partei = self.current_wahlspruch.partei
+        results = []
+        winners = []  # Ergebnisse mit Punkten in dieser Runde
+        personal = {}  # sid -> eigenes Ergebnis
+        distribution: Dict[str, int] = {}  # partei -> anzahl antworten
+        point_changes = []  # (user_id, delta, neuer_punktestand)
+        history_answers = []  # (user_id, partei, ms) für das Runden-Ledger
+        eligible = 0
+        
+        # Ergebnisse berechnen
+        for session_token, player in self.players.items():
+            answered_partei = self.current_answers.get(session_token, None)
             
-            # Ergebnisse berechnen
-            for session_token, player in self.players.items():
-                answered_partei = self.current_answers.get(session_token, None)
-                
-                if player['can_answer']:
-                    is_correct = answered_partei == correct_partei if answered_partei else False
-                    points_earned = 1 if is_correct else 0
-                    
-                    if is_correct:
-                        new_points = player['points'] + points_earned
-                        self.db_service.update_user_points(player['user_id'], new_points)
-                        player['points'] = new_points
-                else:
-                    is_correct = None
-                    points_earned = 0
+            if player['can_answer']:
+                eligible += 1
+                if answered_partei:
+                    history_answers.append((player['user_id'], answered_partei, self.answer_ms.get(session_token)))
+                is_correct = answered_partei == correct_partei if answered_partei else False
+                points_earned = 1 if is_correct else 0
                 
-                results.append({
-                    'nickname': player['nickname'],
-                    'answered': answered_partei,
-                    'correct': is_correct,
-                    'points_earned': points_earned,
-                    'total_points': player['points'],
-                    'could_answer': player['can_answer']
-                })
+                if is_correct:
+                    new_points = player['points'] + points_earned
+                    point_changes.append((player['user_id'], points_earned, new_points))
+                    player['points'] = new_points
+            else:
+                is_correct = None
+                points_earned = 0
             
-            return {
+            if answered_partei:
+                distribution[answered_partei] = distribution.get(answered_partei, 0) + 1
+            
+            result = {
+                'nickname': player['nickname'],
+                'answered': answered_partei,
+                'correct': is_correct,
+                'points_earned': points_earned,
+                'total_points': player['points'],
+                'could_answer': player['can_answer']
+            }
+            results.append(result)
+            if player['sid']:
+                personal[player['sid']] = result  # nach einem Warmstart evtl. noch nicht wieder verbunden
+            if points_earned:
+                winners.append(result)
+        
+        # Nur ins Journal - DB-Write passiert nach dem Broadcast
+        self.db_service.queue_user_points(point_changes)
+        
+        if point_changes:
+            changed = {user_id for user_id, _, _ in point_changes}
+            self._record_delta('points', points={
+                str(p['key']): p['points'] for p in self.players.values() if p['user_id'] in changed
+            })
+        
+        # Vollständige Tabelle für das seitenweise Nachladen - sortiert wird erst bei der ersten Anfrage
+        self.last_results = results
+        self.last_results_sorted = False
+        self.last_results_round = self.round_number
+        
+        movers = [
+            {'nickname': r['nickname'], 'points_earned': r['points_earned'], 'total_points': r['total_points']}
+            for r in heapq.nlargest(ROUND_END_MOVERS, winners,
+                                    key=lambda r: (r['points_earned'], r['total_points']))
+        ]
+        
+        return {
+            'shared': {
+                'round_number': self.round_number,
                 'correct_partei': correct_partei,
-                'results': results,
-                'quelle': self.current_quelle
+                'quelle': self.current_quelle,
+                'distribution': distribution,
+                'answered': len(self.current_answers),
+                'correct': len(point_changes),
+                'players': len(results),
+                'movers': movers
+            },
+            'personal': personal,
+            'history': {
+                'wahlspruch_id': self.current_wahlspruch.id,
+                'partei': correct_partei,
+                'eligible': eligible,
+                'answers': history_answers
             }
+        }
+    
+    def get_round_results(self, page: int = 0, page_size: int = RESULTS_PAGE_SIZE) -> dict:
+        """Eine Seite der vollständigen Ergebnistabelle der letzten Runde"""
+        page_size = max(1, min(page_size, RESULTS_PAGE_SIZE_MAX))
+        page = max(0, page)
+        if not self.last_results_sorted:
+            # Gewinner zuerst, dann nach Gesamtpunkten
+            self.last_results.sort(key=lambda r: (-r['points_earned'], -r['total_points'], r['nickname']))
+            self.last_results_sorted = True
+        start = page * page_size
+        return {
+            'round_number': self.last_results_round,
+            'page': page,
+            'page_size': page_size,
+            'total': len(self.last_results),
+            'results': self.last_results[start:start + page_size]
+        }
+    
+    # ==================== CHECKPOINT ====================
+    
+    def export_state(self) -> dict:
+        """Zustand für den Warmstart (Format wie GameService._replay)"""
+        return {
+            'lobby_id': self.lobby_id,
+            'round_number': self.round_number,
+            'round_id': self.current_round_id,
+            'round_active': self.round_active,
+            'wahlspruch_id': self.current_wahlspruch.id if self.current_wahlspruch else None,
+            'round_at': self.round_started_at if self.round_active else self.round_ended_at,
+            'players': {
+                token: [p['user_id'], p['nickname'], p['points'], p['can_answer']]
+                for token, p in self.players.items()
+            },
+            'answers': dict(self.current_answers)
+        }
+    
+    def restore_state(self, state: dict, wahlspruch):
+        """
+        Zustand aus dem Checkpoint übernehmen, bevor der Lobby-Loop Befehle bekommt
+        
+        Die Spieler sind nach dem Neustart noch ohne Verbindung (sid None), bis sie
+        sich mit ihrem Token wieder anmelden.
+        """
+        self.round_number = state['round_number']
+        self.current_round_id = state['round_id']
+        self.round_active = state['round_active'] and wahlspruch is not None
+        self.current_wahlspruch = wahlspruch
+        self.current_quelle = wahlspruch.quelle if wahlspruch else None
+        if self.round_active:
+            self.round_started_at = state['round_at']
+        else:
+            self.round_ended_at = state['round_at']
+        
+        answers = state['answers'] if self.round_active else {}
+        for token, (user_id, nickname, points, can_answer) in state['players'].items():
+            self.players[token] = {
+                'key': self.next_player_key,
+                'user_id': user_id,
+                'nickname': nickname,
+                'sid': None,
+                'answered': token in answers,
+                'points': points,
+                'can_answer': can_answer
+            }
+            self.next_player_key += 1
+            if can_answer:
+                self.eligible_count += 1
+                if token in answers:
+                    self.current_answers[token] = answers[token]
+                    self.answered_count += 1
+        self.publish_snapshot()
 
 
 class GameService:
-    """Game Service - verwaltet Spiel-Logik"""
+    """
+    Game Service - verwaltet Spiel-Logik über mehrere Lobbies
+    
+    Die öffentlichen Methoden (add_player, submit_answer, ...) laufen in den
+    Socket.IO Handlern: Sie pflegen nur das Routing (Token/SID -> Lobby) und
+    reihen Befehle in den Lobby-Loop ein. Alles, was den Zustand einer Lobby
+    ändert, passiert in den _on_* Handlern im Loop der Lobby.
+    """
     
-    def __init__(self, db_service, socketio):
+    LEASE_TTL = 30.0  # Sekunden, Lease für die Runden-Uhr einer Lobby
+    
+    def __init__(self, db_service, socketio, max_players_per_lobby: int = None, state_store=None,
+                 checkpoint=None, history=None):
         self.db_service = db_service
         self.socketio = socketio
-        self.lobby = GameLobby(db_service, self.end_current_round)
+        self.state_store = state_store or MemoryStateStore()
+        self.worker_id = get_worker_id()
+        self.max_players_per_lobby = max_players_per_lobby or int(os.environ.get('LOBBY_MAX_PLAYERS', 50))
+        self.lobbies: Dict[int, GameLobby] = {}  # lobby_id -> lobby
+        self.token_to_lobby: Dict[str, int] = {}  # session_token -> lobby_id
+        self.token_to_sid: Dict[str, str] = {}  # session_token -> aktuelle sid
+        self.sid_to_token: Dict[str, str] = {}  # sid -> session_token
+        self.lock = threading.Lock()  # nur für Routing und Lobby-Auswahl, nicht im Antwort-Pfad
+        self.last_leaderboard: List[dict] = []  # Zuletzt gepushte Top-N
+        self.leaderboard_version = 0  # Version von last_leaderboard, Basis für leaderboard_delta
+        self.wire = WireFormat(socketio)  # JSON oder MessagePack pro Client
+        self.history = history  # RoundHistory (optional): Ledger + Auswertungen pro Wahlspruch/Partei
+        
+        # Befehle des Lobby-Loops
+        self.handlers = {
+            'join': self._on_join,
+            'leave': self._on_leave,
+            'answer': self._on_answer,
+            'player_list': self._on_player_list,
+            'round_results': self._on_round_results,
+            'round_timeout': GameLobby._timer_callback,
+            'start_round': self.auto_start_next_round,
+            'drop_offline': self._on_drop_offline,
+            'close': self._on_close
+        }
+        
+        # Warmstart: Lobbies und laufende Runden aus dem letzten Checkpoint
+        self.checkpoint = checkpoint
+        if checkpoint:
+            checkpoint.register('game', self)
     
-    def add_player(self, session_token: str, user_id: int, nickname: str, sid: str, points: int):
-        """Spieler zur Lobby hinzufügen"""
-        # Entferne falls schon drin (reconnect)
-        self.lobby.remove_player(session_token)
+    # ==================== LOBBY ZUWEISUNG ====================
+    
+    def _open_lobby(self, state: dict = None) -> GameLobby:
+        """Neue Lobby eröffnen (Lock muss gehalten werden, state: Zustand aus dem Checkpoint)"""
+        # Lobby-IDs kommen aus dem State Store und sind damit über alle Worker eindeutig
+        lobby_id = state['lobby_id'] if state else self.state_store.incr('lobby_seq')
+        lobby = GameLobby(self.db_service, self.end_current_round, lobby_id)
+        if state:
+            lobby.restore_state(state, self.db_service.corpus.get(state['wahlspruch_id']))
+        lobby.broadcaster = LobbyBroadcaster(self.socketio, lobby.room, wire=self.wire)
+        self.lobbies[lobby.lobby_id] = lobby
+        eventlet.spawn(lobby.run, self.handlers, self._after_batch)
+        logger.info(f"🏠 Neue Lobby eröffnet: {lobby.room} (Worker {self.worker_id})")
+        return lobby
+    
+    def _assign_lobby(self, preferred_id: int = None) -> GameLobby:
+        """
+        Lobby für einen neuen Spieler wählen (Lock muss gehalten werden)
         
-        # Hinzufügen
-        self.lobby.add_player(session_token, user_id, nickname, sid, points)
+        Bevorzugt die bisherige Lobby (Reconnect), sonst die vollste Lobby die noch
+        unter dem Limit liegt. Sind alle voll, wird eine neue Lobby eröffnet.
+        Gezählt wird nach Routing (members), damit noch wartende Joins mitzählen.
+        """
+        preferred = self.lobbies.get(preferred_id)
+        if preferred and preferred.members < self.max_players_per_lobby:
+            return preferred
         
-        # Spielerliste broadcasten
-        player_list = self.lobby.get_player_list()
-        self.socketio.emit('player_list_update', {'players': player_list})
+        candidates = [
+            (lobby.members, lobby.lobby_id, lobby)
+            for lobby in self.lobbies.values()
+        ]
+        candidates = [c for c in candidates if c[0] < self.max_players_per_lobby]
+        if candidates:
+            return max(candidates, key=lambda c: (c[0], -c[1]))[2]
         
-        # Anderen Bescheid geben
-        self.socketio.emit('player_joined', {
+        return self._open_lobby()
+    
+    def _close_if_empty(self, lobby: GameLobby):
+        """Lobby ohne Spieler aus der Auswahl nehmen, aufgeräumt wird im Lobby-Loop"""
+        with self.lock:
+            if lobby.members > 0 or self.lobbies.get(lobby.lobby_id) is not lobby:
+                return
+            del self.lobbies[lobby.lobby_id]
+        lobby.post('close')
+    
+    def _on_close(self, lobby: GameLobby):
+        """Letzter Befehl einer Lobby: Timer abbrechen, Puffer senden, Zustand freigeben"""
+        for timer in (lobby.round_timer, lobby.intermission_timer):
+            if timer is not None:
+                timer.cancel()
+        lobby.broadcaster.close()
+        self._log('close', lobby.lobby_id)
+        lobby.clock_lease_until = 0.0
+        self.state_store.delete(f"lobby:{lobby.lobby_id}")
+        self.state_store.release_lease(self._clock_key(lobby.lobby_id), self.worker_id)
+        logger.info(f"🏚️  Lobby geschlossen: {lobby.room}")
+    
+    # ==================== WARMSTART ====================
+    
+    def _log(self, *event):
+        """Event ans Checkpoint-Log (nur im Lobby-Loop aufrufen, damit die Reihenfolge stimmt)"""
+        if self.checkpoint:
+            self.checkpoint.append('game', *event)
+    
+    def _log_round(self, lobby: GameLobby):
+        self._log(
+            'round', lobby.lobby_id, lobby.round_number, lobby.current_round_id, lobby.round_active,
+            lobby.current_wahlspruch.id if lobby.current_wahlspruch else None,
+            lobby.round_started_at if lobby.round_active else lobby.round_ended_at
+        )
+    
+    def export_state(self) -> dict:
+        """Abschnitt 'game' des Checkpoints"""
+        return {'lobbies': [lobby.export_state() for lobby in list(self.lobbies.values())]}
+    
+    @staticmethod
+    def _replay(lobbies: Dict[str, dict], event: list):
+        """Event aus dem Checkpoint-Log auf den exportierten Zustand anwenden (idempotent)"""
+        op, lobby_id, *args = event
+        key = str(lobby_id)
+        if op == 'close':
+            lobbies.pop(key, None)
+            return
+        lobby = lobbies.setdefault(key, {
+            'lobby_id': lobby_id, 'round_number': 0, 'round_id': 0, 'round_active': False,
+            'wahlspruch_id': None, 'round_at': None, 'players': {}, 'answers': {}
+        })
+        if op == 'join':
+            token, user_id, nickname, points, can_answer = args
+            lobby['players'][token] = [user_id, nickname, points, can_answer]
+        elif op == 'leave':
+            lobby['players'].pop(args[0], None)
+            lobby['answers'].pop(args[0], None)
+        elif op == 'answer':
+            round_id, token, partei = args
+            if round_id == lobby['round_id']:
+                lobby['answers'][token] = partei
+        elif op == 'round':
+            round_number, round_id, active, wahlspruch_id, at = args
+            if round_id != lobby['round_id']:
+                # Neue Runde: wie start_new_round darf wieder jeder antworten
+                lobby['answers'] = {}
+                for player in lobby['players'].values():
+                    player[3] = True
+            lobby.update(round_number=round_number, round_id=round_id, round_active=active,
+                         wahlspruch_id=wahlspruch_id, round_at=at)
+    
+    def restore_state(self, state: Optional[dict], events: list, age: float):
+        """
+        Lobbies aus Snapshot + Log wiederherstellen
+        
+        Laufende Runden laufen mit ihrer Restzeit weiter, sonst startet die nächste
+        Runde nach der restlichen Pause. Die Spieler bekommen REJOIN_GRACE Sekunden,
+        um sich mit ihrem Token wieder anzumelden - sie landen in ihrer Lobby und
+        behalten ihren Stand in der Runde.
+        """
+        lobbies = {str(lobby['lobby_id']): lobby for lobby in (state or {}).get('lobbies', [])}
+        for _, event in events:
+            self._replay(lobbies, event)
+        
+        if age is None or age > CHECKPOINT_MAX_AGE:
+            logger.info(f"♻️  Checkpoint ist {age or 0:.0f}s alt - Lobbies werden nicht wiederhergestellt")
+            return
+        
+        restored = []
+        with self.lock:
+            for data in sorted(lobbies.values(), key=lambda lobby: lobby['lobby_id']):
+                if data['players']:
+                    restored.append(self._revive(data))
+            if restored:
+                self.state_store.set_counter('lobby_seq', restored[-1].lobby_id)
+        
+        for lobby in restored:
+            self._resume(lobby)
+            logger.info(f"♻️  {lobby.room} wiederhergestellt: Runde {lobby.round_number} "
+                        f"({'läuft' if lobby.round_active else 'Pause'}), {lobby.members} Spieler")
+    
+    def _revive(self, data: dict) -> GameLobby:
+        """Lobby aus exportiertem Zustand neu aufbauen, Spieler noch ohne Verbindung (Lock muss gehalten werden)"""
+        for token, player in data['players'].items():
+            player[2] = self.db_service.get_current_points(player[0], player[2])
+            self.token_to_lobby[token] = data['lobby_id']
+        lobby = self._open_lobby(data)
+        lobby.members = len(data['players'])
+        return lobby
+    
+    def _resume(self, lobby: GameLobby):
+        """Uhr einer wiederbelebten Lobby weiterlaufen lassen, Nachzügler nach REJOIN_GRACE entfernen"""
+        at = lobby.round_started_at if lobby.round_active else lobby.round_ended_at
+        elapsed = time.time() - at if at else 0.0
+        if lobby.round_active:
+            lobby.schedule_round_timer(max(0.0, ROUND_SECONDS - elapsed))
+        else:
+            self._schedule_intermission(lobby, max(0.0, INTERMISSION_SECONDS - elapsed))
+        game_clock.schedule(REJOIN_GRACE, lobby.post, 'drop_offline', name='rejoin')
+    
+    def _on_drop_offline(self, lobby: GameLobby):
+        """Nach einem Warmstart nicht zurückgekehrte Spieler entfernen"""
+        for token, player in list(lobby.players.items()):
+            if player['sid'] is not None:
+                continue
+            with self.lock:
+                if self.token_to_sid.get(token) is not None or self.token_to_lobby.get(token) != lobby.lobby_id:
+                    continue  # Beitritt ist schon unterwegs
+                del self.token_to_lobby[token]
+                lobby.members -= 1
+            self._on_leave(lobby, token, None, 'disconnect')
+        # Nicht aus dem eigenen Loop auf Platz in der eigenen Queue warten
+        eventlet.spawn(self._close_if_empty, lobby)
+    
+    # ==================== GETEILTER ZUSTAND ====================
+    
+    def _clock_key(self, lobby_id: int) -> str:
+        return f"clock:lobby-{lobby_id}"
+    
+    def _owns_clock(self, lobby: GameLobby) -> bool:
+        """Lease für die Runden-Uhr holen/verlängern - nur der Besitzer startet Runden"""
+        now = time.monotonic()
+        if lobby.clock_lease_until > now:
+            return True  # Lease ist noch sicher gültig, kein Aufruf am State Store
+        if self.state_store.acquire_lease(self._clock_key(lobby.lobby_id), self.worker_id, self.LEASE_TTL):
+            lobby.clock_lease_until = now + self.LEASE_TTL / 2
+            return True
+        logger.warning(f"⚠️  [{lobby.room}] Runden-Uhr gehört einem anderen Worker - keine neue Runde")
+        return False
+    
+    def _publish_lobby_state(self, lobby: GameLobby):
+        """
+        Lobby im State Store ablegen
+        
+        Im Multi-Worker Betrieb mit vollem Zustand (Spieler, Antworten, Runde wie
+        im Checkpoint), damit ein anderer Worker die Lobby übernehmen kann, wenn
+        dieser Prozess endet. Nur der Besitzer der Runden-Uhr veröffentlicht.
+        """
+        if lobby.clock_lease_until <= time.monotonic():
+            return
+        lobby.state_dirty = False
+        entry = {'worker': self.worker_id, 'updated_at': time.time(), 'stats': lobby.get_stats()}
+        if self.state_store.shared:
+            entry['state'] = lobby.export_state()
+        self.state_store.put(f"lobby:{lobby.lobby_id}", entry, ttl=CHECKPOINT_MAX_AGE)
+    
+    def publish_changed(self):
+        """Geänderte Lobbies veröffentlichen (nacheinander, jeder Aufruf geht an den State Store)"""
+        for lobby in list(self.lobbies.values()):
+            if lobby.state_dirty:
+                self._publish_lobby_state(lobby)
+    
+    def heartbeat(self):
+        """Leases verlängern und Lobby-Zustand veröffentlichen"""
+        for lobby in list(self.lobbies.values()):
+            if self.state_store.acquire_lease(self._clock_key(lobby.lobby_id), self.worker_id, self.LEASE_TTL):
+                lobby.clock_lease_until = time.monotonic() + self.LEASE_TTL / 2
+                lobby.state_dirty = True  # auch unveränderte Lobbies auffrischen (updated_at)
+        self.publish_changed()
+    
+    def start_heartbeat(self, interval: float = None):
+        """Heartbeat als Hintergrund-Greenlet starten, dazwischen alle STATE_PUBLISH_INTERVAL Sekunden veröffentlichen"""
+        interval = interval or self.LEASE_TTL / 3
+        
+        def _loop():
+            next_heartbeat = time.monotonic() + interval
+            while True:
+                eventlet.sleep(min(STATE_PUBLISH_INTERVAL, interval))
+                try:
+                    if time.monotonic() >= next_heartbeat:
+                        next_heartbeat = time.monotonic() + interval
+                        self.heartbeat()
+                    else:
+                        self.publish_changed()
+                except Exception as e:
+                    logger.exception(f"Fehler im Lobby-Heartbeat: {e}")
+        
+        return eventlet.spawn(_loop)
+    
+    def _adopt_lobby(self, lobby_id: int, token: str):
+        """
+        Lobby eines beendeten Workers übernehmen (Multi-Worker)
+        
+        Meldet sich ein Spieler mit einer Lobby, die hier nicht läuft, und steht er
+        in deren veröffentlichtem Zustand, wird die Lobby hier neu aufgebaut - sofern
+        die Lease frei ist oder ihr Besitzer nicht mehr läuft. Die übrigen Spieler
+        haben REJOIN_GRACE Sekunden, um nachzukommen.
+        """
+        entry = self.state_store.get(f"lobby:{lobby_id}")
+        if not entry or token not in entry.get('state', {}).get('players', {}):
+            return
+        owner = entry['worker']
+        if owner == self.worker_id or time.time() - entry['updated_at'] > CHECKPOINT_MAX_AGE:
+            return
+        replace = None if worker_alive(owner) else owner
+        if not self.state_store.acquire_lease(self._clock_key(lobby_id), self.worker_id, self.LEASE_TTL,
+                                              replace=replace):
+            return  # Lobby läuft noch auf ihrem Worker
+        
+        with self.lock:
+            if lobby_id in self.lobbies:
+                return  # Ein anderer Spieler war schneller
+            lobby = self._revive(entry['state'])
+            lobby.clock_lease_until = time.monotonic() + self.LEASE_TTL / 2
+        self._resume(lobby)
+        logger.info(f"🔁 {lobby.room} von Worker {owner} übernommen: Runde {lobby.round_number}, "
+                    f"{lobby.members} Spieler")
+    
+    def get_lobby_for_sid(self, sid: str) -> Optional[GameLobby]:
+        return self.get_lobby_for_token(self.sid_to_token.get(sid))
+    
+    def get_lobby_for_token(self, token: str) -> Optional[GameLobby]:
+        lobby_id = self.token_to_lobby.get(token)
+        return self.lobbies.get(lobby_id) if lobby_id else None
+    
+    def player_count(self) -> int:
+        """Spieler über alle Lobbies (aller Worker)"""
+        return sum(entry['players'] for entry in self.get_stats())
+    
+    def get_stats(self) -> list:
+        """Aufschlüsselung pro Lobby für /health (inkl. Lobbies anderer Worker)"""
+        stats = []
+        for lobby in list(self.lobbies.values()):
+            entry = lobby.get_stats()
+            entry['worker'] = self.worker_id
+            entry['queued'] = lobby.commands.qsize()
+            entry['broadcast'] = lobby.broadcaster.get_stats()
+            stats.append(entry)
+        if self.state_store.shared:
+            fresh = time.time() - self.LEASE_TTL
+            stats.extend(
+                dict(entry['stats'], worker=entry['worker'])
+                for entry in self.state_store.scan("lobby:").values()
+                if entry['worker'] != self.worker_id and entry['updated_at'] > fresh
+            )
+        return sorted(stats, key=lambda entry: entry['lobby_id'])
+    
+    # ==================== SPIELER (ROUTING) ====================
+    
+    def add_player(self, session_token: str, user_id: int, nickname: str, sid: str, points: int,
+                   wire_formats: list = None, lobby_id: int = None):
+        """
+        Spieler einer Lobby zuweisen
+        
+        Args:
+            wire_formats: vom Client angebotene Nachrichtenformate
+            lobby_id: bisherige Lobby laut Client - läuft sie auf einem beendeten
+                      Worker, wird sie hier übernommen
+        """
+        if (isinstance(lobby_id, int) and self.state_store.shared
+                and lobby_id not in self.lobbies and session_token not in self.token_to_lobby):
+            self._adopt_lobby(lobby_id, session_token)
+        
+        # Lobby wählen und Routing setzen (unter dem Service-Lock, damit die Lobby
+        # nicht zwischendurch als leer geschlossen wird)
+        with self.lock:
+            previous_id = self.token_to_lobby.get(session_token)
+            previous = self.lobbies.get(previous_id)
+            old_sid = self.token_to_sid.get(session_token)
+            if old_sid is not None:
+                self.sid_to_token.pop(old_sid, None)
+            if previous:
+                previous.members -= 1
+            lobby = self._assign_lobby(previous_id if previous_id is not None else lobby_id)
+            lobby.members += 1
+            self.token_to_lobby[session_token] = lobby.lobby_id
+            self.token_to_sid[session_token] = sid
+            self.sid_to_token[sid] = session_token
+        
+        # Reconnect in eine andere Lobby: dort still austragen
+        if previous and previous is not lobby:
+            previous.post('leave', session_token, None, None)
+            self._close_if_empty(previous)
+        
+        wire_format = self.wire.negotiate(sid, wire_formats)
+        lobby.post('join', session_token, user_id, nickname, sid, points, wire_format)
+    
+    def _unroute(self, token: str, sid: str = None) -> Optional[GameLobby]:
+        """
+        Routing eines Spielers entfernen
+        
+        Mit sid nur, wenn das noch seine aktuelle Verbindung ist (sonst ist er
+        schon über eine neue verbunden). Returns: bisherige Lobby oder None
+        """
+        with self.lock:
+            current_sid = self.token_to_sid.get(token)
+            if sid is not None:
+                self.sid_to_token.pop(sid, None)
+                if current_sid != sid:
+                    return None
+            lobby = self.lobbies.get(self.token_to_lobby.pop(token, None))
+            self.token_to_sid.pop(token, None)
+            self.sid_to_token.pop(current_sid, None)
+            if lobby:
+                lobby.members -= 1
+            return lobby
+    
+    def remove_player(self, token: str, sid: str, reason: str = 'request'):
+        """Spieler entfernen"""
+        token = token or self.sid_to_token.get(sid)
+        lobby = self._unroute(token) if token else None
+        if lobby:
+            lobby.post('leave', token, None, reason)
+            self._close_if_empty(lobby)
+    
+    def handle_disconnect(self, sid: str):
+        """Handle automatisches Disconnect"""
+        token = self.sid_to_token.get(sid)
+        lobby = self._unroute(token, sid) if token else None
+        if lobby:
+            lobby.post('leave', token, sid, 'disconnect')
+            self._close_if_empty(lobby)
+        else:
+            self.wire.forget(sid)
+    
+    def send_player_list_snapshot(self, sid: str):
+        """Vollständige Spielerliste an einen Client (z.B. nach erkannter Lücke)"""
+        lobby = self.get_lobby_for_sid(sid)
+        if lobby and not lobby.offer('player_list', sid):
+            self._reject(sid)
+    
+    def send_round_results(self, sid: str, page: int = 0, page_size: int = RESULTS_PAGE_SIZE):
+        """Eine Seite der vollständigen Ergebnistabelle der letzten Runde an einen Client"""
+        lobby = self.get_lobby_for_sid(sid)
+        if lobby and not lobby.offer('round_results', sid, page, page_size):
+            self._reject(sid)
+    
+    def submit_answer(self, token: str, partei: str, sid: str):
+        """Antwort abgeben"""
+        lobby = self.get_lobby_for_token(token)
+        if not lobby:
+            self.wire.emit_to_sid('error', {'message': 'Nicht in der Lobby'}, sid)
+            return
+        if not lobby.offer('answer', token, partei, sid):
+            self._reject(sid)
+    
+    def _reject(self, sid: str):
+        """Lobby-Queue voll: Client soll es gleich nochmal versuchen"""
+        self.wire.emit_to_sid('error', {'message': 'Server ausgelastet - bitte nochmal versuchen'}, sid)
+    
+    # ==================== SPIELER (LOBBY-LOOP) ====================
+    
+    def _on_join(self, lobby: GameLobby, session_token: str, user_id: int, nickname: str, sid: str,
+                 points: int, wire_format: str):
+        """Beitritt im Lobby-Loop"""
+        # Reconnect in dieselbe Lobby: alte Verbindung aus den Räumen nehmen
+        old_info = lobby.players.get(session_token)
+        if old_info and old_info['sid']:
+            self.wire.leave(old_info['sid'], lobby.room)
+        
+        if not self.socketio.server.manager.is_connected(sid, '/'):
+            # Schon wieder getrennt - der Disconnect hat das Routing bereits entfernt
+            if lobby.remove_player(session_token):
+                self._log('leave', lobby.lobby_id, session_token)
+            logger.info(f"🔌 {nickname} war vor dem Beitritt zu {lobby.room} schon getrennt")
+            return
+        
+        lobby.add_player(session_token, user_id, nickname, sid, points)
+        self.wire.enter(sid, lobby.room)
+        self._log('join', lobby.lobby_id, session_token, user_id, nickname, points,
+                  lobby.players[session_token]['can_answer'])
+        
+        # Spielerliste: Delta an die Lobby, Snapshot an den neuen Spieler
+        snapshot = lobby.get_player_list_snapshot()
+        self.flush_player_deltas(lobby)
+        
+        # Anderen Bescheid geben (gebündelt, der Client ignoriert sich selbst)
+        lobby.broadcaster.queue('player_joined', {
             'nickname': nickname,
             'points': points
-        }, skip_sid=sid)
+        })
         
-        # Success an Spieler senden
-        self.socketio.emit('join_success', {
-            'players': player_list,
+        # Success an Spieler senden (mit Spielerliste - im ausgehandelten Format)
+        self.wire.emit_to_sid('join_success', {
+            'players': snapshot['players'],
+            'players_seq': snapshot['seq'],
             'your_nickname': nickname,
-            'round_active': self.lobby.round_active,
-            'round_number': self.lobby.round_number
-        }, room=sid)
+            'lobby_id': lobby.lobby_id,
+            'round_active': lobby.round_active,
+            'round_number': lobby.round_number,
+            'wire': wire_format
+        }, sid)
         
         # Wenn aktive Runde, sende Wahlspruch
-        if self.lobby.round_active and self.lobby.current_wahlspruch:
-            self.socketio.emit('new_round', {
-                'round_number': self.lobby.round_number,
-                'wahlspruch': self.lobby.current_wahlspruch.spruch,
-                'wahlspruch_id': self.lobby.current_wahlspruch.id
-            }, room=sid)
+        if lobby.round_active and lobby.current_wahlspruch:
+            self.wire.emit_to_sid('new_round', {
+                'round_number': lobby.round_number,
+                'wahlspruch': lobby.current_wahlspruch.spruch,
+                'wahlspruch_id': lobby.current_wahlspruch.id
+            }, sid)
         
         # Erste Runde starten wenn erster Spieler
-        if len(self.lobby.players) == 1 and not self.lobby.round_active:
-            round_data = self.lobby.start_new_round()
-            if round_data:
-                self.socketio.emit('new_round', round_data)
+        if lobby.player_count() == 1 and not lobby.round_active:
+            self._start_round(lobby)
         
-        logger.info(f"✅ {nickname} ist beigetreten")
+        logger.info(f"✅ {nickname} ist {lobby.room} beigetreten")
     
-    def remove_player(self, token: str, sid: str, reason: str = 'request'):
-        """Spieler entfernen"""
-        player_info = self.lobby.remove_player(token, sid)
+    def _on_leave(self, lobby: GameLobby, token: str, sid: Optional[str], reason: Optional[str]):
+        """
+        Verlassen im Lobby-Loop
         
-        if player_info:
-            nickname = player_info['nickname']
-            
-            # Anderen Bescheid geben
-            self.socketio.emit('player_left', {
-                'nickname': nickname,
+        Args:
+            sid: nur entfernen, wenn der Spieler noch mit dieser Verbindung drin ist
+            reason: None = still (Wechsel in eine andere Lobby), sonst an alle gemeldet
+        """
+        player = lobby.players.get(token)
+        if not player or (sid is not None and player['sid'] != sid):
+            if reason == 'disconnect':
+                self.wire.forget(sid)
+            return
+        
+        player_info = lobby.remove_player(token)
+        self._log('leave', lobby.lobby_id, token)
+        if player_info['sid']:
+            self.wire.leave(player_info['sid'], lobby.room)
+        if reason == 'disconnect':
+            self.wire.forget(sid)
+        
+        # Anderen Bescheid geben
+        if reason is not None:
+            lobby.broadcaster.queue('player_left', {
+                'nickname': player_info['nickname'],
                 'reason': reason
             })
-            
-            # Spielerliste updaten
-            player_list = self.lobby.get_player_list()
-            self.socketio.emit('player_list_update', {'players': player_list})
-            
-            logger.info(f"👋 {nickname} hat verlassen ({reason})")
-    
-    def handle_disconnect(self, sid: str):
-        """Handle automatisches Disconnect"""
-        player_info = self.lobby.remove_player(sid=sid)
         
-        if player_info:
-            nickname = player_info['nickname']
-            
-            self.socketio.emit('player_left', {
-                'nickname': nickname,
-                'reason': 'disconnect'
-            })
-            
-            player_list = self.lobby.get_player_list()
-            self.socketio.emit('player_list_update', {'players': player_list})
-            
-            logger.info(f"🔌 {nickname} disconnected")
+        # Spielerliste updaten
+        self.flush_player_deltas(lobby)
+        
+        # Haben jetzt alle verbliebenen Spieler geantwortet? Dann nicht auf den Timer warten
+        if lobby.is_round_complete():
+            logger.info(f"✅ [{lobby.room}] Alle verbliebenen Spieler haben geantwortet - beende Runde vorzeitig")
+            self.end_current_round(lobby)
+        
+        if reason == 'disconnect':
+            logger.info(f"🔌 {player_info['nickname']} disconnected ({lobby.room})")
+        else:
+            logger.info(f"👋 {player_info['nickname']} hat {lobby.room} verlassen ({reason or 'Lobbywechsel'})")
     
-    def submit_answer(self, token: str, partei: str, sid: str):
-        """Antwort abgeben"""
-        success, message = self.lobby.submit_answer(token, partei)
+    def _on_answer(self, lobby: GameLobby, token: str, partei: str, sid: str):
+        """Antwort im Lobby-Loop (Spielerliste geht gesammelt nach dem Schub raus)"""
+        success, message, nickname, round_complete = lobby.submit_answer(token, partei)
         
         if success:
-            player = self.lobby.players[token]
+            self._log('answer', lobby.lobby_id, lobby.current_round_id, token, partei)
             
             # Bestätigung an Spieler
-            self.socketio.emit('answer_accepted', {'partei': partei}, room=sid)
-            
-            # Anderen Bescheid geben
-            self.socketio.emit('player_answered', {
-                'nickname': player['nickname']
-            }, skip_sid=sid)
-            
-            # Spielerliste updaten
-            player_list = self.lobby.get_player_list()
-            self.socketio.emit('player_list_update', {'players': player_list})
+            self.wire.emit_to_sid('answer_accepted', {'partei': partei}, sid)
             
-            logger.info(f"✓ {player['nickname']} antwortete: {partei}")
+            # Anderen Bescheid geben (gebündelt, der Client ignoriert sich selbst)
+            lobby.broadcaster.queue('player_answered', {
+                'nickname': nickname
+            })
             
-            # Prüfen ob alle geantwortet haben und Runde beenden
-            players_who_can_answer = [p for p in self.lobby.players.values() if p['can_answer']]
-            all_answered = all(p['answered'] for p in players_who_can_answer)
+            logger.info(f"✓ {nickname} antwortete: {partei}")
             
-            if all_answered and len(players_who_can_answer) > 0:
-                logger.info("✅ Alle Spieler haben geantwortet - beende Runde vorzeitig")
-                # Runde sofort beenden (Timer wird durch round_active=False ignoriert)
-                self.end_current_round()
+            # Alle haben geantwortet? (O(1), im selben Befehl entschieden)
+            if round_complete:
+                logger.info(f"✅ [{lobby.room}] Alle Spieler haben geantwortet - beende Runde vorzeitig")
+                # Runde sofort beenden (end_round bricht den Runden-Timer ab)
+                self.end_current_round(lobby)
         else:
-            self.socketio.emit('error', {'message': message}, room=sid)
+            self.wire.emit_to_sid('error', {'message': message}, sid)
+    
+    def _on_player_list(self, lobby: GameLobby, sid: str):
+        self.wire.emit_to_sid('player_list_snapshot', lobby.get_player_list_snapshot(), sid)
+    
+    def _on_round_results(self, lobby: GameLobby, sid: str, page: int, page_size: int):
+        self.wire.emit_to_sid('round_results_page', lobby.get_round_results(page, page_size), sid)
+    
+    def _after_batch(self, lobby: GameLobby):
+        """Nach jedem Schub des Lobby-Loops: gesammelte Deltas senden, Snapshot ersetzen"""
+        self.flush_player_deltas(lobby)
+        lobby.publish_snapshot()
+        lobby.state_dirty = True
     
-    def auto_start_next_round(self):
+    def flush_player_deltas(self, lobby: GameLobby):
+        """Offene Spielerlisten-Deltas der Lobby broadcasten"""
+        deltas = lobby.drain_deltas()
+        if deltas:
+            lobby.broadcaster.queue('player_list_delta', {'deltas': deltas})
+    
+    # ==================== RUNDEN ====================
+    
+    def auto_start_next_round(self, lobby: GameLobby):
         """Nächste Runde automatisch starten"""
-        if len(self.lobby.players) > 0:
-            round_data = self.lobby.start_new_round()
-            if round_data:
-                self.socketio.emit('new_round', round_data)
+        if self.lobbies.get(lobby.lobby_id) is not lobby:
+            return  # Lobby wurde inzwischen geschlossen
+        if lobby.player_count() > 0:
+            self._start_round(lobby)
+    
+    def _start_round(self, lobby: GameLobby):
+        """Runde starten - nur wenn dieser Prozess die Runden-Uhr der Lobby besitzt"""
+        if not self._owns_clock(lobby):
+            return
+        if lobby.intermission_timer is not None:
+            lobby.intermission_timer.cancel()  # Runde startet schon, der Pausen-Timer ist überholt
+        start = time.perf_counter()
+        round_data = lobby.start_new_round()
+        self._log_round(lobby)
+        if round_data:
+            # Offene Spielerlisten-Deltas zuerst, damit sie nicht nach new_round ankommen
+            self.flush_player_deltas(lobby)
+            lobby.broadcaster.send_now('new_round', round_data)
+            metrics.observe('round_start_seconds', time.perf_counter() - start)
+            metrics.inc('rounds_started_total')
+            lobby.publish_snapshot()
+    
+    @staticmethod
+    def leaderboard_diff(old: List[dict], new: List[dict]) -> tuple:
+        """Geänderte Einträge und weggefallene Ränge -> (changed, removed)"""
+        changed = [entry for i, entry in enumerate(new) if i >= len(old) or old[i] != entry]
+        removed = [entry['rank'] for entry in old[len(new):]]
+        return changed, removed
     
-    def end_current_round(self):
-        """Aktuelle Runde beenden"""
-        result = self.lobby.end_round()
+    def push_leaderboard_if_changed(self, limit: int = 10):
+        """
+        Nur die geänderten Ränge an alle Lobbies senden, wenn sich die Top-N verändert haben
+        
+        leaderboard_delta ist nicht dringend und geht mit dem nächsten Tick des
+        Lobby-Broadcasters raus (im Format des jeweiligen Clients). Passt die Version
+        beim Client nicht, holt er sich per request_leaderboard die volle Liste.
+        """
+        leaderboard = self.db_service.get_leaderboard(limit=limit)
+        changed, removed = self.leaderboard_diff(self.last_leaderboard, leaderboard)
+        if not changed and not removed:
+            return
+        self.last_leaderboard = leaderboard
+        self.leaderboard_version += 1
+        delta = {'version': self.leaderboard_version, 'changed': changed, 'removed': removed}
+        for lobby in list(self.lobbies.values()):
+            lobby.broadcaster.queue('leaderboard_delta', delta)
+    
+    def get_leaderboard_snapshot(self) -> dict:
+        """Volle Top-N mit Version (Antwort auf request_leaderboard)"""
+        self.push_leaderboard_if_changed()
+        return {'leaderboard': self.last_leaderboard, 'version': self.leaderboard_version}
+    
+    def end_current_round(self, lobby: GameLobby):
+        """Aktuelle Runde einer Lobby beenden"""
+        start = time.perf_counter()
+        result = lobby.end_round()
         
         if result:
-            # Ergebnisse senden
-            self.socketio.emit('round_end', result)
+            self._log_round(lobby)
+            # Offene Spielerlisten-Deltas zuerst, damit sie nicht nach round_end ankommen
+            self.flush_player_deltas(lobby)
+            # Ergebnisse senden: gemeinsamer Teil an alle, eigenes Ergebnis einzeln
+            lobby.broadcaster.send_now('round_end', result['shared'])
+            for sid, own_result in result['personal'].items():
+                self.wire.emit_to_sid('round_result', own_result, sid)
+            metrics.observe('round_end_seconds', time.perf_counter() - start)
+            metrics.inc('rounds_ended_total')
+            lobby.publish_snapshot()
+            
+            # Runde ans Ledger anhängen und in die Auswertungen einrechnen
+            if self.history:
+                self.history.record(lobby.lobby_id, lobby.round_number, result['history'])
             
-            # Nach 5 Sekunden nächste Runde - EVENTLET VERSION
-            eventlet.spawn_after(5.0, self.auto_start_next_round)
\ No newline at end of file
+            # Leaderboard nur pushen wenn sich die Top-N geändert haben
+            self.push_leaderboard_if_changed()
+            
+            # Punkte gesammelt in die DB schreiben (außerhalb des kritischen Pfads)
+            eventlet.spawn(self.db_service.flush_user_points)
+            
+            # Nach 5 Sekunden nächste Runde - über die gemeinsame Spieluhr in den Lobby-Loop
+            self._schedule_intermission(lobby, INTERMISSION_SECONDS)
+    
+    def _schedule_intermission(self, lobby: GameLobby, delay: float):
+        lobby.intermission_timer = game_clock.schedule(delay, lobby.post, 'start_round', name='intermission')
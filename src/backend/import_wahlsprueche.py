@@ -2,13 +2,51 @@
 """
 Wahlsprüche Importer für WahlplakatGame Web-Version
 Importiert Wahlsprüche aus JSON-Datei in die Datenbank
+
+Verwendung:
+    python import_wahlsprueche.py [datei.json]                  # einzeln, mit Ausgabe pro Spruch
+    python import_wahlsprueche.py --bulk [datei.json]           # schneller Massenimport
+    python import_wahlsprueche.py --dry-run [datei.json]        # nur Statistik, schreibt nichts
 """
 
+import re
 import json
 import sys
 import os
+import time
+import hashlib
+import argparse
+import unicodedata
 from datetime import datetime
-from database import DatabaseService
+import sqlalchemy
+from database import DatabaseService, get_database_url
+
+
+def parse_metadata(spruch: str, metadata: str) -> dict:
+    """Metadaten "Partei, Wahl, Datum, Quelle" in Wahlspruch-Felder zerlegen"""
+    parts = [p.strip() for p in metadata.split(',')]
+    
+    partei = parts[0] if len(parts) > 0 else None
+    wahl = parts[1] if len(parts) > 1 else None
+    datum_str = parts[2] if len(parts) > 2 else None
+    quelle = parts[3] if len(parts) > 3 else None
+    
+    # Convert date string to date object
+    datum = None
+    if datum_str:
+        try:
+            datum = datetime.strptime(datum_str, "%d.%m.%Y").date()
+        except ValueError:
+            print(f"⚠️  Ungültiges Datum '{datum_str}' für: {spruch[:50]}...")
+    
+    return {
+        "spruch": spruch,
+        "partei": partei,
+        "wahl": wahl,
+        "datum": datum,
+        "quelle": quelle
+    }
+
 
 def import_wahlsprueche_from_json(json_filepath: str):
     """
@@ -53,29 +91,15 @@ def import_wahlsprueche_from_json(json_filepath: str):
         # Parse dictionary (key = Spruch, value = Metadata)
         for spruch, metadata in item.items():
             try:
-                # Parse metadata: "Partei, Wahl, Datum, Quelle"
-                parts = [p.strip() for p in metadata.split(',')]
-                
-                partei = parts[0] if len(parts) > 0 else None
-                wahl = parts[1] if len(parts) > 1 else None
-                datum_str = parts[2] if len(parts) > 2 else None
-                quelle = parts[3] if len(parts) > 3 else None
-                
-                # Convert date string to date object
-                datum = None
-                if datum_str:
-                    try:
-                        datum = datetime.strptime(datum_str, "%d.%m.%Y").date()
-                    except ValueError:
-                        print(f"⚠️  Ungültiges Datum '{datum_str}' für: {spruch[:50]}...")
+                fields = parse_metadata(spruch, metadata)
                 
                 # Create Wahlspruch
                 success = db.create_new_wahlspruch(
-                    text=spruch,
-                    partei=partei,
-                    wahl=wahl,
-                    datum=datum,
-                    quelle=quelle
+                    text=fields['spruch'],
+                    partei=fields['partei'],
+                    wahl=fields['wahl'],
+                    datum=fields['datum'],
+                    quelle=fields['quelle']
                 )
                 
                 if success:
@@ -84,7 +108,7 @@ def import_wahlsprueche_from_json(json_filepath: str):
                 else:
                     stats['skipped'] += 1
                     print(f"⊘ Übersprungen (existiert bereits): {spruch[:60]}...")
-                    
+            
             except Exception as e:
                 stats['errors'] += 1
                 print(f"✗ Fehler bei '{spruch[:50]}...': {str(e)}")
@@ -102,15 +126,228 @@ def import_wahlsprueche_from_json(json_filepath: str):
     return stats
 
 
+# ==================== BULK IMPORT ====================
+
+WHITESPACE = re.compile(r'\s+')
+TRIM_CHARS = ' .!?…"\'„“”«»'
+
+
+def normalize_spruch(text: str) -> str:
+    """Spruch für die Duplikat-Erkennung normalisieren (Unicode, Groß/Klein, Leerzeichen, Satzzeichen am Rand)"""
+    text = unicodedata.normalize('NFKC', text).casefold()
+    return WHITESPACE.sub(' ', text).strip(TRIM_CHARS)
+
+
+def spruch_key(text: str) -> bytes:
+    """Kompakter Schlüssel für das Duplikat-Set (16 Byte statt ganzem Text)"""
+    return hashlib.blake2b(normalize_spruch(text).encode('utf-8'), digest_size=16).digest()
+
+
+def iter_json_array(filepath: str, key: str = 'wahlsprueche', chunk_size: int = 1 << 16):
+    """
+    Elemente des Arrays data[key] einzeln aus der Datei lesen (ohne die ganze Datei zu laden)
+    
+    Die Datei wird blockweise gelesen, jedes Element mit JSONDecoder.raw_decode dekodiert.
+    """
+    decoder = json.JSONDecoder()
+    with open(filepath, 'r', encoding='utf-8') as file:
+        buffer = ''
+        eof = False
+        
+        def read_more() -> bool:
+            nonlocal buffer, eof
+            chunk = file.read(chunk_size)
+            if not chunk:
+                eof = True
+                return False
+            buffer += chunk
+            return True
+        
+        # Anfang des Arrays suchen
+        marker = f'"{key}"'
+        while True:
+            start = buffer.find(marker)
+            if start >= 0:
+                bracket = buffer.find('[', start + len(marker))
+                if bracket >= 0:
+                    buffer = buffer[bracket + 1:]
+                    break
+            if not read_more():
+                raise ValueError(f"Kein Array '{key}' in {filepath} gefunden")
+        
+        pos = 0
+        while True:
+            # Trennzeichen überspringen
+            while True:
+                while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                    pos += 1
+                if pos < len(buffer) or not read_more():
+                    break
+            if pos >= len(buffer):
+                raise ValueError("Unerwartetes Dateiende im JSON-Array")
+            if buffer[pos] == ']':
+                return
+            
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # Element ist noch nicht vollständig im Puffer
+                if eof:
+                    raise
+                buffer = buffer[pos:]
+                pos = 0
+                read_more()
+                continue
+            
+            yield item
+            pos = end
+            if pos > chunk_size:
+                buffer = buffer[pos:]
+                pos = 0
+
+
+def read_existing_sprueche_readonly() -> list:
+    """
+    Bestehende Sprüche für den Dry-Run lesen - ohne DatabaseService, also ohne
+    Tabellen anzulegen oder Migrationen auszuführen
+    """
+    url = sqlalchemy.engine.make_url(get_database_url())
+    if url.get_backend_name() == 'sqlite':
+        if not url.database or not os.path.exists(url.database):
+            return []  # Noch keine Datenbank: alles wäre neu
+        # SQLite nur lesend öffnen (legt auch keine leere Datei an)
+        url = url.set(database=f"file:{url.database}?mode=ro", query={'uri': 'true'})
+    engine = sqlalchemy.create_engine(url)
+    try:
+        with engine.connect() as conn:
+            if not sqlalchemy.inspect(conn).has_table('wahlspruch'):
+                return []
+            return list(conn.execute(sqlalchemy.text("SELECT spruch FROM wahlspruch")).scalars())
+    finally:
+        engine.dispose()
+
+
+def bulk_import_wahlsprueche(json_filepath: str, batch_size: int = 1000, dry_run: bool = False):
+    """
+    Massenimport: Streaming-Parser, Duplikat-Set im Speicher, Multi-Row INSERTs in einer Transaktion
+    
+    Args:
+        json_filepath: Pfad zur JSON-Datei
+        batch_size: Zeilen pro INSERT
+        dry_run: nur zählen, nichts schreiben
+    
+    Returns:
+        Dictionary mit Import-Statistiken
+    """
+    if not os.path.exists(json_filepath):
+        print(f"❌ Datei nicht gefunden: {json_filepath}")
+        return None
+    
+    print("🗄️  Verbinde mit Datenbank..." + (" (nur lesend)" if dry_run else ""))
+    
+    # Bestehende Sprüche einmalig als Hash-Set laden statt pro Spruch zu suchen
+    if dry_run:
+        db = None
+        seen = {spruch_key(spruch) for spruch in read_existing_sprueche_readonly()}
+    else:
+        db = DatabaseService()
+        seen = {spruch_key(row['spruch']) for row in db.read_rows("wahlspruch", ['spruch'])}
+    print(f"📚 {len(seen)} bestehende Wahlsprüche geladen")
+    
+    stats = {
+        'total': 0,
+        'created': 0,
+        'duplicates_db': 0,
+        'duplicates_file': 0,
+        'errors': 0
+    }
+    file_keys = set()
+    start = time.perf_counter()
+
+    def report(final: bool = False):
+        elapsed = time.perf_counter() - start
+        rate = stats['total'] / elapsed if elapsed > 0 else 0
+        label = "Fertig" if final else "Fortschritt"
+        print(f"⏱️  {label}: {stats['total']} gelesen, {stats['created']} neu, "
+              f"{stats['duplicates_db'] + stats['duplicates_file']} doppelt, "
+              f"{stats['errors']} Fehler - {rate:.0f} Einträge/s")
+    
+    def batches():
+        batch = []
+        for item in iter_json_array(json_filepath):
+            for spruch, metadata in item.items():
+                stats['total'] += 1
+                try:
+                    fields = parse_metadata(spruch, metadata)
+                except Exception as e:
+                    stats['errors'] += 1
+                    print(f"✗ Fehler bei '{spruch[:50]}...': {str(e)}")
+                    continue
+                
+                key = spruch_key(spruch)
+                if key in seen:
+                    stats['duplicates_file' if key in file_keys else 'duplicates_db'] += 1
+                    continue
+                seen.add(key)
+                file_keys.add(key)
+                
+                batch.append(fields)
+                stats['created'] += 1
+                if len(batch) >= batch_size:
+                    yield batch
+                    report()
+                    batch = []
+        if batch:
+            yield batch
+    
+    if dry_run:
+        print("🔍 Dry-Run: es wird nichts geschrieben\n")
+        for _ in batches():
+            pass
+    else:
+        try:
+            db.bulk_create_wahlsprueche(batches())
+        except Exception as e:
+            # Eine Transaktion: bei Fehlern wird nichts geschrieben
+            print(f"❌ Import abgebrochen, nichts geschrieben: {str(e)}")
+            stats['errors'] += 1
+            stats['created'] = 0
+            return stats
+    
+    elapsed = time.perf_counter() - start
+    report(final=True)
+    
+    # Print summary
+    print("\n" + "="*70)
+    print("BULK IMPORT ZUSAMMENFASSUNG" + (" (DRY-RUN)" if dry_run else ""))
+    print("="*70)
+    print(f"Gesamt Einträge:       {stats['total']}")
+    print(f"{'Würde erstellt:' if dry_run else 'Neu erstellt:':<23}{stats['created']}")
+    print(f"Bereits in DB:         {stats['duplicates_db']}")
+    print(f"Doppelt in Datei:      {stats['duplicates_file']}")
+    print(f"Fehler:                {stats['errors']}")
+    print(f"Dauer:                 {elapsed:.2f}s ({stats['total'] / elapsed if elapsed > 0 else 0:.0f} Einträge/s)")
+    print("="*70)
+    
+    return stats
+
+
 def main():
     """Main function"""
     print("=" * 70)
     print("🗳️  WahlplakatGame - Wahlsprüche Importer")
     print("=" * 70 + "\n")
     
+    parser = argparse.ArgumentParser(description="Wahlsprüche aus JSON-Datei importieren")
+    parser.add_argument('json_file', nargs='?', help="Pfad zur JSON-Datei")
+    parser.add_argument('--bulk', action='store_true', help="Massenimport (Streaming, Batch-INSERTs, eine Transaktion)")
+    parser.add_argument('--dry-run', action='store_true', help="Nur Statistik ausgeben, nichts schreiben (Bulk-Pfad)")
+    parser.add_argument('--batch-size', type=int, default=1000, help="Zeilen pro INSERT im Bulk-Modus")
+    args = parser.parse_args()
+    
     # Get JSON file path from command line or use default
-    if len(sys.argv) > 1:
-        json_file = sys.argv[1]
+    if args.json_file:
+        json_file = args.json_file
     else:
         # Try default locations
         possible_paths = [
@@ -128,13 +365,16 @@ def main():
         if not json_file:
             print("❌ Keine JSON-Datei gefunden!")
             print("\nVerwendung:")
-            print(f"  python {sys.argv[0]} <pfad-zur-json-datei>")
+            print(f"  python {sys.argv[0]} [--bulk] [--dry-run] [--batch-size N] <pfad-zur-json-datei>")
             print("\nBeispiel:")
             print(f"  python {sys.argv[0]} ../../Docs/wahlsprüche.json")
             sys.exit(1)
     
     # Import
-    result = import_wahlsprueche_from_json(json_file)
+    if args.bulk or args.dry_run:
+        result = bulk_import_wahlsprueche(json_file, batch_size=max(args.batch_size, 1), dry_run=args.dry_run)
+    else:
+        result = import_wahlsprueche_from_json(json_file)
     
     if result:
         print("\n✅ Import abgeschlossen!")
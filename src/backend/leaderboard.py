@@ -0,0 +1,165 @@
+import bisect
+import threading
+import logging
+from typing import Dict, List, Optional, Tuple
+import eventlet
+
+logger = logging.getLogger(__name__)
+
+
+class LeaderboardEntry:
+    """Eintrag im Leaderboard (ohne DB-Bindung)"""
+
+    __slots__ = ('id', 'nickname', 'points')
+
+    def __init__(self, id: int, nickname: str, points: int):
+        self.id = id
+        self.nickname = nickname
+        self.points = points or 0
+
+
+class LeaderboardIndex:
+    """
+    Sortierter In-Memory Index aller User nach Punkten
+
+    Wird einmalig aus der DB geseedet und danach bei jeder Punktänderung
+    in-place aktualisiert. Sortierschlüssel ist (-punkte, user_id), damit die
+    Reihenfolge bei Gleichstand stabil bleibt.
+    """
+
+    def __init__(self, db_service):
+        self.db_service = db_service
+        self.entries: Dict[int, LeaderboardEntry] = {}  # user_id -> entry
+        self.keys: List[Tuple[int, int]] = []  # sortiert: (-points, user_id)
+        self.loaded = False
+        self.version = 0  # bei jeder Änderung erhöht (Checkpoint exportiert nur dann neu)
+        self.lock = threading.Lock()
+
+    def _ensure_loaded(self):
+        if self.loaded:
+            return
+        rows = self.db_service.read_rows("user", ['id', 'nickname', 'points'])
+        previous = self.entries
+        self.entries = {row['id']: LeaderboardEntry(**row) for row in rows}
+        # Punkte steigen nur - noch nicht geschriebene lokale Stände behalten
+        for user_id, entry in previous.items():
+            if user_id in self.entries and entry.points > self.entries[user_id].points:
+                self.entries[user_id].points = entry.points
+        self.keys = sorted((-e.points, e.id) for e in self.entries.values())
+        self.loaded = True
+        self.version += 1
+        logger.info(f"🏆 Leaderboard geladen: {len(self.entries)} User")
+
+    def load(self):
+        """Index (neu) aus der DB laden"""
+        with self.lock:
+            self.loaded = False
+            self._ensure_loaded()
+
+    def start_interval_reload(self, interval: float):
+        """Index periodisch neu laden (Multi-Worker: Punkte anderer Prozesse übernehmen)"""
+        def _loop():
+            while True:
+                eventlet.sleep(interval)
+                try:
+                    self.load()
+                except Exception as e:
+                    logger.exception(f"Fehler beim Neuladen des Leaderboards: {e}")
+
+        return eventlet.spawn(_loop)
+
+    def _remove_key(self, entry: LeaderboardEntry):
+        key = (-entry.points, entry.id)
+        i = bisect.bisect_left(self.keys, key)
+        if i < len(self.keys) and self.keys[i] == key:
+            del self.keys[i]
+
+    def add_user(self, user_id: int, nickname: str, points: int = 0):
+        """Neu registrierten User aufnehmen"""
+        with self.lock:
+            if not self.loaded or user_id in self.entries:
+                return
+            entry = LeaderboardEntry(user_id, nickname, points)
+            self.entries[user_id] = entry
+            bisect.insort(self.keys, (-entry.points, user_id))
+            self.version += 1
+
+    def set_points(self, user_id: int, points: int):
+        """Punktestand eines Users setzen (O(log n) Suche + Verschieben)"""
+        with self.lock:
+            if not self.loaded:
+                return
+            entry = self.entries.get(user_id)
+            if entry is None or entry.points == points:
+                return
+            self._remove_key(entry)
+            entry.points = points
+            bisect.insort(self.keys, (-points, user_id))
+            self.version += 1
+
+    def raise_points(self, user_id: int, points: int):
+        """Punktestand nur erhöhen (z.B. aus einem nachgespielten Punkte-Journal)"""
+        with self.lock:
+            entry = self.entries.get(user_id) if self.loaded else None
+            if entry is None or entry.points >= points:
+                return
+            self._remove_key(entry)
+            entry.points = points
+            bisect.insort(self.keys, (-points, user_id))
+            self.version += 1
+
+    def get(self, user_id: int) -> Optional[LeaderboardEntry]:
+        """Nickname und Punkte eines Users aus dem Index (None wenn unbekannt)"""
+        with self.lock:
+            self._ensure_loaded()
+            entry = self.entries.get(user_id)
+            return LeaderboardEntry(entry.id, entry.nickname, entry.points) if entry else None
+
+    def points_of(self, user_id: int) -> Optional[int]:
+        """Aktueller Punktestand aus dem Index"""
+        with self.lock:
+            self._ensure_loaded()
+            entry = self.entries.get(user_id)
+            return entry.points if entry else None
+
+    def top(self, limit: int = 10) -> List[LeaderboardEntry]:
+        """Top-N User (reiner Speicherzugriff)"""
+        with self.lock:
+            self._ensure_loaded()
+            return [
+                LeaderboardEntry(e.id, e.nickname, e.points)
+                for e in (self.entries[user_id] for _, user_id in self.keys[:max(limit, 0)])
+            ]
+
+    # ==================== CHECKPOINT ====================
+
+    def export_state(self) -> Optional[dict]:
+        with self.lock:
+            if not self.loaded:
+                return None
+            return {'users': [[e.id, e.nickname, e.points] for e in self.entries.values()]}
+
+    def restore_state(self, state: Optional[dict], events: list, age: float):
+        """
+        Index aus dem Checkpoint übernehmen, seither registrierte User nachladen
+
+        Der Snapshot kann bis zu CHECKPOINT_INTERVAL alt sein, die DB ist bei den
+        Punkten nach einem Absturz womöglich weiter - daher wird die Punktespalte
+        gelesen und pro User der höhere Stand genommen (Punkte steigen nur).
+        """
+        if not state:
+            return
+        with self.lock:
+            self.entries = {user_id: LeaderboardEntry(user_id, nickname, points)
+                            for user_id, nickname, points in state['users']}
+            rows = self.db_service.read_rows("user", ['id', 'nickname', 'points'], max(self.entries, default=0))
+            for row in rows:
+                self.entries[row['id']] = LeaderboardEntry(**row)
+            for row in self.db_service.read_rows("user", ['id', 'points']):
+                entry = self.entries.get(row['id'])
+                if entry is not None and (row['points'] or 0) > entry.points:
+                    entry.points = row['points']
+            self.keys = sorted((-e.points, e.id) for e in self.entries.values())
+            self.loaded = True
+            self.version += 1
+        logger.info(f"🏆 Leaderboard aus Checkpoint: {len(self.entries)} User ({len(rows)} neu aus der DB)")
@@ -0,0 +1,168 @@
+import time
+import bisect
+import inspect
+import functools
+from contextlib import contextmanager
+from typing import Dict, Tuple
+
+# Sekunden; deckt Lock-Wartezeiten (µs) bis langsame DB-Aufrufe (s) ab
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Kumulatives Histogramm im Prometheus-Stil (feste Buckets)"""
+
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # letzter Eintrag: +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metrics:
+    """
+    Leichtgewichtige Metriken (Counter + Histogramme) mit Prometheus-Textformat
+
+    Eine Messung kostet einen Dict-Zugriff und ein bisect - billig genug, um im
+    Produktivbetrieb auf dem Pi dauerhaft aktiv zu bleiben. Kein Lock: Updates
+    passieren im Eventlet-Hub, ein seltener verlorener Zählerschritt ist egal.
+    """
+
+    def __init__(self, prefix: str = 'wahlplakatgame'):
+        self.prefix = prefix
+        self.counters: Dict[Tuple[str, tuple], float] = {}
+        self.histograms: Dict[Tuple[str, tuple], Histogram] = {}
+        self.help: Dict[str, Tuple[str, str]] = {}  # name -> (typ, beschreibung)
+
+    def describe(self, name: str, kind: str, text: str):
+        self.help[name] = (kind, text)
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram()
+        histogram.observe(seconds)
+
+    @contextmanager
+    def time(self, name: str, **labels):
+        """Dauer eines Blocks messen (auch bei Exceptions)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def track_event(self, event: str):
+        """Decorator für Socket.IO Handler: Anzahl, Fehler und Latenz pro Event"""
+        def decorator(func):
+            params = inspect.signature(func).parameters.values()
+            varargs = any(p.kind == p.VAR_POSITIONAL for p in params)
+            max_args = len(params)
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                # Flask-SocketIO probiert z.B. connect(auth) und fällt bei TypeError auf connect()
+                # zurück - das muss vor der Messung passieren, sonst zählt es doppelt
+                if not varargs and len(args) > max_args:
+                    raise TypeError(f"{func.__name__}() takes {max_args} positional arguments")
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                except Exception:
+                    self.inc('socketio_event_errors_total', event=event)
+                    raise
+                finally:
+                    self.inc('socketio_events_total', event=event)
+                    self.observe('socketio_event_seconds', time.perf_counter() - start, event=event)
+            return wrapper
+        return decorator
+
+    def instrument_methods(self, name: str, exclude: tuple = ()):
+        """Klassen-Decorator: Latenz aller öffentlichen Methoden als Histogramm (Label 'method')"""
+        def decorator(cls):
+            for attr, func in list(vars(cls).items()):
+                if attr.startswith('_') or attr in exclude or not callable(func):
+                    continue
+                setattr(cls, attr, self._timed_method(name, attr, func))
+            return cls
+        return decorator
+
+    def _timed_method(self, name: str, method: str, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.observe(name, time.perf_counter() - start, method=method)
+        return wrapper
+
+    # ==================== EXPORT ====================
+
+    @staticmethod
+    def _labels(labels: tuple, extra: str = None) -> str:
+        parts = [f'{key}="{str(value)}"' for key, value in labels]
+        if extra:
+            parts.append(extra)
+        return '{' + ','.join(parts) + '}' if parts else ''
+
+    def render(self) -> str:
+        """Alle Metriken im Prometheus-Textformat"""
+        lines = []
+        seen = set()
+
+        def header(name: str, kind: str):
+            if name in seen:
+                return
+            seen.add(name)
+            text = self.help.get(name, (kind, name))[1]
+            lines.append(f"# HELP {self.prefix}_{name} {text}")
+            lines.append(f"# TYPE {self.prefix}_{name} {kind}")
+
+        for (name, labels), value in sorted(self.counters.items()):
+            header(name, 'counter')
+            lines.append(f"{self.prefix}_{name}{self._labels(labels)} {value:g}")
+
+        for (name, labels), histogram in sorted(self.histograms.items(), key=lambda item: item[0]):
+            header(name, 'histogram')
+            cumulative = 0
+            for bound, count in zip(histogram.buckets + ('+Inf',), histogram.counts):
+                cumulative += count
+                le = 'le="' + (bound if bound == '+Inf' else f"{bound:g}") + '"'
+                lines.append(f"{self.prefix}_{name}_bucket{self._labels(labels, le)} {cumulative}")
+            lines.append(f"{self.prefix}_{name}_sum{self._labels(labels)} {histogram.sum:.6f}")
+            lines.append(f"{self.prefix}_{name}_count{self._labels(labels)} {histogram.count}")
+
+        return '\n'.join(lines) + '\n'
+
+
+metrics = Metrics()
+
+metrics.describe('socketio_events_total', 'counter', 'Verarbeitete Socket.IO Events')
+metrics.describe('socketio_event_errors_total', 'counter', 'Socket.IO Handler mit unbehandelter Exception')
+metrics.describe('socketio_event_seconds', 'histogram', 'Laufzeit der Socket.IO Handler')
+metrics.describe('http_requests_total', 'counter', 'HTTP Requests nach Route, Methode und Status')
+metrics.describe('http_request_seconds', 'histogram', 'Laufzeit der HTTP Routen')
+metrics.describe('db_call_seconds', 'histogram', 'Laufzeit der DatabaseService Methoden')
+metrics.describe('round_start_seconds', 'histogram', 'start_new_round bis new_round gesendet')
+metrics.describe('round_end_seconds', 'histogram', 'end_round bis round_end gesendet')
+metrics.describe('rounds_started_total', 'counter', 'Gestartete Runden')
+metrics.describe('rounds_ended_total', 'counter', 'Beendete Runden')
+metrics.describe('lobby_commands_total', 'counter', 'Im Lobby-Loop abgearbeitete Befehle (nach Befehl)')
+metrics.describe('lobby_commands_rejected_total', 'counter', 'Abgewiesene Client-Befehle, weil die Lobby-Queue voll war')
+metrics.describe('wire_emits_total', 'counter', 'Gesendete Events nach Nachrichtenformat')
+metrics.describe('timer_lateness_seconds', 'histogram', 'Verspätung der Spieluhr-Timer gegenüber ihrer Frist (nach Timer)')
+metrics.describe('clock_drift_seconds', 'histogram', 'Wie spät die Spieluhr gegenüber ihrem geplanten Tick aufwacht')
+metrics.describe('lobby_command_wait_seconds', 'histogram', 'Wartezeit der Befehle in der Lobby-Queue')
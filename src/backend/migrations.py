@@ -0,0 +1,111 @@
+import logging
+from datetime import datetime
+from typing import Callable, List, Tuple
+import sillyorm
+import sqlalchemy
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_TABLE = 'schema_migrations'
+
+
+# ==================== MIGRATIONEN ====================
+# Jede Migration bekommt (connection, metadata) und muss idempotent sein.
+# Neue Migrationen nur hinten anhängen, Versionen nie ändern.
+
+def _create_index(name: str, table: str, column: str, unique: bool = False, **dialect_kwargs):
+    def _migrate(conn: sqlalchemy.Connection, metadata: sqlalchemy.MetaData):
+        index = sqlalchemy.Index(name, metadata.tables[table].c[column], unique=unique, **dialect_kwargs)
+        conn.execute(sqlalchemy.schema.CreateIndex(index, if_not_exists=True))
+    return _migrate
+
+
+def _create_spruch_index(conn: sqlalchemy.Connection, metadata: sqlalchemy.MetaData):
+    # Text-Spalte: auf PostgreSQL Hash-Index (nur Gleichheit, kein Längenlimit wie bei B-Tree)
+    if conn.dialect.name == 'postgresql':
+        _create_index('ix_wahlspruch_spruch', 'wahlspruch', 'spruch', postgresql_using='hash')(conn, metadata)
+    else:
+        _create_index('ix_wahlspruch_spruch', 'wahlspruch', 'spruch')(conn, metadata)
+
+
+MIGRATIONS: List[Tuple[int, str, Callable]] = [
+    (1, 'unique index user.nickname', _create_index('ux_user_nickname', 'user', 'nickname', unique=True)),
+    (2, 'index user.session_token', _create_index('ix_user_session_token', 'user', 'session_token')),
+    (3, 'index wahlspruch.spruch', _create_spruch_index),
+    (4, 'index user.points', _create_index('ix_user_points', 'user', 'points')),
+]
+
+MANAGED_INDEXES = {'ux_user_nickname', 'ix_user_session_token', 'ix_wahlspruch_spruch', 'ix_user_points'}
+
+
+class Registry(sillyorm.Registry):
+    """
+    sillyorm Registry, die die Objekte der Migrationen beim Schema-Vergleich ignoriert
+
+    Sonst meldet init_db_tables() im 'safe' Modus die zusätzlichen Indizes und die
+    Versionstabelle als unsichere Abweichung und bricht den Start ab.
+    """
+
+    @staticmethod
+    def _table_cmp_should_include(obj, name, type_, reflected, compare_to) -> bool:
+        if type_ == 'table' and name == MIGRATIONS_TABLE:
+            return False
+        if type_ == 'index' and name in MANAGED_INDEXES:
+            return False
+        return True
+
+
+def _migrations_table(metadata: sqlalchemy.MetaData) -> sqlalchemy.Table:
+    return sqlalchemy.Table(
+        MIGRATIONS_TABLE, metadata,
+        sqlalchemy.Column('version', sqlalchemy.Integer, primary_key=True, autoincrement=False),
+        sqlalchemy.Column('name', sqlalchemy.String(255), nullable=False),
+        sqlalchemy.Column('applied_at', sqlalchemy.DateTime, nullable=False)
+    )
+
+
+def applied_versions(engine: sqlalchemy.Engine) -> List[int]:
+    """Bereits angewendete Migrationen"""
+    table = _migrations_table(sqlalchemy.MetaData())
+    with engine.begin() as conn:
+        table.create(conn, checkfirst=True)
+        return sorted(row.version for row in conn.execute(sqlalchemy.select(table.c.version)))
+
+
+def migrate(registry: sillyorm.Registry) -> List[int]:
+    """
+    Ausstehende Migrationen der Reihe nach anwenden (SQLite und PostgreSQL)
+
+    Jede Migration läuft in einer eigenen Transaktion zusammen mit ihrem
+    Versionseintrag. Schlägt eine fehl (z.B. doppelte Nicknames beim Unique-Index),
+    wird abgebrochen und beim nächsten Start erneut versucht - die App läuft
+    trotzdem, die Indizes sind nur Beschleunigung.
+
+    Returns:
+        Liste der in diesem Lauf angewendeten Versionen
+    """
+    engine = registry.engine
+    table = _migrations_table(sqlalchemy.MetaData())
+    done = set(applied_versions(engine))
+    applied = []
+
+    for version, name, func in MIGRATIONS:
+        if version in done:
+            continue
+        try:
+            with engine.begin() as conn:
+                func(conn, registry.metadata)
+                conn.execute(sqlalchemy.insert(table).values(version=version, name=name, applied_at=datetime.now()))
+            applied.append(version)
+            logger.info(f"🧱 Migration {version} angewendet: {name}")
+        except sqlalchemy.exc.IntegrityError as e:
+            if version in applied_versions(engine):
+                # Ein anderer Worker war schneller
+                continue
+            logger.error(f"❌ Migration {version} ({name}) fehlgeschlagen: {e}")
+            break
+        except Exception as e:
+            logger.exception(f"❌ Migration {version} ({name}) fehlgeschlagen: {e}")
+            break
+
+    return applied
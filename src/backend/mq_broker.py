@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Lokaler ZeroMQ Message Broker für den Multi-Worker Betrieb
+
+Leitet alle Socket.IO Nachrichten der Worker (PUSH -> PULL) an alle Worker
+weiter (PUB -> SUB). Reicht für Tests und kleine Deployments auf einer Maschine.
+
+Verwendung:
+    python mq_broker.py [pull_port] [pub_port]
+
+Passende Worker-Konfiguration:
+    SOCKETIO_MESSAGE_QUEUE=zmq+tcp://127.0.0.1:5555+5556
+"""
+
+import sys
+import zmq
+
+
+def main():
+    """Main function"""
+    pull_port = int(sys.argv[1]) if len(sys.argv) > 1 else 5555
+    pub_port = int(sys.argv[2]) if len(sys.argv) > 2 else 5556
+
+    context = zmq.Context()
+
+    receiver = context.socket(zmq.PULL)
+    receiver.bind(f"tcp://127.0.0.1:{pull_port}")
+
+    publisher = context.socket(zmq.PUB)
+    publisher.bind(f"tcp://127.0.0.1:{pub_port}")
+
+    print(f"📨 Broker läuft: PULL :{pull_port} -> PUB :{pub_port}")
+
+    try:
+        zmq.proxy(receiver, publisher)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        receiver.close()
+        publisher.close()
+        context.term()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import os
+import re
+import hmac
+import time
+import hashlib
+import secrets
+import logging
+from typing import Tuple
+from eventlet import tpool
+from eventlet.semaphore import Semaphore
+
+logger = logging.getLogger(__name__)
+
+LEGACY_SHA256 = re.compile(r'[0-9a-f]{64}')
+
+
+class HasherBusy(Exception):
+    """Zu viele Hash-Aufträge in der Warteschlange"""
+
+
+class PasswordHasher:
+    """
+    Langsames Passwort-Hashing (PBKDF2 oder scrypt) außerhalb des Eventlet-Hubs
+
+    Die KDF läuft über eventlet.tpool in nativen Threads (hashlib gibt dabei
+    den GIL frei), der aufrufende Green Thread wartet nur auf das Ergebnis.
+    Höchstens `workers` Hashes laufen gleichzeitig, höchstens `max_queue`
+    Aufträge dürfen warten - darüber hinaus wird mit HasherBusy abgelehnt,
+    damit ein Login-Ansturm das Spiel nicht einfriert.
+
+    Formate:
+        pbkdf2_sha256$<iterationen>$<salt>$<hash>
+        scrypt$<n>$<r>$<p>$<salt>$<hash>
+        <64 hex>  (altes SHA-256 ohne Salt, wird beim Login ersetzt)
+    """
+
+    def __init__(self, algorithm: str = None, iterations: int = None, workers: int = None,
+                 max_queue: int = None):
+        self.algorithm = algorithm or os.environ.get('PASSWORD_HASH_ALGORITHM', 'pbkdf2_sha256')
+        if self.algorithm not in ('pbkdf2_sha256', 'scrypt'):
+            raise ValueError(f"Unbekannter Hash-Algorithmus: {self.algorithm}")
+        self.iterations = iterations or int(os.environ.get('PASSWORD_HASH_ITERATIONS', 120000))
+        self.scrypt_n = int(os.environ.get('PASSWORD_SCRYPT_N', 2 ** 14))
+        self.scrypt_r = int(os.environ.get('PASSWORD_SCRYPT_R', 8))
+        self.scrypt_p = int(os.environ.get('PASSWORD_SCRYPT_P', 1))
+        self.workers = workers or int(os.environ.get('PASSWORD_HASH_WORKERS', 2))
+        self.max_queue = max_queue or int(os.environ.get('PASSWORD_HASH_MAX_QUEUE', 16))
+
+        self.slots = Semaphore(self.workers)
+        self.pending = 0  # wartende + laufende Aufträge
+
+        # Statistik
+        self.jobs = 0
+        self.rejected = 0
+        self.rehashed = 0
+        self.total_time = 0.0
+
+    # ==================== KDF (läuft im Thread-Pool) ====================
+
+    @staticmethod
+    def _pbkdf2(password: bytes, salt: bytes, iterations: int) -> bytes:
+        return hashlib.pbkdf2_hmac('sha256', password, salt, iterations)
+
+    @staticmethod
+    def _scrypt(password: bytes, salt: bytes, n: int, r: int, p: int) -> bytes:
+        return hashlib.scrypt(password, salt=salt, n=n, r=r, p=p, maxmem=128 * r * (n + p + 2), dklen=32)
+
+    def _run(self, func, *args) -> bytes:
+        """KDF im Thread-Pool ausführen (blockiert nur den aufrufenden Green Thread)"""
+        if self.pending >= self.max_queue:
+            self.rejected += 1
+            raise HasherBusy()
+
+        self.pending += 1
+        try:
+            with self.slots:
+                start = time.perf_counter()
+                result = tpool.execute(func, *args)
+                self.total_time += time.perf_counter() - start
+                self.jobs += 1
+                return result
+        finally:
+            self.pending -= 1
+
+    # ==================== API ====================
+
+    def hash(self, password: str) -> str:
+        """Passwort mit frischem Salt hashen"""
+        salt = secrets.token_bytes(16)
+        secret = password.encode('utf-8')
+
+        if self.algorithm == 'scrypt':
+            digest = self._run(self._scrypt, secret, salt, self.scrypt_n, self.scrypt_r, self.scrypt_p)
+            return f"scrypt${self.scrypt_n}${self.scrypt_r}${self.scrypt_p}${salt.hex()}${digest.hex()}"
+
+        digest = self._run(self._pbkdf2, secret, salt, self.iterations)
+        return f"pbkdf2_sha256${self.iterations}${salt.hex()}${digest.hex()}"
+
+    def verify(self, password: str, stored: str) -> Tuple[bool, bool]:
+        """
+        Passwort gegen gespeicherten Hash prüfen
+
+        Returns:
+            (passwort_korrekt, neu_hashen_empfohlen)
+        """
+        if not stored:
+            return False, False
+        secret = password.encode('utf-8')
+
+        if LEGACY_SHA256.fullmatch(stored):
+            # Alter Hash: billig, direkt prüfen und danach ersetzen
+            valid = hmac.compare_digest(hashlib.sha256(secret).hexdigest(), stored)
+            return valid, valid
+
+        parts = stored.split('$')
+        try:
+            if parts[0] == 'pbkdf2_sha256' and len(parts) == 4:
+                iterations = int(parts[1])
+                digest = self._run(self._pbkdf2, secret, bytes.fromhex(parts[2]), iterations)
+                valid = hmac.compare_digest(digest.hex(), parts[3])
+                outdated = self.algorithm != 'pbkdf2_sha256' or iterations < self.iterations
+                return valid, valid and outdated
+
+            if parts[0] == 'scrypt' and len(parts) == 6:
+                n, r, p = int(parts[1]), int(parts[2]), int(parts[3])
+                digest = self._run(self._scrypt, secret, bytes.fromhex(parts[4]), n, r, p)
+                valid = hmac.compare_digest(digest.hex(), parts[5])
+                outdated = self.algorithm != 'scrypt' or (n, r, p) != (self.scrypt_n, self.scrypt_r, self.scrypt_p)
+                return valid, valid and outdated
+        except ValueError:
+            pass
+
+        logger.warning("Unbekanntes Passwort-Hash-Format")
+        return False, False
+
+    def get_stats(self) -> dict:
+        return {
+            'algorithm': self.algorithm,
+            'workers': self.workers,
+            'pending': self.pending,
+            'max_queue': self.max_queue,
+            'jobs': self.jobs,
+            'rejected': self.rejected,
+            'rehashed': self.rehashed,
+            'avg_ms': round(self.total_time / self.jobs * 1000, 2) if self.jobs else None
+        }
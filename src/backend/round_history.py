@@ -0,0 +1,468 @@
+import os
+import glob
+import json
+import time
+import uuid
+import heapq
+import threading
+import logging
+from typing import Dict, List, Optional, Tuple
+import eventlet
+from eventlet import tpool
+from metrics import Histogram
+from state_store import MemoryStateStore, get_worker_id, worker_alive
+
+logger = logging.getLogger(__name__)
+
+# Sekunden bis zur Antwort (Runden dauern 15 Sekunden)
+ANSWER_TIME_BUCKETS = (1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 8.0, 10.0, 12.0, 15.0)
+
+# Spalten pro Wahlspruch in RoundHistory.quotes
+ROUNDS, ELIGIBLE, ANSWERS, CORRECT, TIME_SUM, TIME_COUNT = range(6)
+
+# Ab dieser Größe wird die eigene Ledger-Datei abgeschlossen und eingefaltet
+ROTATE_BYTES = int(os.environ.get('ROUND_HISTORY_ROTATE_BYTES', 16 * 1024 * 1024))
+
+# Lease 'history:<worker>' solange ein Worker in seine Ledger-Datei schreibt (Sekunden)
+LEASE_TTL = 60.0
+
+
+def _accuracy(correct: int, answers: int) -> Optional[float]:
+    return round(correct / answers, 4) if answers else None
+
+
+class RoundHistory:
+    """
+    Runden-Ledger mit laufend mitgeführten Auswertungen
+
+    Am Rundenende wird die ganze Runde als eine Zeile an das Ledger angehängt
+    (gepuffert, ein Schreibzugriff pro Runde) und gleichzeitig in die Aggregate
+    eingerechnet: Trefferquote pro Wahlspruch, Verwechslungsmatrix pro Partei und
+    Antwortzeiten als Histogramm. Die API liest nur diese Aggregate - das Ledger
+    selbst wird nur beim Start gelesen, und mit Checkpoint nur der Teil nach dem
+    letzten Snapshot.
+
+    Ledger-Format (JSON Lines, eine Kopfzeile pro Datei, dann eine Zeile pro Runde):
+        {"ledger": "3f2a...", "worker": "host:1234", "t": 1700000000.0}
+        {"t": 1700000000.0, "l": 1, "r": 12, "w": 345, "p": "SPD", "n": 20, "a": [[user_id, "CDU", 3120], ...]}
+        (l: Lobby, r: Runde, w: Wahlspruch, p: richtige Partei, n: antwortberechtigt,
+         a: Antworten mit Antwortzeit in ms - null, wenn unbekannt)
+
+    Jeder Prozess beginnt eine neue Datei; die Kennung aus der Kopfzeile bleibt beim
+    Umbenennen erhalten und ist der Schlüssel für die eingelesenen Bytes (offsets).
+    Abgeschlossene Dateien (rotiert oder von beendeten Workern) faltet compact() in
+    round_history.compacted.json und löscht sie.
+
+    Im Multi-Worker Betrieb schreibt jeder Worker in eine eigene Datei, benannt nach
+    seiner Worker-ID wie bei den Leases (round_history.<host>-<pid>.log). Beim Start
+    werden alle Dateien eingelesen, danach zählt jeder Worker nur seine eigenen
+    Runden dazu.
+    """
+
+    def __init__(self, path: str = None, state_store=None):
+        self.path = path or os.environ.get('ROUND_HISTORY_PATH', 'round_history.log')
+        self.base_path = self.path
+        self.compacted_path = f"{os.path.splitext(self.base_path)[0]}.compacted.json"
+        self.state_store = state_store or MemoryStateStore()
+        self.worker_id = get_worker_id()
+        self.file = None
+        self.ledger_id = None  # Kennung der eigenen Ledger-Datei (Kopfzeile)
+        self.lock = threading.Lock()
+        self.offsets: Dict[str, int] = {}  # ledger-kennung -> bereits eingerechnete Bytes
+        self.saved_at = None  # Stand der übernommenen Aggregate (Checkpoint oder compacted.json)
+        self.folded: List[str] = []  # bei der letzten Kompaktierung gelöschte Ledger (Kennungen)
+        self.present: Dict[str, str] = {}  # beim Laden gefundene Dateien: pfad -> kennung
+        self._reset()
+
+    def _reset(self):
+        self.rounds = 0
+        self.answers = 0
+        self.correct = 0
+        self.missed = 0  # antwortberechtigt, aber keine Antwort
+        self.quotes: Dict[int, list] = {}  # wahlspruch_id -> [ROUNDS, ELIGIBLE, ANSWERS, ...] (Spalten oben)
+        self.quote_partei: Dict[int, str] = {}  # wahlspruch_id -> richtige partei
+        self.confusion: Dict[str, Dict[str, int]] = {}  # richtige partei -> {geantwortete partei: anzahl}
+        self.missed_by_partei: Dict[str, int] = {}
+        self.times = {
+            'correct': Histogram(ANSWER_TIME_BUCKETS),
+            'wrong': Histogram(ANSWER_TIME_BUCKETS)
+        }
+
+    def use_worker_file(self):
+        """Eigene Ledger-Datei für diesen Worker verwenden (Multi-Worker)"""
+        base, ext = os.path.splitext(self.base_path)
+        self.path = f"{base}.{self.worker_id.replace(':', '-')}{ext}"
+        self.state_store.acquire_lease(f"history:{self.worker_id}", self.worker_id, LEASE_TTL)
+
+    # ==================== SCHREIBEN ====================
+
+    def _closed_path(self, path: str) -> str:
+        stem, ext = os.path.splitext(path)
+        return f"{stem}.{int(time.time() * 1000)}.closed{ext}"
+
+    def _retire_previous(self):
+        """Datei eines früheren Prozesses unter dem eigenen Namen abschließen (Lock muss gehalten werden)"""
+        if self.file is None and os.path.exists(self.path) and os.path.getsize(self.path):
+            os.replace(self.path, self._closed_path(self.path))
+
+    def _open(self):
+        if self.file is None:
+            self._retire_previous()
+            self.ledger_id = uuid.uuid4().hex
+            self.file = open(self.path, 'a', encoding='utf-8')
+            header = {'ledger': self.ledger_id, 'worker': self.worker_id, 't': round(time.time(), 3)}
+            self.file.write(json.dumps(header, separators=(',', ':')) + "\n")
+
+    def record(self, lobby_id: int, round_number: int, round_data: dict):
+        """
+        Eine beendete Runde anhängen und in die Aggregate einrechnen
+
+        Args:
+            round_data: {'wahlspruch_id', 'partei', 'eligible', 'answers': [(user_id, partei, ms), ...]}
+                        wie von GameLobby.end_round() geliefert
+        """
+        entry = {
+            't': round(time.time(), 3),
+            'l': lobby_id,
+            'r': round_number,
+            'w': round_data['wahlspruch_id'],
+            'p': round_data['partei'],
+            'n': round_data['eligible'],
+            'a': round_data['answers']
+        }
+        line = json.dumps(entry, separators=(',', ':')) + "\n"
+        with self.lock:
+            self._open()
+            self.file.write(line)
+            self._apply(entry)
+
+    def _apply(self, entry: dict):
+        """Runde in die Aggregate einrechnen (Lock muss gehalten werden)"""
+        wahlspruch_id = entry['w']
+        correct_partei = entry['p']
+        answers = entry['a']
+
+        quote = self.quotes.get(wahlspruch_id)
+        if quote is None:
+            quote = self.quotes[wahlspruch_id] = [0] * 6
+            self.quote_partei[wahlspruch_id] = correct_partei
+        row = self.confusion.get(correct_partei)
+        if row is None:
+            row = self.confusion[correct_partei] = {}
+
+        correct = 0
+        for _, partei, ms in answers:
+            row[partei] = row.get(partei, 0) + 1
+            is_correct = partei == correct_partei
+            correct += is_correct
+            if ms is not None:
+                self.times['correct' if is_correct else 'wrong'].observe(ms / 1000)
+                quote[TIME_SUM] += ms
+                quote[TIME_COUNT] += 1
+
+        missed = max(0, entry['n'] - len(answers))
+        quote[ROUNDS] += 1
+        quote[ELIGIBLE] += entry['n']
+        quote[ANSWERS] += len(answers)
+        quote[CORRECT] += correct
+        self.missed_by_partei[correct_partei] = self.missed_by_partei.get(correct_partei, 0) + missed
+
+        self.rounds += 1
+        self.answers += len(answers)
+        self.correct += correct
+        self.missed += missed
+
+    def flush(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.flush()
+
+    def start_interval_flush(self, interval: float = 5.0):
+        """Gepufferte Runden regelmäßig rausschreiben, Lease verlängern, große Datei rotieren"""
+        def _loop():
+            while True:
+                eventlet.sleep(interval)
+                self.flush()
+                self.state_store.acquire_lease(f"history:{self.worker_id}", self.worker_id, LEASE_TTL)
+                if self._rotate():
+                    self.compact()
+
+        return eventlet.spawn(_loop)
+
+    # ==================== LADEN ====================
+
+    def _ledger_paths(self) -> List[str]:
+        base, ext = os.path.splitext(self.base_path)
+        paths = set([self.base_path, self.path] + glob.glob(f"{base}.*{ext}"))
+        return sorted(path for path in paths if os.path.exists(path))
+
+    @staticmethod
+    def _read_header(file) -> Tuple[str, Optional[str]]:
+        """Kennung und Worker aus der Kopfzeile - Dateien ohne Kopfzeile (ältere Version) über den Pfad"""
+        first = file.readline()
+        if first.startswith(b'{"ledger"'):
+            header = json.loads(first)
+            return header['ledger'], header.get('worker')
+        file.seek(0)
+        return file.name, None
+
+    def _load_compacted(self):
+        """compacted.json übernehmen, wenn es neuer ist als der Checkpoint (Lock muss gehalten werden)"""
+        try:
+            with open(self.compacted_path, 'r', encoding='utf-8') as file:
+                state = json.load(file)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️  {self.compacted_path} nicht lesbar: {e}")
+            return
+        if self.saved_at is None or state['saved_at'] > self.saved_at:
+            self._reset()
+            self._restore(state)
+
+    def load(self) -> int:
+        """
+        Ledger beim Start einlesen - nur was noch nicht in den Aggregaten steckt
+
+        Returns:
+            Anzahl eingelesener Runden
+        """
+        start = time.perf_counter()
+        with self.lock:
+            self._load_compacted()
+            loaded = 0
+            for path in self._ledger_paths():
+                try:
+                    file = open(path, 'rb')
+                except FileNotFoundError:
+                    continue  # gerade rotiert, steht unter neuem Namen weiter hinten
+                with file:
+                    ledger, _ = self._read_header(file)
+                    self.present[path] = ledger
+                    offset = self.offsets.get(ledger, file.tell())
+                    if os.fstat(file.fileno()).st_size < offset:
+                        # Die Aggregate sind maßgeblich, nicht das Ledger -> nichts doppelt zählen
+                        logger.warning(f"⚠️  {path} kürzer als bereits eingerechnet, übersprungen")
+                        self.offsets[ledger] = os.fstat(file.fileno()).st_size
+                        continue
+                    file.seek(offset)
+                    for line in file:
+                        if not line.endswith(b"\n"):
+                            break  # wird gerade noch geschrieben
+                        offset += len(line)
+                        if not line.strip():
+                            continue
+                        try:
+                            self._apply(json.loads(line))
+                        except (ValueError, KeyError, TypeError):
+                            logger.warning("⚠️  Unvollständige Zeile im Runden-Ledger ignoriert")
+                            continue
+                        loaded += 1
+                    self.offsets[ledger] = offset
+            if not self.state_store.shared:
+                # Ein Worker: niemand sonst rotiert, fehlende Dateien sind eingefaltet und gelöscht
+                present = set(self.present.values())
+                self.offsets = {ledger: offset for ledger, offset in self.offsets.items() if ledger in present}
+
+        if loaded:
+            logger.info(f"📈 Runden-Ledger eingelesen: {loaded} Runden ({(time.perf_counter() - start) * 1000:.1f} ms)")
+        return loaded
+
+    # ==================== ROTATION / KOMPAKTIERUNG ====================
+
+    def _rotate(self) -> bool:
+        """Eigene Datei ab ROTATE_BYTES abschließen - die nächste Runde beginnt eine neue"""
+        with self.lock:
+            if self.file is None or self.file.tell() < ROTATE_BYTES:
+                return False
+            self.offsets[self.ledger_id] = self.file.tell()
+            self.file.close()
+            self.file = None
+            os.replace(self.path, self._closed_path(self.path))
+        logger.info(f"🔄 Runden-Ledger rotiert: {self.path}")
+        return True
+
+    def _closed_ledgers(self) -> Tuple[List[str], List[str]]:
+        """
+        Abgeschlossene Ledger-Dateien: rotierte, ältere ohne Kopfzeile und die von
+        Workern, deren Lease sich übernehmen lässt
+
+        Returns:
+            (pfade, übernommene leases)
+        """
+        closed, leases = [], []
+        ext = os.path.splitext(self.base_path)[1]
+        for path in self._ledger_paths():
+            if path == self.path:
+                continue
+            if path.endswith(f".closed{ext}"):
+                closed.append(path)
+                continue
+            try:
+                with open(path, 'rb') as file:
+                    _, worker = self._read_header(file)
+            except FileNotFoundError:
+                continue  # gerade von ihrem Worker rotiert
+            if worker is None:
+                closed.append(path)
+                continue
+            key = f"history:{worker}"
+            replace = None if worker_alive(worker) else worker
+            if worker != self.worker_id and self.state_store.acquire_lease(key, self.worker_id, LEASE_TTL, replace=replace):
+                closed.append(path)
+                leases.append(key)
+        return closed, leases
+
+    def _fold(self, paths: List[str]):
+        """
+        Stand von der Platte (compacted.json + alle Dateien) neu aufbauen, als
+        compacted.json schreiben und danach die eingefalteten Dateien löschen.
+        Läuft in einem Thread (tpool) - nutzt nicht die Aggregate dieses Workers,
+        die die Runden anderer laufender Worker nicht enthalten.
+        """
+        view = RoundHistory(self.base_path, self.state_store)
+        view.load()
+        state = view.export_state()
+        # Positionen der zuletzt gelöschten Dateien werden nicht mehr gebraucht
+        present = set(view.present.values())
+        state['offsets'] = {
+            ledger: offset for ledger, offset in state['offsets'].items()
+            if ledger not in view.folded or ledger in present
+        }
+        state['folded'] = [view.present[path] for path in paths if path in view.present]
+        tmp_path = f"{self.compacted_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump(state, file, separators=(',', ':'))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, self.compacted_path)
+        # Erst danach löschen: compacted.json führt die Dateien bis zum Ende als eingerechnet
+        for path in paths:
+            os.remove(path)
+
+    def compact(self) -> int:
+        """
+        Abgeschlossene Ledger-Dateien in compacted.json einfalten und löschen
+
+        Returns:
+            Anzahl eingefalteter Dateien
+        """
+        if not self.state_store.acquire_lease('history-compact', self.worker_id, LEASE_TTL):
+            return 0  # ein anderer Worker kompaktiert gerade
+        leases = []
+        try:
+            with self.lock:
+                self._retire_previous()
+                if self.file is not None:
+                    self.file.flush()
+            paths, leases = self._closed_ledgers()
+            if not paths:
+                return 0
+            start = time.perf_counter()
+            tpool.execute(self._fold, paths)
+            logger.info(f"🗜️  Runden-Ledger kompaktiert: {len(paths)} Dateien ({(time.perf_counter() - start) * 1000:.1f} ms)")
+            return len(paths)
+        finally:
+            for key in leases:
+                self.state_store.release_lease(key, self.worker_id)
+            self.state_store.release_lease('history-compact', self.worker_id)
+
+    # ==================== CHECKPOINT ====================
+
+    def export_state(self) -> dict:
+        """Aggregate plus Ledger-Position - beim Start wird nur der Rest nachgelesen"""
+        with self.lock:
+            if self.file is not None:
+                self.file.flush()
+                self.offsets[self.ledger_id] = self.file.tell()
+            return {
+                'saved_at': time.time(),
+                'offsets': dict(self.offsets),
+                'totals': [self.rounds, self.answers, self.correct, self.missed],
+                'quotes': [[wahlspruch_id, self.quote_partei[wahlspruch_id]] + quote
+                           for wahlspruch_id, quote in self.quotes.items()],
+                'confusion': self.confusion,
+                'missed_by_partei': self.missed_by_partei,
+                'times': {name: [h.counts, h.sum, h.count] for name, h in self.times.items()}
+            }
+
+    def restore_state(self, state: Optional[dict], events: list, age: float):
+        if not state:
+            return
+        with self.lock:
+            self._restore(state)
+
+    def _restore(self, state: dict):
+        """Lock muss gehalten werden"""
+        self.saved_at = state.get('saved_at', 0)
+        self.folded = state.get('folded', [])
+        self.offsets = state['offsets']
+        self.rounds, self.answers, self.correct, self.missed = state['totals']
+        for wahlspruch_id, partei, *quote in state['quotes']:
+            self.quotes[wahlspruch_id] = quote
+            self.quote_partei[wahlspruch_id] = partei
+        self.confusion = state['confusion']
+        self.missed_by_partei = state['missed_by_partei']
+        for name, (counts, total, count) in state['times'].items():
+            histogram = self.times[name]
+            histogram.counts, histogram.sum, histogram.count = counts, total, count
+
+    # ==================== AUSWERTUNG (nur Aggregate) ====================
+
+    def _quote_stats(self, wahlspruch_id: int, quote: list) -> dict:
+        return {
+            'wahlspruch_id': wahlspruch_id,
+            'partei': self.quote_partei[wahlspruch_id],
+            'rounds': quote[ROUNDS],
+            'eligible': quote[ELIGIBLE],
+            'answers': quote[ANSWERS],
+            'correct': quote[CORRECT],
+            'accuracy': _accuracy(quote[CORRECT], quote[ANSWERS]),
+            'mean_answer_seconds': round(quote[TIME_SUM] / quote[TIME_COUNT] / 1000, 3) if quote[TIME_COUNT] else None
+        }
+
+    def summary(self) -> dict:
+        """Gesamtzahlen, Antwortzeiten und Verwechslungsmatrix"""
+        with self.lock:
+            times = {
+                name: {'counts': list(h.counts), 'sum': round(h.sum, 3), 'count': h.count}
+                for name, h in self.times.items()
+            }
+            parteien = []
+            for partei, row in self.confusion.items():
+                answers = sum(row.values())
+                correct = row.get(partei, 0)
+                parteien.append({
+                    'partei': partei,
+                    'answers': answers,
+                    'correct': correct,
+                    'accuracy': _accuracy(correct, answers),
+                    'missed': self.missed_by_partei.get(partei, 0),
+                    'answered_as': dict(row)
+                })
+            return {
+                'rounds': self.rounds,
+                'answers': self.answers,
+                'correct': self.correct,
+                'missed': self.missed,
+                'accuracy': _accuracy(self.correct, self.answers),
+                'answer_times': {'buckets': list(ANSWER_TIME_BUCKETS) + ['+Inf'], **times},
+                'parteien': sorted(parteien, key=lambda p: p['partei'])
+            }
+
+    def quote_stats(self, wahlspruch_id: int) -> Optional[dict]:
+        with self.lock:
+            quote = self.quotes.get(wahlspruch_id)
+            return self._quote_stats(wahlspruch_id, quote) if quote else None
+
+    def quote_ranking(self, order: str = 'hardest', limit: int = 20, min_answers: int = 5) -> List[dict]:
+        """Schwerste (niedrigste Trefferquote) bzw. leichteste Wahlsprüche"""
+        pick = heapq.nlargest if order == 'easiest' else heapq.nsmallest
+        with self.lock:
+            candidates = (
+                (quote[CORRECT] / quote[ANSWERS], wahlspruch_id, quote)
+                for wahlspruch_id, quote in self.quotes.items()
+                if quote[ANSWERS] >= max(1, min_answers)
+            )
+            top = pick(limit, candidates, key=lambda c: (c[0], c[1]))
+            return [self._quote_stats(wahlspruch_id, quote) for _, wahlspruch_id, quote in top]
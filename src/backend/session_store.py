@@ -0,0 +1,190 @@
+import os
+import time
+import threading
+import logging
+from collections import OrderedDict
+import eventlet
+
+logger = logging.getLogger(__name__)
+
+
+class SessionStore:
+    """
+    Begrenzter Session-Cache (token -> user_id)
+
+    - LRU-Grenze: bei mehr als max_entries fliegt der am längsten ungenutzte Token raus
+    - TTL mit Sliding Expiry: jeder Treffer verlängert die Lebensdauer (abschaltbar)
+    - Negativ-Cache: ungültige Tokens werden kurz gemerkt, damit wiederholte
+      falsche Joins nicht jedes Mal die DB abfragen
+    - Explizites Widerrufen (Logout)
+    """
+
+    INVALID = object()  # Marker: Token ist bekanntermaßen ungültig
+
+    def __init__(self, max_entries: int = None, ttl: float = None,
+                 negative_ttl: float = None, max_negative: int = None, sliding: bool = True):
+        self.max_entries = max_entries or int(os.environ.get('SESSION_CACHE_SIZE', 10000))
+        self.ttl = ttl or float(os.environ.get('SESSION_TTL', 3600))
+        self.negative_ttl = negative_ttl or float(os.environ.get('SESSION_NEGATIVE_TTL', 60))
+        self.max_negative = max_negative or self.max_entries
+        self.sliding = sliding  # False: Eintrag läuft nach ttl ab, egal wie oft er getroffen wird
+
+        self.sessions = OrderedDict()  # token -> (user_id, expires_at), älteste zuerst
+        self.negative = OrderedDict()  # token -> expires_at
+        self.lock = threading.Lock()
+
+        # Statistik
+        self.hits = 0
+        self.misses = 0
+        self.negative_hits = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.revocations = 0
+
+    def lookup(self, token: str):
+        """
+        Token im Cache suchen
+
+        Returns:
+            user_id, SessionStore.INVALID (bekannt ungültig) oder None (unbekannt)
+        """
+        now = time.monotonic()
+        with self.lock:
+            entry = self.sessions.get(token)
+            if entry is not None:
+                user_id, expires_at = entry
+                if expires_at > now:
+                    # Sliding Expiry + LRU-Position aktualisieren
+                    if self.sliding:
+                        self.sessions[token] = (user_id, now + self.ttl)
+                    self.sessions.move_to_end(token)
+                    self.hits += 1
+                    return user_id
+                del self.sessions[token]
+                self.expirations += 1
+
+            expires_at = self.negative.get(token)
+            if expires_at is not None:
+                if expires_at > now:
+                    self.negative_hits += 1
+                    return self.INVALID
+                del self.negative[token]
+
+            self.misses += 1
+            return None
+
+    def put(self, token: str, user_id: int):
+        """Gültige Session cachen"""
+        with self.lock:
+            self.negative.pop(token, None)
+            self.sessions[token] = (user_id, time.monotonic() + self.ttl)
+            self.sessions.move_to_end(token)
+            while len(self.sessions) > self.max_entries:
+                self.sessions.popitem(last=False)
+                self.evictions += 1
+
+    def put_invalid(self, token: str):
+        """Ungültigen Token für negative_ttl Sekunden merken"""
+        with self.lock:
+            self.negative[token] = time.monotonic() + self.negative_ttl
+            self.negative.move_to_end(token)
+            while len(self.negative) > self.max_negative:
+                self.negative.popitem(last=False)
+
+    def revoke(self, token: str) -> bool:
+        """Session sofort ungültig machen"""
+        with self.lock:
+            removed = self.sessions.pop(token, None) is not None
+            self.negative[token] = time.monotonic() + self.negative_ttl
+            self.negative.move_to_end(token)
+            self.revocations += 1
+            return removed
+
+    def revoke_user(self, user_id: int) -> int:
+        """Alle gecachten Sessions eines Users widerrufen"""
+        with self.lock:
+            tokens = [token for token, (uid, _) in self.sessions.items() if uid == user_id]
+        for token in tokens:
+            self.revoke(token)
+        return len(tokens)
+
+    def purge_expired(self) -> int:
+        """Abgelaufene Einträge entfernen"""
+        now = time.monotonic()
+        with self.lock:
+            expired = [token for token, (_, expires_at) in self.sessions.items() if expires_at <= now]
+            for token in expired:
+                del self.sessions[token]
+            self.expirations += len(expired)
+            for token in [t for t, expires_at in self.negative.items() if expires_at <= now]:
+                del self.negative[token]
+            return len(expired)
+
+    def start_interval_purge(self, interval: float):
+        """Abgelaufene Einträge periodisch entfernen (gibt Speicher früher frei als die LRU-Grenze)"""
+        def _loop():
+            while True:
+                eventlet.sleep(interval)
+                try:
+                    purged = self.purge_expired()
+                    if purged:
+                        logger.info(f"🔑 {purged} abgelaufene Sessions aus dem Cache entfernt")
+                except Exception as e:
+                    logger.exception(f"Fehler beim Aufräumen der Sessions: {e}")
+
+        return eventlet.spawn(_loop)
+
+    def export(self) -> list:
+        """Gültige Sessions als [token, user_id, restliche_sekunden] (für den Checkpoint)"""
+        now = time.monotonic()
+        with self.lock:
+            return [
+                [token, user_id, round(expires_at - now, 1)]
+                for token, (user_id, expires_at) in self.sessions.items()
+                if expires_at > now
+            ]
+
+    def restore(self, entries: list, elapsed: float = 0.0) -> int:
+        """
+        Sessions aus export() übernehmen (älteste zuerst, wie im LRU)
+
+        Args:
+            elapsed: Sekunden seit dem Export - so viel weniger Restlaufzeit
+        """
+        now = time.monotonic()
+        restored = 0
+        with self.lock:
+            for token, user_id, remaining in entries:
+                remaining -= elapsed
+                if remaining <= 0:
+                    continue
+                self.sessions[token] = (user_id, now + min(remaining, self.ttl))
+                self.sessions.move_to_end(token)
+                restored += 1
+            while len(self.sessions) > self.max_entries:
+                self.sessions.popitem(last=False)
+        return restored
+
+    def __contains__(self, token: str) -> bool:
+        with self.lock:
+            entry = self.sessions.get(token)
+            return entry is not None and entry[1] > time.monotonic()
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def get_stats(self) -> dict:
+        with self.lock:
+            lookups = self.hits + self.misses + self.negative_hits
+            return {
+                'size': len(self.sessions),
+                'negative_size': len(self.negative),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'negative_hits': self.negative_hits,
+                'hit_rate': round((self.hits + self.negative_hits) / lookups, 4) if lookups else None,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'revocations': self.revocations
+            }
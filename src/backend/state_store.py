@@ -0,0 +1,254 @@
+import os
+import json
+import time
+import socket
+import threading
+import logging
+from typing import Dict, Optional
+
+import sqlalchemy
+from db_executor import DBExecutor
+
+logger = logging.getLogger(__name__)
+
+
+def get_worker_id() -> str:
+    """Eindeutige ID dieses Prozesses (Host + PID)"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def worker_alive(worker_id: str) -> bool:
+    """
+    Läuft der Worker noch? Nur auf demselben Host sicher feststellbar (per PID) -
+    für Worker anderer Hosts entscheidet allein der Ablauf ihrer Leases.
+    """
+    host, _, pid = worker_id.rpartition(':')
+    if host != socket.gethostname():
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except (ValueError, PermissionError):
+        return True
+    return True
+
+
+class MemoryStateStore:
+    """
+    Prozess-lokaler State Store (Standard bei nur einem Worker)
+
+    Schlüssel -> JSON-Dict mit optionalem Ablaufzeitpunkt. Leases sind hier
+    trivial, weil es nur einen Prozess gibt.
+    """
+
+    shared = False
+
+    def __init__(self):
+        self.values: Dict[str, tuple] = {}  # key -> (value, expires_at)
+        self.leases: Dict[str, tuple] = {}  # key -> (owner, expires_at)
+        self.lock = threading.Lock()
+
+    def _alive(self, expires_at) -> bool:
+        return expires_at is None or expires_at > time.time()
+
+    def incr(self, key: str) -> int:
+        with self.lock:
+            value, _ = self.values.get(key, (0, None))
+            value += 1
+            self.values[key] = (value, None)
+            return value
+
+    def put(self, key: str, value: dict, ttl: float = None):
+        with self.lock:
+            self.values[key] = (value, time.time() + ttl if ttl else None)
+
+    def set_counter(self, key: str, value: int):
+        """Zähler mindestens auf value setzen (Warmstart aus dem Checkpoint)"""
+        with self.lock:
+            current, _ = self.values.get(key, (0, None))
+            self.values[key] = (max(current, value), None)
+
+    def get(self, key: str) -> Optional[dict]:
+        with self.lock:
+            value, expires_at = self.values.get(key, (None, None))
+            return value if value is not None and self._alive(expires_at) else None
+
+    def delete(self, key: str):
+        with self.lock:
+            self.values.pop(key, None)
+
+    def scan(self, prefix: str) -> Dict[str, dict]:
+        with self.lock:
+            return {
+                key: value
+                for key, (value, expires_at) in self.values.items()
+                if key.startswith(prefix) and self._alive(expires_at)
+            }
+
+    def acquire_lease(self, key: str, owner: str, ttl: float, replace: str = None) -> bool:
+        """Lease holen oder verlängern - True wenn 'owner' sie jetzt hält (replace: Besitzer, der beendet ist)"""
+        with self.lock:
+            current, expires_at = self.leases.get(key, (None, 0))
+            if current not in (None, owner, replace) and expires_at > time.time():
+                return False
+            self.leases[key] = (owner, time.time() + ttl)
+            return True
+
+    def release_lease(self, key: str, owner: str):
+        with self.lock:
+            if self.leases.get(key, (None, 0))[0] == owner:
+                del self.leases[key]
+
+
+class _Connections:
+    """Liefert dem DBExecutor SQLAlchemy-Verbindungen statt sillyorm-Environments"""
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    def get_environment(self, autocommit: bool = True):
+        return self.engine.connect()
+
+
+class SQLStateStore:
+    """
+    Geteilter State Store in einer SQL-Datenbank (SQLite-Datei oder PostgreSQL)
+
+    Alle Worker-Prozesse sehen dieselbe Tabelle 'shared_state'. Leases werden
+    über ein bedingtes UPDATE (Besitzer gleich oder abgelaufen) vergeben, damit
+    genau ein Prozess die Runden-Uhr einer Lobby besitzt.
+
+    Jeder Aufruf läuft wie die DB-Aufrufe des DatabaseService über einen
+    DBExecutor in einem nativen Thread (eigene Verbindungen, STATE_STORE_POOL_SIZE)
+    - der Eventlet-Hub wartet nie auf die Datenbank.
+    """
+
+    shared = True
+
+    def __init__(self, url: str):
+        connect_args = {'check_same_thread': False} if url.startswith('sqlite') else {}
+        self.engine = sqlalchemy.create_engine(url, connect_args=connect_args)
+        self.metadata = sqlalchemy.MetaData()
+        self.table = sqlalchemy.Table(
+            "shared_state", self.metadata,
+            sqlalchemy.Column("key", sqlalchemy.String(200), primary_key=True),
+            sqlalchemy.Column("value", sqlalchemy.Text),
+            sqlalchemy.Column("owner", sqlalchemy.String(200)),
+            sqlalchemy.Column("expires_at", sqlalchemy.Float),
+        )
+        self.metadata.create_all(self.engine)
+        self.executor = DBExecutor(_Connections(self.engine), size=int(os.environ.get('STATE_STORE_POOL_SIZE', 2)))
+
+    def _insert_or_update(self, conn, key: str, values: dict):
+        t = self.table
+        updated = conn.execute(sqlalchemy.update(t).where(t.c.key == key).values(**values)).rowcount
+        if not updated:
+            conn.execute(sqlalchemy.insert(t).values(key=key, **values))
+
+    def incr(self, key: str) -> int:
+        return self.executor.run(self._incr, key)
+
+    def _incr(self, conn, key: str) -> int:
+        t = self.table
+        with conn.begin():
+            updated = conn.execute(
+                sqlalchemy.update(t).where(t.c.key == key).values(
+                    value=sqlalchemy.cast(sqlalchemy.cast(t.c.value, sqlalchemy.Integer) + 1, sqlalchemy.Text)
+                )
+            ).rowcount
+            if not updated:
+                conn.execute(sqlalchemy.insert(t).values(key=key, value="1"))
+            return int(conn.execute(sqlalchemy.select(t.c.value).where(t.c.key == key)).scalar())
+
+    def put(self, key: str, value: dict, ttl: float = None):
+        self.executor.run(self._put, key, json.dumps(value), time.time() + ttl if ttl else None)
+
+    def _put(self, conn, key: str, value: str, expires_at: Optional[float]):
+        with conn.begin():
+            self._insert_or_update(conn, key, {"value": value, "expires_at": expires_at})
+
+    def get(self, key: str) -> Optional[dict]:
+        row = self.executor.run(self._get, key)
+        if not row or (row.expires_at is not None and row.expires_at <= time.time()):
+            return None
+        return json.loads(row.value)
+
+    def _get(self, conn, key: str):
+        t = self.table
+        with conn.begin():
+            return conn.execute(
+                sqlalchemy.select(t.c.value, t.c.expires_at).where(t.c.key == key)
+            ).first()
+
+    def delete(self, key: str):
+        self.executor.run(self._delete, key)
+
+    def _delete(self, conn, key: str):
+        with conn.begin():
+            conn.execute(sqlalchemy.delete(self.table).where(self.table.c.key == key))
+
+    def scan(self, prefix: str) -> Dict[str, dict]:
+        rows = self.executor.run(self._scan, prefix, time.time())
+        return {row.key: json.loads(row.value) for row in rows}
+
+    def _scan(self, conn, prefix: str, now: float) -> list:
+        t = self.table
+        with conn.begin():
+            return conn.execute(
+                sqlalchemy.select(t.c.key, t.c.value).where(
+                    t.c.key.startswith(prefix, autoescape=True),
+                    sqlalchemy.or_(t.c.expires_at.is_(None), t.c.expires_at > now)
+                )
+            ).all()
+
+    def acquire_lease(self, key: str, owner: str, ttl: float, replace: str = None) -> bool:
+        """Lease holen oder verlängern - True wenn 'owner' sie jetzt hält (replace: Besitzer, der beendet ist)"""
+        try:
+            return self.executor.run(self._acquire_lease, f"lease:{key}", owner, ttl, replace)
+        except sqlalchemy.exc.IntegrityError:
+            return False  # Ein anderer Prozess war schneller
+
+    def _acquire_lease(self, conn, key: str, owner: str, ttl: float, replace: Optional[str]) -> bool:
+        t = self.table
+        now = time.time()
+        owners = [owner] if replace is None else [owner, replace]
+        with conn.begin():
+            updated = conn.execute(
+                sqlalchemy.update(t).where(
+                    t.c.key == key,
+                    sqlalchemy.or_(t.c.owner.in_(owners), t.c.expires_at <= now)
+                ).values(owner=owner, expires_at=now + ttl)
+            ).rowcount
+            if updated:
+                return True
+            exists = conn.execute(sqlalchemy.select(t.c.key).where(t.c.key == key)).first()
+            if exists:
+                return False
+            conn.execute(sqlalchemy.insert(t).values(key=key, owner=owner, expires_at=now + ttl))
+            return True
+
+    def release_lease(self, key: str, owner: str):
+        self.executor.run(self._release_lease, f"lease:{key}", owner)
+
+    def _release_lease(self, conn, key: str, owner: str):
+        t = self.table
+        with conn.begin():
+            conn.execute(sqlalchemy.delete(t).where(t.c.key == key, t.c.owner == owner))
+
+    def close(self):
+        self.executor.close()
+
+
+def create_state_store(url: str = None):
+    """
+    State Store anhand von STATE_STORE_URL erstellen
+
+    - nicht gesetzt / 'memory://': prozess-lokal (ein Worker)
+    - SQLAlchemy-URL (z.B. 'sqlite:///shared_state.db', 'postgresql://...'): geteilt
+    """
+    url = url if url is not None else os.environ.get('STATE_STORE_URL', 'memory://')
+    if not url or url == 'memory://':
+        return MemoryStateStore()
+    logger.info(f"🔗 Verwende geteilten State Store: {url.split('@')[-1]}")
+    return SQLStateStore(url)
@@ -0,0 +1,154 @@
+import os
+import re
+import gzip
+import hashlib
+import logging
+import mimetypes
+from typing import Dict, Optional, Tuple
+from flask import Response
+
+try:
+    import brotli  # optional: pip install brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'no-cache'
+
+# Bereits komprimierte Formate nicht nochmal komprimieren
+SKIP_COMPRESSION = {'.png', '.jpg', '.jpeg', '.gif', '.webp', '.mp3', '.ogg', '.woff', '.woff2'}
+TEXT_TYPES = {'.html', '.css', '.js'}
+
+# Verweise wie "/wahlplakatgame/js/main.js" in HTML, CSS und JS
+REFERENCE = re.compile(r'''(["'(])/wahlplakatgame/([^"'()?#\s]+)''')
+
+
+class Asset:
+    """Vorbereitete Frontend-Datei (roh + vorkomprimiert, komplett im Speicher)"""
+
+    __slots__ = ('path', 'hashed_path', 'content_type', 'digest', 'body', 'gzip', 'br')
+
+    def __init__(self, path: str, body: bytes):
+        self.path = path
+        self.body = body
+        self.digest = hashlib.sha256(body).hexdigest()[:12]
+        root, ext = os.path.splitext(path)
+        self.hashed_path = f"{root}.{self.digest}{ext}"
+        self.content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        if self.content_type.startswith('text/') or self.content_type == 'application/javascript':
+            self.content_type += '; charset=utf-8'
+
+        self.gzip = None
+        self.br = None
+        if ext.lower() not in SKIP_COMPRESSION:
+            self.gzip = self._keep_if_smaller(gzip.compress(body, 9, mtime=0))
+            if brotli is not None:
+                self.br = self._keep_if_smaller(brotli.compress(body, quality=11))
+
+    def _keep_if_smaller(self, compressed: bytes) -> Optional[bytes]:
+        # Nur behalten, wenn es sich lohnt (mind. 10% kleiner)
+        return compressed if len(compressed) < len(self.body) * 0.9 else None
+
+
+class StaticAssets:
+    """
+    Asset-Pipeline für das Frontend
+
+    Beim Start werden alle Dateien aus css/, js/ und assets/ gelesen, mit einem
+    Inhalts-Hash im Namen versehen (style.css -> style.<hash>.css) und mit gzip
+    (und brotli, falls installiert) vorkomprimiert. Verweise in CSS/JS und in
+    index.html werden auf die gehashten Namen umgeschrieben, die dann für immer
+    gecacht werden dürfen. Die ungehashten Namen funktionieren weiter (mit ETag).
+    """
+
+    DIRS = ('assets', 'css', 'js')
+
+    def __init__(self, frontend_dir: str):
+        self.frontend_dir = frontend_dir
+        self.assets: Dict[str, Asset] = {}  # logischer Pfad -> Asset
+        self.hashed: Dict[str, Asset] = {}  # gehashter Pfad -> Asset
+        self.index: Optional[Asset] = None
+
+    def _read(self, path: str) -> bytes:
+        with open(os.path.join(self.frontend_dir, path), 'rb') as file:
+            return file.read()
+
+    def _rewrite(self, body: bytes) -> bytes:
+        """Verweise auf bekannte Dateien durch die gehashten Namen ersetzen"""
+        def _replace(match):
+            asset = self.assets.get(match.group(2))
+            if asset is None:
+                return match.group(0)
+            return f"{match.group(1)}/wahlplakatgame/{asset.hashed_path}"
+
+        return REFERENCE.sub(_replace, body.decode('utf-8')).encode('utf-8')
+
+    def _add(self, path: str, body: bytes):
+        asset = Asset(path, body)
+        self.assets[path] = asset
+        self.hashed[asset.hashed_path] = asset
+
+    def build(self) -> 'StaticAssets':
+        """Alle Frontend-Dateien einlesen, hashen, umschreiben und komprimieren"""
+        files = []
+        for directory in self.DIRS:
+            for root, _, names in os.walk(os.path.join(self.frontend_dir, directory)):
+                for name in sorted(names):
+                    full = os.path.join(root, name)
+                    files.append(os.path.relpath(full, self.frontend_dir).replace(os.sep, '/'))
+
+        # Erst Binärdateien, dann CSS/JS (können auf Binärdateien verweisen), zuletzt index.html
+        text_files = [f for f in files if os.path.splitext(f)[1] in TEXT_TYPES]
+        for path in files:
+            if path not in text_files:
+                self._add(path, self._read(path))
+        for path in text_files:
+            self._add(path, self._rewrite(self._read(path)))
+
+        self.index = Asset('index.html', self._rewrite(self._read('index.html')))
+
+        raw = sum(len(a.body) for a in self.assets.values())
+        logger.info(f"📦 {len(self.assets)} Frontend-Dateien vorbereitet ({raw / 1024:.0f} KB, "
+                    f"brotli: {'ja' if brotli else 'nein'})")
+        return self
+
+    def get(self, path: str) -> Tuple[Optional[Asset], bool]:
+        """
+        Asset per gehashtem oder logischem Pfad
+
+        Returns:
+            (asset oder None, immutable) - nur gehashte Pfade dürfen für immer gecacht werden
+        """
+        asset = self.hashed.get(path)
+        if asset is not None:
+            return asset, True
+        return self.assets.get(path), False
+
+    def respond(self, asset: Asset, request, immutable: bool = False) -> Response:
+        """Response mit Encoding-Aushandlung, ETag/304 und Range-Support (nur unkomprimiert)"""
+        accepted = request.accept_encodings
+        body, encoding = asset.body, None
+        if asset.br is not None and accepted['br']:
+            body, encoding = asset.br, 'br'
+        elif asset.gzip is not None and accepted['gzip']:
+            body, encoding = asset.gzip, 'gzip'
+
+        response = Response(body, content_type=asset.content_type)
+        response.set_etag(f"{asset.digest}-{encoding}" if encoding else asset.digest)
+        response.headers['Cache-Control'] = IMMUTABLE if immutable else REVALIDATE
+        if asset.gzip is not None or asset.br is not None:
+            response.headers['Vary'] = 'Accept-Encoding'
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+
+        return response.make_conditional(request, accept_ranges=encoding is None, complete_length=len(body))
+
+    def get_stats(self) -> dict:
+        return {
+            'files': len(self.assets),
+            'bytes': sum(len(a.body) for a in self.assets.values()),
+            'gzip_bytes': sum(len(a.gzip or a.body) for a in self.assets.values()),
+            'brotli': brotli is not None
+        }
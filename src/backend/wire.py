@@ -0,0 +1,116 @@
+import logging
+from typing import Dict, List, Optional
+from metrics import metrics
+
+try:
+    import msgpack  # optional: pip install msgpack
+except ImportError:
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+JSON = 'json'
+MSGPACK = 'msgpack'
+
+# Große und häufige Events gehen an binäre Clients als MessagePack-Attachment.
+# Kleine Events bleiben JSON: Der Platzhalter-Header eines Binär-Events
+# (~45 Bytes) frisst die Ersparnis dort wieder auf.
+BINARY_EVENTS = {'round_end', 'lobby_batch', 'player_list_delta', 'player_list_snapshot', 'round_results_page',
+                 'join_success'}
+
+
+def available_formats() -> List[str]:
+    return [MSGPACK, JSON] if msgpack is not None else [JSON]
+
+
+def pack(payload) -> bytes:
+    return msgpack.packb(payload, use_bin_type=True)
+
+
+class WireFormat:
+    """
+    Pro Client ausgehandeltes Nachrichtenformat (JSON oder MessagePack)
+
+    Der Client bietet bei join_game seine Formate an ('wire': ['msgpack', 'json']),
+    der Server nimmt das erste, das er kann. Socket.IO selbst bleibt beim
+    Standard-Protokoll - binäre Clients bekommen die großen Events nur mit einem
+    MessagePack-kodierten bytes-Argument statt eines JSON-Objekts.
+
+    Für Broadcasts an eine Lobby sind die Spieler zusätzlich in einem Raum pro
+    Format (lobby-1:json, lobby-1:msgpack), damit jeder Payload nur einmal pro
+    Format kodiert wird.
+    """
+
+    def __init__(self, socketio):
+        self.socketio = socketio
+        self.formats: Dict[str, str] = {}  # sid -> format (nur Abweichungen von JSON)
+        self.binary_members: Dict[str, int] = {}  # lobby-raum -> anzahl msgpack clients
+        self.joined: Dict[str, str] = {}  # sid -> format, mit dem sie den Räumen beigetreten ist
+
+    def negotiate(self, sid: str, offered: Optional[list]) -> str:
+        """Erstes vom Client angebotenes Format, das der Server unterstützt"""
+        supported = available_formats()
+        chosen = JSON
+        for fmt in offered or []:
+            if fmt in supported:
+                chosen = fmt
+                break
+        if chosen == JSON:
+            self.formats.pop(sid, None)
+        else:
+            self.formats[sid] = chosen
+        return chosen
+
+    def format_of(self, sid: str) -> str:
+        return self.formats.get(sid, JSON)
+
+    def forget(self, sid: str):
+        self.formats.pop(sid, None)
+
+    @staticmethod
+    def room(room: str, fmt: str) -> str:
+        return f"{room}:{fmt}"
+
+    def enter(self, sid: str, room: str):
+        """sid in den Lobby-Raum und den passenden Format-Raum aufnehmen"""
+        fmt = self.joined[sid] = self.format_of(sid)
+        self.socketio.server.enter_room(sid, room, namespace='/')
+        self.socketio.server.enter_room(sid, self.room(room, fmt), namespace='/')
+        if fmt != JSON:
+            self.binary_members[room] = self.binary_members.get(room, 0) + 1
+
+    def leave(self, sid: str, room: str):
+        # Format vom Beitritt - forget() kann schon vorher gelaufen sein
+        fmt = self.joined.pop(sid, self.format_of(sid))
+        self.socketio.server.leave_room(sid, room, namespace='/')
+        self.socketio.server.leave_room(sid, self.room(room, fmt), namespace='/')
+        if fmt != JSON:
+            remaining = self.binary_members.get(room, 0) - 1
+            if remaining > 0:
+                self.binary_members[room] = remaining
+            else:
+                self.binary_members.pop(room, None)
+
+    def emit_to_sid(self, event: str, payload: dict, sid: str):
+        fmt = self.format_of(sid)
+        if fmt == MSGPACK and event in BINARY_EVENTS:
+            payload = pack(payload)
+        metrics.inc('wire_emits_total', format=fmt)
+        self.socketio.emit(event, payload, room=sid)
+
+    def emit_to_room(self, event: str, payload: dict, room: str):
+        # Ohne binäre Clients in der Lobby: ein normales Emit, nichts doppelt kodieren
+        if event not in BINARY_EVENTS or not self.binary_members.get(room):
+            metrics.inc('wire_emits_total', format=JSON)
+            self.socketio.emit(event, payload, room=room)
+            return
+        metrics.inc('wire_emits_total', format=JSON)
+        self.socketio.emit(event, payload, room=self.room(room, JSON))
+        metrics.inc('wire_emits_total', format=MSGPACK)
+        self.socketio.emit(event, pack(payload), room=self.room(room, MSGPACK))
+
+    def get_stats(self) -> dict:
+        return {
+            'available': available_formats(),
+            'msgpack_clients': sum(1 for fmt in self.formats.values() if fmt == MSGPACK)
+        }
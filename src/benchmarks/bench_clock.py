@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Spieluhr mit eventlet.spawn_after (Standard) vs. TimerWheel (GAME_CLOCK=wheel)
+
+Misst pro Variante:
+    - Planen + Abbrechen in µs pro Timer (z.B. Broadcast-Tick, vorzeitiges Rundenende)
+    - Verspätung beim Auslösen (p50/p99/max), wenn viele Timer gleichzeitig warten
+    - Greenlets, die dafür angelegt werden
+    - mit --lobbies: Dauerbetrieb, jede Lobby plant wie der LobbyBroadcaster nach
+      jedem Tick den nächsten (BROADCAST_TICK_MS) - Verspätung und CPU pro Sekunde
+
+Verwendung:
+    python bench_clock.py [--timers 1000 10000] [--spread 2.0]
+    python bench_clock.py --lobbies 100 500 1000 2000 [--duration 5]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+
+import eventlet  # noqa: E402
+from clock import EventletClock, TimerWheel  # noqa: E402
+
+
+def schedule_cancel(schedule, timers: int) -> float:
+    """µs pro Timer für Planen und sofortiges Abbrechen"""
+    start = time.perf_counter()
+    handles = [schedule(1.0 + i % 100, int) for i in range(timers)]
+    for handle in handles:
+        handle.cancel()
+    return (time.perf_counter() - start) / timers * 1e6
+
+
+def lateness(schedule, timers: int, spread: float) -> list:
+    """Viele Timer über spread Sekunden verteilt auslösen -> Verspätungen in Sekunden"""
+    samples = []
+
+    def fire(deadline):
+        samples.append(max(0.0, time.monotonic() - deadline))
+
+    for i in range(timers):
+        delay = spread * i / timers
+        schedule(delay, fire, time.monotonic() + delay)
+    while len(samples) < timers:
+        eventlet.sleep(0.05)
+    return samples
+
+
+def steady(schedule, lobbies: int, tick: float, duration: float) -> tuple:
+    """Jede Lobby plant nach dem Auslösen den nächsten Tick -> (Verspätungen, CPU-Anteil)"""
+    samples = []
+    stop = time.monotonic() + duration
+
+    def fire(deadline):
+        now = time.monotonic()
+        samples.append(max(0.0, now - deadline))
+        if now < stop:
+            schedule(tick, fire, now + tick)
+
+    for i in range(lobbies):
+        delay = tick * i / lobbies  # Lobbies gleichmäßig über den Tick verteilt
+        schedule(delay, fire, time.monotonic() + delay)
+    cpu = time.process_time()
+    eventlet.sleep(duration + tick * 2)
+    return samples, (time.process_time() - cpu) / duration
+
+
+def summary(samples: list) -> str:
+    ordered = sorted(samples)
+    p50 = ordered[len(ordered) // 2] * 1000
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000
+    return f"{p50:>7.2f} {p99:>7.2f} {ordered[-1] * 1000:>7.2f}"
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="spawn_after vs. TimerWheel")
+    parser.add_argument('--timers', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--spread', type=float, default=2.0, help="Sekunden, über die die Fristen verteilt sind")
+    parser.add_argument('--lobbies', type=int, nargs='+', help="Dauerbetrieb mit so vielen Lobbies messen")
+    parser.add_argument('--duration', type=float, default=5.0, help="Sekunden pro Messung im Dauerbetrieb")
+    args = parser.parse_args()
+
+    clock = EventletClock()
+    wheel = TimerWheel()
+    variants = [('spawn_after', clock.schedule), (f"TimerWheel ({wheel.tick * 1000:g} ms)", wheel.schedule)]
+
+    if args.lobbies:
+        tick = float(os.environ.get('BROADCAST_TICK_MS', 100)) / 1000.0
+        print(f"{'Variante':<22} {'Lobbies':>7} {'Timer/s':>8} {'Verspätung ms p50/p99/max':>26} {'CPU %':>6}")
+        for lobbies in args.lobbies:
+            for name, schedule in variants:
+                samples, cpu = steady(schedule, lobbies, tick, args.duration)
+                print(f"{name:<22} {lobbies:>7} {lobbies / tick:>8.0f} {summary(samples):>26} {cpu * 100:>6.1f}")
+        return
+
+    print(f"{'Variante':<22} {'Timer':>7} {'Planen+Abbrechen µs':>20} {'Verspätung ms p50/p99/max':>26} {'Greenlets':>10}")
+    for timers in args.timers:
+        for name, schedule in variants:
+            cost = schedule_cancel(schedule, timers)
+            samples = lateness(schedule, timers, args.spread)
+            greenlets = timers if schedule == clock.schedule else 1
+            print(f"{name:<22} {timers:>7} {cost:>20.2f} {summary(samples):>26} {greenlets:>10}")
+
+    stats = wheel.get_stats()
+    print(f"\nTimerWheel: max. Drift {stats['max_drift_ms']} ms, {stats['cancelled']} abgebrochen, {stats['fired']} ausgelöst")
+
+
+if __name__ == "__main__":
+    main()
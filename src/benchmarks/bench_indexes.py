@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Lookup-Latenz mit und ohne die Indizes aus migrations.py
+
+Legt in einem temporären Verzeichnis eine SQLite-Datenbank mit vielen Usern und
+Wahlsprüchen an, misst die heißen Abfragen ohne Indizes, wendet dann die
+Migrationen an und misst erneut.
+
+Verwendung:
+    python bench_indexes.py [user] [wahlsprüche]
+"""
+
+import os
+import sys
+import time
+import random
+import shutil
+import tempfile
+import statistics
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+
+import sqlalchemy  # noqa: E402
+import migrations  # noqa: E402
+from database import DatabaseService  # noqa: E402
+
+LOOKUPS = 300
+
+
+def seed(db: DatabaseService, users: int, sprueche: int):
+    user_table = db.registry.metadata.tables["user"]
+    spruch_table = db.registry.metadata.tables["wahlspruch"]
+    now = datetime.now()
+    with db.registry.engine.begin() as conn:
+        conn.execute(sqlalchemy.insert(user_table), [
+            {"nickname": f"spieler{i}", "password": "x", "points": random.randint(0, 5000),
+             "session_token": f"token-{i}", "registered_at": now}
+            for i in range(users)
+        ])
+        conn.execute(sqlalchemy.insert(spruch_table), [
+            {"spruch": f"Wahlspruch Nummer {i} für ein besseres Land", "partei": "SPD"}
+            for i in range(sprueche)
+        ])
+
+
+def drop_indexes(db: DatabaseService):
+    with db.registry.engine.begin() as conn:
+        for name in migrations.MANAGED_INDEXES:
+            conn.execute(sqlalchemy.text(f"DROP INDEX IF EXISTS {name}"))
+        conn.execute(sqlalchemy.text(f"DELETE FROM {migrations.MIGRATIONS_TABLE}"))
+
+
+def measure(func, keys) -> dict:
+    samples = []
+    for key in keys:
+        start = time.perf_counter()
+        func(key)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        'median_ms': statistics.median(samples),
+        'p95_ms': samples[int(len(samples) * 0.95) - 1]
+    }
+
+
+def run_queries(db: DatabaseService, users: int, sprueche: int) -> dict:
+    user_table = db.registry.metadata.tables["user"]
+    spruch_table = db.registry.metadata.tables["wahlspruch"]
+    user_keys = [random.randrange(users) for _ in range(LOOKUPS)]
+    spruch_keys = [random.randrange(sprueche) for _ in range(LOOKUPS)]
+
+    def by_spruch(i):
+        stmt = sqlalchemy.select(spruch_table.c.id).where(
+            spruch_table.c.spruch == f"Wahlspruch Nummer {i} für ein besseres Land")
+        with db.registry.engine.connect() as conn:
+            conn.execute(stmt).all()
+
+    def top_points(_):
+        stmt = sqlalchemy.select(user_table.c.id).order_by(user_table.c.points.desc()).limit(10)
+        with db.registry.engine.connect() as conn:
+            conn.execute(stmt).all()
+
+    return {
+        'nickname': measure(lambda i: db.get_user_by_nickname(f"spieler{i}"), user_keys),
+        'session_token': measure(lambda i: db.get_user_by_session_token(f"token-{i}"), user_keys),
+        'spruch': measure(by_spruch, spruch_keys),
+        'top10 points': measure(top_points, user_keys[:50]),
+    }
+
+
+def main():
+    """Main function"""
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    sprueche = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+
+    # Nie gegen die echte Datenbank laufen
+    os.environ.pop('DATABASE_URL', None)
+    workdir = tempfile.mkdtemp(prefix='wpg-bench-')
+    os.chdir(workdir)
+
+    db = DatabaseService()
+    print(f"📊 Seede {users} User und {sprueche} Wahlsprüche in {workdir} ...")
+    seed(db, users, sprueche)
+
+    drop_indexes(db)
+    before = run_queries(db, users, sprueche)
+
+    start = time.perf_counter()
+    migrations.migrate(db.registry)
+    migrate_time = time.perf_counter() - start
+    after = run_queries(db, users, sprueche)
+
+    print(f"\nMigrationen angewendet in {migrate_time:.2f}s\n")
+    print(f"{'Abfrage':<15} {'ohne Index (median/p95 ms)':>28} {'mit Index (median/p95 ms)':>28} {'Faktor':>8}")
+    for name in before:
+        b, a = before[name], after[name]
+        print(f"{name:<15} {b['median_ms']:>16.3f} / {b['p95_ms']:>8.3f} "
+              f"{a['median_ms']:>16.3f} / {a['p95_ms']:>8.3f} {b['median_ms'] / a['median_ms']:>7.1f}x")
+
+    db.executor.close()
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Antworten pro Sekunde in einer Lobby
+
+Baut einen echten GameService mit Socket.IO Räumen (nur das Schreiben auf den
+Socket entfällt), startet eine Runde und lässt jeden Spieler in einem eigenen
+Greenlet antworten - wie die Socket.IO Handler im Betrieb. Gemessen wird die
+Zeit von der ersten Antwort, bis der Lobby-Loop die letzte verarbeitet hat und
+die Runde damit komplett ist.
+
+Verwendung:
+    python bench_lobby_throughput.py [--players 100 1000 5000] [--concurrency 200] [--repeat 5]
+"""
+
+import eventlet
+eventlet.monkey_patch()  # wie app.py: Locks und Queues kooperativ
+
+import os  # noqa: E402
+import sys  # noqa: E402
+import time  # noqa: E402
+import shutil  # noqa: E402
+import argparse  # noqa: E402
+import tempfile  # noqa: E402
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import bench_suite  # noqa: E402  (setzt auch den Backend-Pfad)
+from flask import Flask  # noqa: E402
+from flask_socketio import SocketIO  # noqa: E402
+from game import GameService  # noqa: E402
+
+
+def build_service(db, players: int):
+    socketio = SocketIO(Flask(__name__), async_mode='eventlet')
+    socketio.server._send_eio_packet = lambda eio_sid, pkt: None
+    service = GameService(db, socketio, max_players_per_lobby=players)
+    with service.lock:
+        lobby = service._open_lobby()
+    for i in range(players):
+        sid = socketio.server.manager.connect(f"eio-{i}", '/')
+        token = f"token-{i}"
+        lobby.add_player(token, i + 1, f"spieler{i}", sid, 0)
+        service.token_to_lobby[token] = lobby.lobby_id
+        service.token_to_sid[token] = sid
+        service.sid_to_token[sid] = token
+        service.wire.enter(sid, lobby.room)
+    lobby.members = players
+    lobby.publish_snapshot()
+    return service, lobby
+
+
+def run(db, players: int, concurrency: int) -> float:
+    """Antworten pro Sekunde für eine Runde"""
+    service, lobby = build_service(db, players)
+    sids = {token: player['sid'] for token, player in lobby.players.items()}
+    service._start_round(lobby)
+    lobby.round_timer.cancel()
+
+    done = []
+    end_current_round = service.end_current_round
+
+    def end_and_stop(lobby):
+        done.append(time.perf_counter())  # letzte Antwort verarbeitet, Runde komplett
+        end_current_round(lobby)
+        if lobby.intermission_timer is not None:
+            lobby.intermission_timer.cancel()
+
+    service.end_current_round = end_and_stop
+
+    def answer(i):
+        eventlet.sleep(0)  # Socket lesen gibt im Betrieb ebenfalls ab
+        token = f"token-{i}"
+        service.submit_answer(token, bench_suite.PARTEIEN[i % len(bench_suite.PARTEIEN)], sids[token])
+
+    pool = eventlet.GreenPool(concurrency)
+    start = time.perf_counter()
+    for i in range(players):
+        pool.spawn_n(answer, i)
+    pool.waitall()
+    while not done:
+        eventlet.sleep(0.0005)
+    elapsed = done[0] - start
+    lobby.post('close')  # beendet den Lobby-Loop, bricht Timer ab
+    return players / elapsed
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Antworten pro Sekunde pro Lobby")
+    parser.add_argument('--players', type=int, nargs='+', default=[100, 1000, 5000])
+    parser.add_argument('--concurrency', type=int, default=200, help="gleichzeitige Handler-Greenlets")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    os.environ.pop('DATABASE_URL', None)
+    workdir = tempfile.mkdtemp(prefix='wpg-bench-')
+    os.chdir(workdir)
+    db = bench_suite.DatabaseService()
+    bench_suite.seed(db, 200)
+    db.get_random_wahlspruch()
+
+    try:
+        print(f"{'Spieler':>8} {'Antworten/s (bester Lauf)':>27} {'Median':>10}")
+        for players in args.players:
+            rates = sorted(run(db, players, args.concurrency) for _ in range(args.repeat))
+            print(f"{players:>8} {rates[-1]:>27,.0f} {rates[len(rates) // 2]:>10,.0f}")
+    finally:
+        db.flush_user_points()  # wartet auf einen noch laufenden Flush aus end_current_round
+        db.executor.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Rundenende-Erkennung in GameLobby
+
+Simuliert Lobbies mit tausenden Spielern und misst pro Antwort die Zeit für
+submit_answer + Rundenende-Prüfung. Zum Vergleich wird die frühere Variante
+(Liste aller antwortberechtigten Spieler bauen und scannen) mitgemessen.
+
+Verwendung:
+    python bench_round_completion.py [spieler ...]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+
+from corpus import WahlspruchEntry  # noqa: E402
+from game import GameLobby  # noqa: E402
+
+
+class BenchDatabaseService:
+    """Minimaler DB-Service ohne echte Datenbank (nur für die Lobby-Mechanik)"""
+
+    def get_random_wahlspruch(self):
+        return WahlspruchEntry(1, "Benchmark-Spruch", "SPD")
+
+    def queue_user_points(self, changes):
+        pass
+
+
+def legacy_all_answered(lobby: GameLobby) -> bool:
+    """Frühere O(N) Prüfung aus GameService.submit_answer"""
+    players_who_can_answer = [p for p in lobby.players.values() if p['can_answer']]
+    return all(p['answered'] for p in players_who_can_answer) and len(players_who_can_answer) > 0
+
+
+def build_lobby(player_count: int) -> GameLobby:
+    lobby = GameLobby(BenchDatabaseService(), lambda lobby: None)
+    for i in range(player_count):
+        lobby.add_player(f"token-{i}", i, f"spieler{i}", f"sid-{i}", 0)
+    lobby.start_new_round()
+    lobby.round_timer.cancel()
+    return lobby
+
+
+def bench(player_count: int) -> dict:
+    # Neue Variante: Zähler im Lock
+    lobby = build_lobby(player_count)
+    start = time.perf_counter()
+    completed = 0
+    for i in range(player_count):
+        _, _, _, round_complete = lobby.submit_answer(f"token-{i}", "SPD")
+        completed += round_complete
+    counter_time = time.perf_counter() - start
+    assert completed == 1, "Rundenende muss genau einmal erkannt werden"
+
+    # Alte Variante: nach jeder Antwort alle Spieler scannen
+    lobby = build_lobby(player_count)
+    start = time.perf_counter()
+    completed = 0
+    for i in range(player_count):
+        lobby.submit_answer(f"token-{i}", "SPD")
+        completed += legacy_all_answered(lobby)
+    scan_time = time.perf_counter() - start
+    assert completed == 1
+
+    return {
+        'players': player_count,
+        'counter_us_per_answer': counter_time / player_count * 1e6,
+        'scan_us_per_answer': scan_time / player_count * 1e6,
+    }
+
+
+def main():
+    """Main function"""
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100, 1000, 5000, 10000]
+
+    print(f"{'Spieler':>8} {'Zähler µs/Antwort':>20} {'Scan µs/Antwort':>18} {'Faktor':>8}")
+    for size in sizes:
+        result = bench(size)
+        factor = result['scan_us_per_answer'] / result['counter_us_per_answer']
+        print(f"{result['players']:>8} {result['counter_us_per_answer']:>20.2f} "
+              f"{result['scan_us_per_answer']:>18.2f} {factor:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Runden-Ledger und Auswertungs-API
+
+Misst, was das Runden-Ledger am Rundenende kostet (eine Zeile anhängen +
+Aggregate nachführen) und wie schnell die Auswertung danach abgefragt werden
+kann - einmal aus den Aggregaten (wie die API) und zum Vergleich durch
+Einlesen des kompletten Ledgers, wie man es ohne Aggregate machen müsste.
+
+Verwendung:
+    python bench_round_history.py [--rounds 1000 10000] [--players 50] [--quotes 2000]
+"""
+
+import os
+import sys
+import time
+import random
+import shutil
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+
+from round_history import RoundHistory  # noqa: E402
+
+PARTEIEN = ['SPD', 'CDU', 'FDP', 'Grüne', 'Linke', 'AfD']
+
+
+def make_round(rng: random.Random, players: int, quotes: int) -> dict:
+    partei = PARTEIEN[rng.randrange(len(PARTEIEN))]
+    answers = [
+        (user_id, partei if rng.random() < 0.4 else rng.choice(PARTEIEN), rng.randrange(500, 15000))
+        for user_id in range(1, players + 1) if rng.random() < 0.9
+    ]
+    return {'wahlspruch_id': rng.randrange(1, quotes + 1), 'partei': partei,
+            'eligible': players, 'answers': answers}
+
+
+def read_api(history: RoundHistory, calls: int = 200) -> float:
+    """ms pro Abfrage von Übersicht + schwerste Wahlsprüche"""
+    start = time.perf_counter()
+    for _ in range(calls):
+        history.summary()
+        history.quote_ranking('hardest', 20, 5)
+    return (time.perf_counter() - start) * 1000 / calls
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Runden-Ledger: Kosten pro Runde und Abfrage")
+    parser.add_argument('--rounds', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--players', type=int, default=50, help="Spieler pro Runde")
+    parser.add_argument('--quotes', type=int, default=2000, help="Anzahl Wahlsprüche")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='wpg-bench-')
+    rng = random.Random(42)
+    try:
+        print(f"{'Runden':>7} {'record µs/Runde':>16} {'API ms':>8} {'Scan ms':>9} {'Ledger KB':>10}")
+        for rounds in args.rounds:
+            path = os.path.join(workdir, f"history-{rounds}.log")
+            history = RoundHistory(path)
+            batch = [make_round(rng, args.players, args.quotes) for _ in range(rounds)]
+
+            start = time.perf_counter()
+            for i, round_data in enumerate(batch):
+                history.record(1, i + 1, round_data)
+            history.flush()
+            record_us = (time.perf_counter() - start) * 1e6 / rounds
+
+            api_ms = read_api(history)
+
+            # Ohne Aggregate: komplettes Ledger lesen und auswerten
+            start = time.perf_counter()
+            scanned = RoundHistory(path)
+            scanned.load()
+            scanned.summary()
+            scanned.quote_ranking('hardest', 20, 5)
+            scan_ms = (time.perf_counter() - start) * 1000
+            assert scanned.summary() == history.summary()
+
+            size = os.path.getsize(path) / 1024
+            print(f"{rounds:>7} {record_us:>16.1f} {api_ms:>8.3f} {scan_ms:>9.1f} {size:>10.0f}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Kaltstart vs. Warmstart aus dem Checkpoint
+
+Misst die Zeit vom Start bis Korpus und Leaderboard bereit sind, und danach bis
+alle Spieler per join_game (validate_token) wieder angemeldet sind - plus die
+Anzahl DB-Aufrufe dafür. Kalt wird alles aus der DB geladen und jeder Token
+einzeln geprüft, warm kommt alles aus Snapshot + Log.
+
+Verwendung:
+    python bench_warm_start.py [--users 1000 10000] [--reconnects 1000]
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import bench_suite  # noqa: E402  (setzt auch den Backend-Pfad)
+from auth import AuthService  # noqa: E402
+from checkpoint import Checkpoint  # noqa: E402
+from corpus import WahlspruchCorpus  # noqa: E402
+from leaderboard import LeaderboardIndex  # noqa: E402
+
+
+def count_db_calls(db) -> list:
+    """DB-Aufrufe über den Thread-Pool zählen -> [anzahl]"""
+    calls = [0]
+    run = db.executor.run
+
+    def counting_run(*args, **kwargs):
+        calls[0] += 1
+        return run(*args, **kwargs)
+
+    db.executor.run = counting_run
+    return calls
+
+
+def boot(db, reconnects: int, checkpoint_path: str = None) -> tuple:
+    """Start wie in app.py -> (start_ms, reconnect_ms, db_aufrufe, auth_service)"""
+    db.corpus = WahlspruchCorpus(db)
+    db.leaderboard = LeaderboardIndex(db)
+    calls = count_db_calls(db)
+
+    start = time.perf_counter()
+    checkpoint = None
+    if checkpoint_path:
+        checkpoint = Checkpoint(checkpoint_path)
+        checkpoint.load()
+        checkpoint.register('corpus', db.corpus)
+        checkpoint.register('leaderboard', db.leaderboard)
+    db.warm_caches()
+    auth_service = AuthService(db, checkpoint=checkpoint)
+    started = time.perf_counter()
+
+    for i in range(reconnects):
+        assert auth_service.validate_token(f"token-{i}")['valid']
+    done = time.perf_counter()
+
+    del db.executor.run
+    return (started - start) * 1000, (done - started) * 1000, calls[0], auth_service
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Kaltstart vs. Warmstart aus dem Checkpoint")
+    parser.add_argument('--users', type=int, nargs='+', default=[1000, 10000], help="User und Wahlsprüche")
+    parser.add_argument('--reconnects', type=int, default=1000, help="Spieler, die sich nach dem Start wieder anmelden")
+    args = parser.parse_args()
+
+    os.environ.pop('DATABASE_URL', None)
+    workdir = tempfile.mkdtemp(prefix='wpg-bench-')
+    os.chdir(workdir)
+    db = bench_suite.DatabaseService()
+    checkpoint_path = os.path.join(workdir, 'checkpoint')
+
+    try:
+        print(f"{'User':>7} {'Variante':<10} {'Start ms':>10} {'Reconnects ms':>14} {'DB-Aufrufe':>11} {'Snapshot KB':>12}")
+        for users in args.users:
+            bench_suite.seed(db, users)
+            reconnects = min(args.reconnects, users)
+
+            cold = boot(db, reconnects)
+            # Stand des laufenden Servers sichern (wie beim SIGTERM)
+            checkpoint = Checkpoint(checkpoint_path)
+            checkpoint.register('corpus', db.corpus)
+            checkpoint.register('leaderboard', db.leaderboard)
+            checkpoint.register('auth', cold[3])
+            checkpoint.write_snapshot()
+            size = checkpoint.last_snapshot_bytes / 1024
+
+            warm = boot(db, reconnects, checkpoint_path)
+            for name, (start_ms, reconnect_ms, calls, _) in (('kalt', cold), ('warm', warm)):
+                print(f"{users:>7} {name:<10} {start_ms:>10.1f} {reconnect_ms:>14.1f} {calls:>11} {size:>12.0f}")
+    finally:
+        db.executor.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Benchmark: JSON vs. MessagePack als Socket.IO Nachrichtenformat
+
+Spielt eine komplette Runde in einer echten GameLobby durch (alle Spieler
+antworten, Events gebündelt wie im LobbyBroadcaster) und kodiert jedes
+ausgehende Event so, wie python-socketio es auf den Draht legt. Verglichen werden:
+
+    - Bytes pro Runde über alle Empfänger (inkl. WebSocket-Frame-Header)
+    - CPU pro Emit (Kodieren eines Events, einmal pro Broadcast)
+
+Verwendung:
+    python bench_wire.py [spieler ...]
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import bench_suite  # noqa: E402  (setzt auch den Backend-Pfad)
+from socketio import packet  # noqa: E402
+from wire import BINARY_EVENTS, JSON, MSGPACK, msgpack, pack  # noqa: E402
+
+TICKS_PER_ROUND = 100  # 10 Sekunden Antworten bei BROADCAST_TICK_MS=100
+
+
+def ws_frame(length: int) -> int:
+    """Bytes eines WebSocket-Frames vom Server (ohne Maske)"""
+    if length < 126:
+        return length + 2
+    if length < 65536:
+        return length + 4
+    return length + 10
+
+
+def encode(event: str, payload: dict, fmt: str) -> list:
+    """Event wie python-socketio kodieren -> Liste der gesendeten Frames"""
+    if fmt == MSGPACK and event in BINARY_EVENTS:
+        payload = pack(payload)
+    encoded = packet.Packet(packet.EVENT, data=[event, payload]).encode()
+    if isinstance(encoded, list):
+        # Text-Header mit Platzhalter + ein Binär-Frame pro Attachment
+        return ['4' + encoded[0]] + encoded[1:]
+    return ['4' + encoded]  # Engine.IO Nachrichtentyp 'message'
+
+
+def wire_bytes(frames: list) -> int:
+    return sum(ws_frame(len(f.encode('utf-8') if isinstance(f, str) else f)) for f in frames)
+
+
+def play_round(db, players: int):
+    """
+    Eine Runde durchspielen
+
+    Returns:
+        (broadcasts, direct) - Listen von (event, payload); broadcasts gehen an
+        alle Spieler der Lobby, direct an je einen Spieler
+    """
+    lobby = bench_suite.build_lobby(db, players)
+    lobby.start_new_round()
+    lobby.round_timer.cancel()
+    broadcasts = [('player_list_delta', {'deltas': lobby.drain_deltas()})]
+    direct = []
+
+    per_tick = max(1, players // TICKS_PER_ROUND)
+    for first in range(0, players, per_tick):
+        events = []
+        for i in range(first, min(players, first + per_tick)):
+            _, _, nickname, _ = lobby.submit_answer(f"token-{i}", bench_suite.PARTEIEN[i % 6])
+            direct.append(('answer_accepted', {'partei': bench_suite.PARTEIEN[i % 6]}))
+            events.append(['player_answered', {'nickname': nickname}])
+        events.append(['player_list_delta', {'deltas': lobby.drain_deltas()}])
+        broadcasts.append(('lobby_batch', {'events': events}))
+
+    result = lobby.end_round()
+    broadcasts.append(('round_end', result['shared']))
+    direct.extend(('round_result', own) for own in result['personal'].values())
+    broadcasts.append(('player_list_delta', {'deltas': lobby.drain_deltas()}))
+    direct.append(('player_list_snapshot', lobby.get_player_list_snapshot()))
+    direct.append(('round_results_page', lobby.get_round_results(0)))
+    return broadcasts, direct
+
+
+def bytes_per_round(broadcasts: list, direct: list, players: int, fmt: str) -> int:
+    total = sum(wire_bytes(encode(event, payload, fmt)) * players for event, payload in broadcasts)
+    return total + sum(wire_bytes(encode(event, payload, fmt)) for event, payload in direct)
+
+
+def per_emit(events: list, fmt: str, repeat: int = 20) -> dict:
+    """Pro Event-Typ: (beste Kodier-Zeit in µs, mittlere Bytes) über dieselben Payloads"""
+    stats = {}
+    for event in sorted({event for event, _ in events}):
+        payloads = [payload for name, payload in events if name == event][:200]
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for payload in payloads:
+                encode(event, payload, fmt)
+            best = min(best, (time.perf_counter() - start) / len(payloads))
+        size = sum(wire_bytes(encode(event, payload, fmt)) for payload in payloads) / len(payloads)
+        stats[event] = (best * 1e6, size)
+    return stats
+
+
+def main():
+    """Main function"""
+    if msgpack is None:
+        print("❌ msgpack ist nicht installiert (pip install msgpack)")
+        sys.exit(1)
+
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10, 100, 1000]
+
+    os.environ.pop('DATABASE_URL', None)
+    workdir = tempfile.mkdtemp(prefix='wpg-bench-')
+    os.chdir(workdir)
+    db = bench_suite.DatabaseService()
+    bench_suite.seed(db, 1000)
+
+    try:
+        print(f"{'Spieler':>8} {'JSON KB/Runde':>15} {'MsgPack KB/Runde':>17} {'Ersparnis':>10}")
+        rounds = {}
+        for players in sizes:
+            broadcasts, direct = play_round(db, players)
+            rounds[players] = broadcasts + direct
+            json_bytes = bytes_per_round(broadcasts, direct, players, JSON)
+            mp_bytes = bytes_per_round(broadcasts, direct, players, MSGPACK)
+            print(f"{players:>8} {json_bytes / 1024:>15.1f} {mp_bytes / 1024:>17.1f} {1 - mp_bytes / json_bytes:>9.0%}")
+
+        largest = max(sizes)
+        json_stats = per_emit(rounds[largest], JSON)
+        mp_stats = per_emit(rounds[largest], MSGPACK)
+        print(f"\nPro Emit bei {largest} Spielern (Kodieren einmal pro Broadcast, Mittel der Bytes)")
+        print(f"{'Event':<22} {'JSON µs':>10} {'MsgPack µs':>11} {'JSON Bytes':>12} {'MsgPack Bytes':>14}")
+        for event, (json_us, json_size) in json_stats.items():
+            mp_us, mp_size = mp_stats[event]
+            print(f"{event:<22} {json_us:>10.1f} {mp_us:>11.1f} {json_size:>12.0f} {mp_size:>14.0f}")
+    finally:
+        db.executor.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Lasttest: simuliert viele Spieler gegen einen lokal laufenden Server
+
+Registriert N synthetische Accounts über /api/auth, verbindet jeden per
+Socket.IO, tritt mit join_game bei und beantwortet jede Runde nach einer
+zufälligen Verzögerung. Gemessen werden:
+
+    - join_latency:        join_game -> join_success
+    - answer_latency:      submit_answer -> answer_accepted
+    - round_end_skew:      Abstand zwischen erstem und letztem Empfang von round_end pro Lobby-Runde
+    - new_round_skew:      dasselbe für new_round
+    - intermission_delay:  round_end -> nächstes new_round, minus der geplanten 5 Sekunden
+
+Nur für localhost gedacht. Abhängigkeiten: pip install -r requirements-loadtest.txt
+
+Verwendung:
+    python loadtest.py --players 500 --duration 120 --answer-delay uniform:1,10 --report report.json
+"""
+
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import statistics
+from collections import defaultdict
+from urllib.parse import urlparse
+
+import aiohttp
+import socketio
+
+BASE = '/wahlplakatgame'
+INTERMISSION = 5.0  # GameService.end_current_round -> auto_start_next_round
+LOCAL_HOSTS = {'127.0.0.1', 'localhost', '::1'}
+
+
+def parse_delay(spec: str):
+    """
+    Verteilung der Antwortzeit (Sekunden nach new_round)
+
+    fixed:2 | uniform:1,10 | normal:5,2 | exp:3 (Mittelwert)
+    """
+    kind, _, params = spec.partition(':')
+    values = [float(v) for v in params.split(',') if v]
+    if kind == 'fixed':
+        return lambda: values[0]
+    if kind == 'uniform':
+        return lambda: random.uniform(values[0], values[1])
+    if kind == 'normal':
+        return lambda: max(0.0, random.gauss(values[0], values[1]))
+    if kind == 'exp':
+        return lambda: random.expovariate(1.0 / values[0])
+    raise ValueError(f"Unbekannte Verteilung: {spec}")
+
+
+def summarize(samples: list) -> dict:
+    """Kennzahlen einer Messreihe in Millisekunden"""
+    if not samples:
+        return {'count': 0}
+    ordered = sorted(samples)
+
+    def pct(p):
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p))] * 1000
+
+    return {
+        'count': len(ordered),
+        'mean_ms': round(statistics.fmean(ordered) * 1000, 2),
+        'p50_ms': round(pct(0.50), 2),
+        'p90_ms': round(pct(0.90), 2),
+        'p99_ms': round(pct(0.99), 2),
+        'max_ms': round(ordered[-1] * 1000, 2)
+    }
+
+
+class LoadTest:
+    def __init__(self, args):
+        self.args = args
+        self.delay = parse_delay(args.answer_delay)
+        self.parteien = []
+        self.stop_at = None
+
+        # Messwerte
+        self.join_latency = []
+        self.answer_latency = []
+        self.round_end_received = defaultdict(list)  # (lobby_id, round_number) -> [t, ...]
+        self.new_round_received = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.counts = defaultdict(int)
+
+    # ==================== HTTP ====================
+
+    async def _post(self, http, path, payload):
+        for attempt in range(12):
+            async with http.post(f"{self.args.url}{BASE}{path}", json=payload) as response:
+                data = await response.json(content_type=None)
+                if response.status != 503:
+                    return data
+            # Server ausgelastet (Passwort-Hashing) -> mit Backoff und Jitter erneut versuchen
+            self.counts['http_503'] += 1
+            await asyncio.sleep(random.uniform(0.5, 1.0) * min(8.0, 0.2 * 2 ** attempt))
+        return data
+
+    async def login(self, http, index: int):
+        nickname = f"{self.args.prefix}{index}"[:18]
+        credentials = {'nickname': nickname, 'password': self.args.password}
+        await self._post(http, '/api/auth/register', credentials)
+        result = await self._post(http, '/api/auth/login', credentials)
+        if not result.get('success'):
+            self.errors['login'] += 1
+            return None
+        self.counts['logged_in'] += 1
+        return result['token']
+
+    # ==================== SPIELER ====================
+
+    async def player(self, http, index: int):
+        token = await self.login(http, index)
+        if token is None:
+            return
+
+        client = socketio.AsyncClient(reconnection=False)
+        state = {'lobby_id': None, 'round': None, 'joined': asyncio.Event(), 'answer_sent': None,
+                 'catch_up': None, 'round_open': False}
+
+        async def answer(round_number):
+            await asyncio.sleep(self.delay())
+            if not state['round_open'] or state['round'] != round_number or time.monotonic() > self.stop_at:
+                return
+            if random.random() > self.args.answer_rate:
+                return
+            state['answer_sent'] = time.perf_counter()
+            await client.emit('submit_answer', {'token': token, 'partei': random.choice(self.parteien)})
+
+        def on_new_round(data):
+            now = time.perf_counter()
+            state['round'] = data.get('round_number')
+            # Nachgereichte Runde nach Beitritt mitten in der Runde: weder Fan-out noch Antwort
+            if state['round'] == state['catch_up']:
+                return
+            state['round_open'] = True
+            self.new_round_received[(state['lobby_id'], state['round'])].append(now)
+            asyncio.ensure_future(answer(state['round']))
+
+        def on_round_end(data):
+            state['round_open'] = False
+            self.round_end_received[(state['lobby_id'], state['round'])].append(time.perf_counter())
+
+        @client.on('join_success')
+        def on_join_success(data):
+            state['lobby_id'] = data.get('lobby_id')
+            if data.get('round_active'):
+                state['catch_up'] = data.get('round_number')
+            self.join_latency.append(time.perf_counter() - state['join_sent'])
+            state['joined'].set()
+
+        @client.on('new_round')
+        def _new_round(data):
+            on_new_round(data)
+
+        @client.on('round_end')
+        def _round_end(data):
+            on_round_end(data)
+
+        @client.on('lobby_batch')
+        def on_lobby_batch(data):
+            for event, payload in data.get('events', []):
+                if event == 'new_round':
+                    on_new_round(payload)
+                elif event == 'round_end':
+                    on_round_end(payload)
+
+        @client.on('answer_accepted')
+        def on_answer_accepted(data):
+            if state['answer_sent'] is not None:
+                self.answer_latency.append(time.perf_counter() - state['answer_sent'])
+                state['answer_sent'] = None
+
+        @client.on('error')
+        def on_error(data):
+            self.errors[f"server: {data.get('message', '?')}"] += 1
+
+        try:
+            await client.connect(self.args.url, socketio_path=f"{BASE}/socket.io", transports=['websocket'])
+            self.counts['connected'] += 1
+            state['join_sent'] = time.perf_counter()
+            await client.emit('join_game', {'token': token})
+            await asyncio.wait_for(state['joined'].wait(), timeout=30)
+            self.counts['joined'] += 1
+            await asyncio.sleep(max(0.0, self.stop_at - time.monotonic()))
+        except asyncio.TimeoutError:
+            self.errors['join_timeout'] += 1
+        except Exception as e:
+            self.errors[f"connect: {type(e).__name__}"] += 1
+        finally:
+            if client.connected:
+                await client.disconnect()
+
+    # ==================== ABLAUF ====================
+
+    async def run(self) -> dict:
+        connector = aiohttp.TCPConnector(limit=self.args.http_concurrency)
+        async with aiohttp.ClientSession(connector=connector) as http:
+            async with http.get(f"{self.args.url}{BASE}/api/game/parteien") as response:
+                self.parteien = (await response.json()).get('parteien') or ['SPD']
+
+            started = time.monotonic()
+            ramp = self.args.players / self.args.ramp if self.args.ramp > 0 else 0
+            self.stop_at = started + ramp + self.args.duration
+
+            tasks = []
+            for i in range(self.args.players):
+                tasks.append(asyncio.ensure_future(self.player(http, i)))
+                if self.args.ramp > 0:
+                    await asyncio.sleep(1.0 / self.args.ramp)
+            await asyncio.gather(*tasks)
+
+        return self.report(time.monotonic() - started)
+
+    def _skew(self, received: dict) -> list:
+        return [max(times) - min(times) for times in received.values() if len(times) > 1]
+
+    def _intermissions(self) -> list:
+        """round_end (erster Empfang) -> new_round (erster Empfang) der Folgerunde, minus Pause"""
+        delays = []
+        for (lobby_id, round_number), ends in self.round_end_received.items():
+            starts = self.new_round_received.get((lobby_id, (round_number or 0) + 1))
+            if starts:
+                delays.append(min(starts) - min(ends) - INTERMISSION)
+        return delays
+
+    def report(self, elapsed: float) -> dict:
+        return {
+            'config': {
+                'url': self.args.url,
+                'players': self.args.players,
+                'ramp_per_s': self.args.ramp,
+                'duration_s': self.args.duration,
+                'answer_delay': self.args.answer_delay,
+                'answer_rate': self.args.answer_rate
+            },
+            'elapsed_s': round(elapsed, 2),
+            'counts': dict(self.counts),
+            'rounds_observed': len(self.round_end_received),
+            'join_latency': summarize(self.join_latency),
+            'answer_latency': summarize(self.answer_latency),
+            'round_end_skew': summarize(self._skew(self.round_end_received)),
+            'new_round_skew': summarize(self._skew(self.new_round_received)),
+            'intermission_delay': summarize(self._intermissions()),
+            'errors': dict(self.errors)
+        }
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Socket.IO Lasttest für WahlplakatGame (nur localhost)")
+    parser.add_argument('--url', default='http://127.0.0.1:5001', help="Server-URL (nur localhost)")
+    parser.add_argument('--players', type=int, default=100, help="Anzahl simulierter Spieler")
+    parser.add_argument('--ramp', type=float, default=50, help="Neue Spieler pro Sekunde (0 = alle sofort)")
+    parser.add_argument('--duration', type=float, default=60, help="Sekunden nach dem Ramp-Up")
+    parser.add_argument('--answer-delay', default='uniform:1,10', help="fixed:S | uniform:A,B | normal:M,SD | exp:MEAN")
+    parser.add_argument('--answer-rate', type=float, default=0.95, help="Anteil der Runden, in denen geantwortet wird")
+    parser.add_argument('--prefix', default='lt', help="Nickname-Präfix der Testaccounts")
+    parser.add_argument('--password', default='loadtest123')
+    parser.add_argument('--http-concurrency', type=int, default=20)
+    parser.add_argument('--report', help="JSON-Report in diese Datei schreiben")
+    args = parser.parse_args()
+
+    if urlparse(args.url).hostname not in LOCAL_HOSTS:
+        print(f"❌ Lasttest nur gegen localhost erlaubt, nicht {args.url}")
+        sys.exit(1)
+
+    print(f"🚀 Starte Lasttest: {args.players} Spieler gegen {args.url}")
+    result = asyncio.run(LoadTest(args).run())
+
+    for key in ('join_latency', 'answer_latency', 'round_end_skew', 'new_round_skew', 'intermission_delay'):
+        stats = result[key]
+        if stats['count']:
+            print(f"{key:<20} n={stats['count']:<6} p50={stats['p50_ms']:>9.2f}ms "
+                  f"p99={stats['p99_ms']:>9.2f}ms max={stats['max_ms']:>9.2f}ms")
+        else:
+            print(f"{key:<20} keine Messwerte")
+    print(f"Zähler: {result['counts']}  Fehler: {result['errors']}")
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as file:
+            json.dump(result, file, indent=2)
+        print(f"📝 Report geschrieben: {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,16 @@
 const GameState = {
     hasAnswered: false,
     currentQuelle: null,
-    canAnswer: true
+    canAnswer: true,
+    resultsRound: null,     // Runde, deren Ergebnistabelle nachgeladen werden kann
+    resultsNextPage: null,
+    playersSeq: 0,          // Letzte angewendete Sequenznummer der Spielerliste
+    players: new Map(),     // key -> player
+    snapshotRequested: false,
+    leaderboard: [],        // Top-N, nach Rang sortiert
+    leaderboardVersion: 0,  // Version der Liste, Basis für leaderboard_delta
+    leaderboardRequested: false,
+    lobbyId: null           // Bisherige Lobby, beim Reconnect mitgeschickt (Übernahme durch einen anderen Worker)
 };
 
 // ==================== GAME INITIALIZATION ====================
@@ -15,6 +24,9 @@ function initGameHandlers() {
     // Source Button
     document.getElementById('source-btn').addEventListener('click', showSource);
     
+    // Results Button
+    document.getElementById('results-btn').addEventListener('click', requestRoundResults);
+    
     // Leave Button
     document.getElementById('leave-btn').addEventListener('click', leaveGame);
 }
@@ -85,24 +97,61 @@ function connectWebSocket() {
     AppState.socket.on('connected', onServerConnected);
     
     // Game events
-    AppState.socket.on('join_success', onJoinSuccess);
+    AppState.socket.on('join_success', decoded(onJoinSuccess));
     AppState.socket.on('new_round', onNewRound);
     AppState.socket.on('player_answered', onPlayerAnswered);
-    AppState.socket.on('round_end', onRoundEnd);
+    AppState.socket.on('round_end', decoded(onRoundEnd));
+    AppState.socket.on('round_result', onRoundResult);
+    AppState.socket.on('round_results_page', decoded(onRoundResultsPage));
     AppState.socket.on('player_joined', onPlayerJoined);
     AppState.socket.on('player_left', onPlayerLeft);
-    AppState.socket.on('player_list_update', onPlayerListUpdate);
+    AppState.socket.on('player_list_snapshot', decoded(onPlayerListSnapshot));
+    AppState.socket.on('player_list_delta', decoded(onPlayerListDelta));
     AppState.socket.on('answer_accepted', onAnswerAccepted);
     AppState.socket.on('leaderboard_update', onLeaderboardUpdate);
+    AppState.socket.on('leaderboard_delta', onLeaderboardDelta);
+    AppState.socket.on('lobby_batch', decoded(onLobbyBatch));
     AppState.socket.on('error', onSocketError);
 }
 
+// Große Events kommen bei ausgehandeltem MessagePack als Binär-Attachment
+function decoded(handler) {
+    return data => {
+        if (data instanceof ArrayBuffer || ArrayBuffer.isView(data)) {
+            data = MsgPack.decode(data);
+        }
+        handler(data);
+    };
+}
+
+// Gebündelte Lobby-Events (ein Paket pro Server-Tick)
+const BATCH_HANDLERS = {
+    player_answered: data => onPlayerAnswered(data),
+    player_joined: data => onPlayerJoined(data),
+    player_left: data => onPlayerLeft(data),
+    player_list_delta: data => onPlayerListDelta(data),
+    leaderboard_delta: data => onLeaderboardDelta(data)
+};
+
+function onLobbyBatch(data) {
+    for (const [event, payload] of data.events) {
+        const handler = BATCH_HANDLERS[event];
+        if (handler) {
+            handler(payload);
+        } else {
+            console.warn('Unbekanntes Event im Batch:', event);
+        }
+    }
+}
+
 function onSocketConnect() {
     console.log('✅ WebSocket verbunden');
     
     // Join game
     AppState.socket.emit('join_game', {
-        token: AppState.sessionToken
+        token: AppState.sessionToken,
+        wire: MsgPack.supported ? ['msgpack', 'json'] : ['json'],
+        lobby_id: GameState.lobbyId
     });
 }
 
@@ -119,14 +168,15 @@ function onServerConnected(data) {
 // ==================== GAME EVENTS ====================
 
 function onJoinSuccess(data) {
-    console.log('🎉 Lobby beigetreten', data);
-    addGameMessage('✅ Erfolgreich der Lobby beigetreten!', 'success');
+    console.log(`🎉 Lobby beigetreten (Format: ${data.wire || 'json'})`, data);
+    addGameMessage(`✅ Erfolgreich Lobby #${data.lobby_id} beigetreten!`, 'success');
+    GameState.lobbyId = data.lobby_id;
     
     // Update player list
-    updatePlayerList(data.players);
+    applyPlayerSnapshot(data.players_seq, data.players);
     
     // Request leaderboard
-    AppState.socket.emit('request_leaderboard');
+    requestLeaderboard();
 }
 
 function onNewRound(data) {
@@ -139,6 +189,7 @@ function onNewRound(data) {
     // Enable answer button
     document.getElementById('answer-btn').disabled = false;
     document.getElementById('source-btn').disabled = true;
+    document.getElementById('results-btn').disabled = true;
     
     // Add messages
     addGameMessage('\n' + '='.repeat(60), 'round-start');
@@ -149,6 +200,9 @@ function onNewRound(data) {
 }
 
 function onPlayerAnswered(data) {
+    if (data.nickname === AppState.userInfo.nickname) {
+        return;  // Eigene Antwort kommt über answer_accepted
+    }
     console.log('✓ Spieler hat geantwortet', data);
     addGameMessage(`✓ ${data.nickname} hat geantwortet`, 'info');
 }
@@ -157,35 +211,86 @@ function onRoundEnd(data) {
     console.log('🏁 Runde beendet', data);
     
     GameState.currentQuelle = data.quelle;
+    GameState.resultsRound = data.round_number;
+    GameState.resultsNextPage = 0;
     
     addGameMessage('\n' + '='.repeat(60), 'round-end');
     addGameMessage('🏁 RUNDENENDE', 'round-end');
     addGameMessage('='.repeat(60) + '\n', 'round-end');
     addGameMessage(`Richtige Antwort: ${data.correct_partei}\n`, 'success');
     
-    // Check own result
-    let myResult = null;
-    for (const result of data.results) {
-        if (result.nickname === AppState.userInfo.nickname) {
-            myResult = result;
-            break;
-        }
+    // Antwortverteilung
+    addGameMessage(`${data.correct} von ${data.answered} Antworten richtig (${data.players} Spieler)`, 'info');
+    const distribution = Object.entries(data.distribution).sort((a, b) => b[1] - a[1]);
+    for (const [partei, count] of distribution) {
+        const marker = partei === data.correct_partei ? '✓' : ' ';
+        addGameMessage(`  ${marker} ${partei}: ${count}`, partei === data.correct_partei ? 'success' : 'info');
     }
     
-    // Play sound for own answer
-    if (myResult) {
-        if (myResult.correct === true) {
-            playSound('correct');
-        } else if (myResult.correct === false) {
-            playSound('incorrect');
+    // Punktgewinner der Runde
+    if (data.movers.length > 0) {
+        addGameMessage('\nPunkte in dieser Runde:', 'info');
+        for (const mover of data.movers) {
+            addGameMessage(`  ✓ ${mover.nickname} [+${mover.points_earned}] (Gesamt: ${mover.total_points})`, 'success');
         }
     }
     
-    // Show results
+    addGameMessage('\n⏳ Nächste Runde in 5 Sekunden...\n', 'info');
+    
+    // Enable source button if available
+    if (GameState.currentQuelle) {
+        document.getElementById('source-btn').disabled = false;
+    }
+    
+    const resultsBtn = document.getElementById('results-btn');
+    resultsBtn.textContent = 'Alle Ergebnisse';
+    resultsBtn.disabled = false;
+}
+
+// Eigenes Ergebnis der Runde (kommt direkt nach round_end nur an diesen Client)
+function onRoundResult(result) {
+    if (!result.could_answer) {
+        addGameMessage('Du bist während der Runde beigetreten.', 'info');
+    } else if (result.correct) {
+        addGameMessage(`✓ Du: ${result.answered} [+${result.points_earned} Punkt] (Gesamt: ${result.total_points})`, 'success');
+        playSound('correct');
+    } else if (result.answered) {
+        addGameMessage(`✗ Du: ${result.answered} (Gesamt: ${result.total_points})`, 'error');
+        playSound('incorrect');
+    } else {
+        addGameMessage('Du hast nicht geantwortet.', 'info');
+    }
+    
+    // Update own points
+    AppState.userInfo.points = result.total_points;
+    updateUserInfo();
+}
+
+// Vollständige Ergebnistabelle seitenweise (nur auf Anfrage)
+function requestRoundResults() {
+    if (!AppState.socket || GameState.resultsNextPage === null) {
+        return;
+    }
+    document.getElementById('results-btn').disabled = true;
+    AppState.socket.emit('request_round_results', {page: GameState.resultsNextPage});
+}
+
+function onRoundResultsPage(data) {
+    const resultsBtn = document.getElementById('results-btn');
+    
+    if (data.round_number !== GameState.resultsRound) {
+        resultsBtn.disabled = true;
+        return;  // Inzwischen ist eine neuere Runde beendet
+    }
+    
+    const from = data.page * data.page_size + 1;
+    const to = data.page * data.page_size + data.results.length;
+    addGameMessage(`\n📋 Ergebnisse Runde #${data.round_number} (${from}-${to} von ${data.total})`, 'info');
+    
     for (const result of data.results) {
         if (!result.could_answer) {
             addGameMessage(`  ${result.nickname}: (während Runde beigetreten)`, 'info');
-        } else if (result.correct === null) {
+        } else if (!result.answered) {
             addGameMessage(`  ${result.nickname}: Keine Antwort`, 'info');
         } else if (result.correct) {
             addGameMessage(`  ✓ ${result.nickname}: ${result.answered} [+${result.points_earned} Punkt] (Gesamt: ${result.total_points})`, 'success');
@@ -194,21 +299,20 @@ function onRoundEnd(data) {
         }
     }
     
-    addGameMessage('\n⏳ Nächste Runde in 5 Sekunden...\n', 'info');
-    
-    // Update own points
-    if (myResult) {
-        AppState.userInfo.points = myResult.total_points;
-        updateUserInfo();
-    }
-    
-    // Enable source button if available
-    if (GameState.currentQuelle) {
-        document.getElementById('source-btn').disabled = false;
+    if (to < data.total) {
+        GameState.resultsNextPage = data.page + 1;
+        resultsBtn.textContent = 'Weitere Ergebnisse';
+        resultsBtn.disabled = false;
+    } else {
+        GameState.resultsNextPage = null;
+        resultsBtn.disabled = true;
     }
 }
 
 function onPlayerJoined(data) {
+    if (data.nickname === AppState.userInfo.nickname) {
+        return;
+    }
     console.log('👋 Spieler beigetreten', data);
     addGameMessage(`👋 ${data.nickname} ist beigetreten`, 'warning');
     playSound('join');
@@ -226,8 +330,80 @@ function onPlayerLeft(data) {
     playSound('leave');
 }
 
-function onPlayerListUpdate(data) {
-    updatePlayerList(data.players);
+// ==================== PLAYER LIST (SNAPSHOT + DELTAS) ====================
+
+function applyPlayerSnapshot(seq, players) {
+    GameState.players = new Map(players.map(p => [p.key, p]));
+    GameState.playersSeq = seq;
+    GameState.snapshotRequested = false;
+    updatePlayerList(Array.from(GameState.players.values()));
+}
+
+function requestPlayerSnapshot() {
+    if (GameState.snapshotRequested || !AppState.socket) {
+        return;
+    }
+    GameState.snapshotRequested = true;
+    AppState.socket.emit('request_player_list');
+}
+
+function applyPlayerDelta(delta) {
+    const players = GameState.players;
+    
+    switch (delta.op) {
+        case 'add':
+            players.set(delta.player.key, delta.player);
+            break;
+        case 'remove':
+            players.delete(delta.key);
+            break;
+        case 'answered':
+            if (players.has(delta.key)) {
+                players.get(delta.key).answered = true;
+            }
+            break;
+        case 'round_reset':
+            players.forEach(p => {
+                p.answered = false;
+                p.can_answer = true;
+            });
+            break;
+        case 'points':
+            for (const [key, points] of Object.entries(delta.points)) {
+                const player = players.get(Number(key));
+                if (player) {
+                    player.points = points;
+                }
+            }
+            break;
+    }
+}
+
+function onPlayerListSnapshot(data) {
+    applyPlayerSnapshot(data.seq, data.players);
+}
+
+function onPlayerListDelta(data) {
+    let changed = false;
+    
+    for (const delta of data.deltas) {
+        if (delta.seq <= GameState.playersSeq) {
+            continue;  // Bereits im Snapshot enthalten
+        }
+        if (delta.seq !== GameState.playersSeq + 1) {
+            // Lücke erkannt -> frischen Snapshot anfordern
+            console.warn(`⚠️ Spielerliste: Lücke (erwartet ${GameState.playersSeq + 1}, bekommen ${delta.seq})`);
+            requestPlayerSnapshot();
+            return;
+        }
+        applyPlayerDelta(delta);
+        GameState.playersSeq = delta.seq;
+        changed = true;
+    }
+    
+    if (changed) {
+        updatePlayerList(Array.from(GameState.players.values()));
+    }
 }
 
 function onAnswerAccepted(data) {
@@ -240,8 +416,40 @@ function onAnswerAccepted(data) {
     playSound('lock');
 }
 
+// ==================== LEADERBOARD (SNAPSHOT + DELTAS) ====================
+
+function requestLeaderboard() {
+    if (GameState.leaderboardRequested || !AppState.socket) {
+        return;
+    }
+    GameState.leaderboardRequested = true;
+    AppState.socket.emit('request_leaderboard');
+}
+
 function onLeaderboardUpdate(data) {
-    updateLeaderboard(data.leaderboard);
+    GameState.leaderboard = data.leaderboard;
+    GameState.leaderboardVersion = data.version;
+    GameState.leaderboardRequested = false;
+    updateLeaderboard(GameState.leaderboard);
+}
+
+function onLeaderboardDelta(data) {
+    if (data.version <= GameState.leaderboardVersion) {
+        return;  // Bereits in der vollen Liste enthalten
+    }
+    if (data.version !== GameState.leaderboardVersion + 1) {
+        // Lücke erkannt -> volle Liste anfordern
+        requestLeaderboard();
+        return;
+    }
+    
+    const leaderboard = GameState.leaderboard.filter(entry => !data.removed.includes(entry.rank));
+    for (const entry of data.changed) {
+        leaderboard[entry.rank - 1] = entry;
+    }
+    GameState.leaderboard = leaderboard;
+    GameState.leaderboardVersion = data.version;
+    updateLeaderboard(leaderboard);
 }
 
 function onSocketError(data) {
@@ -355,6 +563,7 @@ function leaveGame() {
     }
     
     addGameMessage('👋 Verlasse Spiel...', 'warning');
+    GameState.lobbyId = null;
     
     // Emit leave event
     if (AppState.socket && AppState.socket.connected) {
@@ -0,0 +1,139 @@
+"""
+Warmstart nach SIGTERM: Server mit mehreren vollen Lobbies beenden, neu starten
+und prüfen, dass alle Lobbies mit allen Spielern zurückkommen.
+
+Genug Spieler, dass die Austritte beim Trennen der Clients den Puffer des
+Checkpoint-Logs füllen würden (8 KB) - sonst fiele der Fehler nicht auf.
+
+Startet backend/app.py als eigenen Prozess (SQLite, Checkpoint im Temp-Verzeichnis).
+
+Verwendung:
+    python -m unittest discover -s tests
+"""
+
+import os
+import sys
+import time
+import json
+import signal
+import socket
+import shutil
+import tempfile
+import unittest
+import subprocess
+
+import requests
+import socketio
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend')
+BASE = '/wahlplakatgame'
+LOBBIES = 3
+LOBBY_MAX_PLAYERS = 40
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class GracefulShutdownTest(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp(prefix='wpg-test-')
+        self.port = _free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self.env = dict(
+            os.environ,
+            PYTHONPATH=BACKEND_DIR,
+            PORT=str(self.port),
+            DATABASE_URL=f"sqlite:///{os.path.join(self.workdir, 'game.db')}",
+            CHECKPOINT_PATH=os.path.join(self.workdir, 'checkpoint'),
+            ROUND_HISTORY_PATH=os.path.join(self.workdir, 'round_history.log'),
+            SCORE_JOURNAL_PATH=os.path.join(self.workdir, 'score_journal.log'),
+            LOBBY_MAX_PLAYERS=str(LOBBY_MAX_PLAYERS),
+            PASSWORD_HASH_ITERATIONS='1000'
+        )
+        subprocess.run(
+            [sys.executable, '-c',
+             "import database\n"
+             "db = database.DatabaseService()\n"
+             "for i in range(20):\n"
+             "    db.create_new_wahlspruch(f'Spruch {i}', ['SPD', 'CDU', 'FDP'][i % 3], 'Test')\n"
+             "db.executor.close()\n"],
+            env=self.env, cwd=self.workdir, check=True, capture_output=True
+        )
+        self.server = None
+        self.clients = []
+
+    def tearDown(self):
+        for client in self.clients:
+            client.disconnect()
+        if self.server and self.server.poll() is None:
+            self.server.kill()
+            self.server.wait()
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def _start_server(self):
+        with open(os.path.join(self.workdir, 'server.log'), 'ab') as log:
+            self.server = subprocess.Popen([sys.executable, os.path.join(BACKEND_DIR, 'app.py')],
+                                           env=self.env, cwd=self.workdir, stdout=log, stderr=log)
+        deadline = time.time() + 30
+        while time.time() < deadline:
+            try:
+                requests.get(f"{self.url}/health", timeout=1)
+                return
+            except requests.ConnectionError:
+                time.sleep(0.2)
+        self.fail("Server nicht gestartet")
+
+    def _token(self, nickname: str) -> str:
+        credentials = {'nickname': nickname, 'password': 'secret1'}
+        requests.post(f"{self.url}{BASE}/api/auth/register", json=credentials, timeout=10)
+        response = requests.post(f"{self.url}{BASE}/api/auth/login", json=credentials, timeout=10)
+        return response.json()['token']
+
+    def _join(self, token: str) -> dict:
+        client = socketio.Client()
+        joined = []
+        client.on('join_success', joined.append)
+        client.connect(self.url, socketio_path=f"{BASE}/socket.io", transports=['websocket'])
+        self.clients.append(client)
+        client.emit('join_game', {'token': token})
+        deadline = time.time() + 10
+        while not joined and time.time() < deadline:
+            time.sleep(0.05)
+        self.assertTrue(joined, "kein join_success")
+        return joined[0]
+
+    def test_sigterm_keeps_lobbies(self):
+        self._start_server()
+        tokens = [self._token(f"spieler{i}") for i in range(LOBBIES * LOBBY_MAX_PLAYERS)]
+        lobby_of = {token: self._join(token)['lobby_id'] for token in tokens}
+        expected = {}
+        for lobby_id in lobby_of.values():
+            expected[lobby_id] = expected.get(lobby_id, 0) + 1
+        self.assertEqual(len(expected), LOBBIES)
+
+        self.server.send_signal(signal.SIGTERM)
+        self.assertEqual(self.server.wait(timeout=30), 0)
+        self.clients = []
+
+        # Nach dem letzten Snapshot darf das Log keine Austritte mehr enthalten
+        log_path = os.path.join(self.workdir, 'checkpoint.log')
+        if os.path.exists(log_path):
+            with open(log_path, 'r', encoding='utf-8') as file:
+                events = [json.loads(line)['e'][0] for line in file if line.strip()]
+            self.assertNotIn('leave', events)
+            self.assertNotIn('close', events)
+
+        self._start_server()
+        for lobby_id, players in expected.items():
+            token = next(token for token, joined_id in lobby_of.items() if joined_id == lobby_id)
+            joined = self._join(token)
+            self.assertEqual(joined['lobby_id'], lobby_id)
+            self.assertEqual(len(joined['players']), players)
+
+
+if __name__ == '__main__':
+    unittest.main()
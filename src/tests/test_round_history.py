@@ -0,0 +1,208 @@
+"""
+Runden-Ledger: Aggregate, Nachlesen nach einem Absturz, Checkpoint, Rotation,
+Kompaktierung und Übernahme der Dateien beendeter Worker.
+
+Verwendung:
+    python -m unittest discover -s tests
+"""
+
+import os
+import sys
+import glob
+import json
+import random
+import shutil
+import socket
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+
+import round_history  # noqa: E402
+from round_history import RoundHistory  # noqa: E402
+from state_store import MemoryStateStore, SQLStateStore  # noqa: E402
+
+PARTEIEN = ['SPD', 'CDU', 'FDP']
+
+
+class RoundHistoryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp(prefix='wpg-test-')
+        self.path = os.path.join(self.workdir, 'round_history.log')
+        self.rng = random.Random(7)
+        self.rounds = 0
+        self.rotate_bytes = round_history.ROTATE_BYTES
+        self.histories = []
+
+    def tearDown(self):
+        for history in self.histories:
+            if history.file is not None:
+                history.file.close()
+        round_history.ROTATE_BYTES = self.rotate_bytes
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def _record(self, history: RoundHistory, count: int):
+        for _ in range(count):
+            partei = self.rng.choice(PARTEIEN)
+            answers = [(user_id, self.rng.choice(PARTEIEN), self.rng.randrange(500, 14000)) for user_id in range(4)]
+            history.record(1, self.rounds, {'wahlspruch_id': self.rng.randrange(1, 20), 'partei': partei,
+                                            'eligible': 5, 'answers': answers})
+            self.rounds += 1
+        history.flush()
+
+    def _files(self) -> list:
+        return sorted(os.path.basename(path) for path in glob.glob(os.path.join(self.workdir, 'round_history*')))
+
+    def _history(self, state_store=None) -> RoundHistory:
+        history = RoundHistory(self.path, state_store)
+        self.histories.append(history)
+        return history
+
+    def _reloaded(self, state_store=None) -> RoundHistory:
+        history = self._history(state_store)
+        history.load()
+        return history
+
+    # ==================== AGGREGATE ====================
+
+    def test_aggregates(self):
+        history = self._history()
+        history.record(1, 1, {'wahlspruch_id': 3, 'partei': 'SPD', 'eligible': 3,
+                              'answers': [(1, 'SPD', 1500), (2, 'CDU', 4200)]})
+        history.record(1, 2, {'wahlspruch_id': 3, 'partei': 'SPD', 'eligible': 3,
+                              'answers': [(1, 'SPD', None)]})
+        summary = history.summary()
+        self.assertEqual((summary['rounds'], summary['answers'], summary['correct'], summary['missed']), (2, 3, 2, 3))
+        spd = next(p for p in summary['parteien'] if p['partei'] == 'SPD')
+        self.assertEqual(spd['answered_as'], {'SPD': 2, 'CDU': 1})
+        quote = history.quote_stats(3)
+        self.assertEqual((quote['rounds'], quote['answers'], quote['correct']), (2, 3, 2))
+        self.assertEqual(quote['mean_answer_seconds'], 2.85)  # ohne die Antwort ohne Zeit
+        self.assertEqual(history.quote_ranking('hardest', 5, 1)[0]['wahlspruch_id'], 3)
+
+    # ==================== ABSTURZ / CHECKPOINT ====================
+
+    def test_replay_after_crash(self):
+        history = self._history()
+        self._record(history, 30)
+        # Absturz mitten in einer Zeile: die halbe Zeile zählt nicht, alles davor schon
+        with open(self.path, 'a', encoding='utf-8') as file:
+            file.write('{"t":1.0,"l":1,"r":99,"w":1')
+        reloaded = self._reloaded()
+        self.assertEqual(reloaded.summary(), history.summary())
+        self.assertEqual(reloaded.rounds, 30)
+        # Wird die Zeile doch noch fertig, zählt sie beim nächsten Einlesen genau einmal
+        with open(self.path, 'a', encoding='utf-8') as file:
+            file.write(',"p":"SPD","n":2,"a":[[1,"SPD",900]]}\n')
+        self.assertEqual(reloaded.load(), 1)
+        self.assertEqual(reloaded.rounds, 31)
+
+    def test_checkpoint_then_tail(self):
+        history = self._history()
+        self._record(history, 10)
+        state = json.loads(json.dumps(history.export_state()))
+        self._record(history, 5)
+
+        restored = self._history()
+        restored.restore_state(state, [], 0.0)
+        self.assertEqual(restored.load(), 5)  # nur der Teil nach dem Snapshot
+        self.assertEqual(restored.summary(), history.summary())
+
+    # ==================== ROTATION / KOMPAKTIERUNG ====================
+
+    def test_restarts_are_compacted(self):
+        for _ in range(4):
+            history = self._reloaded()
+            self.assertLessEqual(history.compact(), 1)
+            self.assertEqual(history.rounds, self.rounds)
+            self._record(history, 8)
+        self.assertEqual(self._files(), ['round_history.compacted.json', 'round_history.log'])
+        self.assertEqual(self._reloaded().rounds, self.rounds)
+
+    def test_rotation(self):
+        round_history.ROTATE_BYTES = 2000
+        history = self._history()
+        for _ in range(10):
+            self._record(history, 3)
+            if history._rotate():
+                self.assertEqual(history.compact(), 1)
+        self.assertLessEqual(len(self._files()), 2)
+        reloaded = self._reloaded()
+        self.assertEqual(reloaded.rounds, self.rounds)
+        self.assertEqual(reloaded.summary(), history.summary())
+
+    def test_crash_between_compaction_and_delete(self):
+        history = self._history()
+        self._record(history, 12)
+        history.file.close()
+        history.file = None
+
+        successor = self._reloaded()
+        successor._retire_previous()
+        closed = glob.glob(os.path.join(self.workdir, '*.closed.log'))[0]
+        closed_copy = os.path.join(self.workdir, 'copy')
+        shutil.copy(closed, closed_copy)
+        self.assertEqual(successor.compact(), 1)
+        # Datei wieder da, als wäre das Löschen nicht mehr passiert
+        shutil.move(closed_copy, closed)
+        self.assertEqual(self._reloaded().rounds, 12)
+
+    def test_legacy_files_without_header(self):
+        legacy = os.path.join(self.workdir, 'round_history.4242.log')
+        with open(legacy, 'w', encoding='utf-8') as file:
+            file.write('{"t":1.0,"l":1,"r":1,"w":2,"p":"SPD","n":2,"a":[[1,"SPD",900]]}\n')
+        history = self._reloaded()
+        self.assertEqual(history.rounds, 1)
+        self.assertEqual(history.compact(), 1)
+        self.assertFalse(os.path.exists(legacy))
+        self.assertEqual(self._reloaded().rounds, 1)
+
+    # ==================== MULTI-WORKER ====================
+
+    def _worker(self, state_store, worker_id: str) -> RoundHistory:
+        history = self._history(state_store)
+        history.worker_id = worker_id
+        history.use_worker_file()
+        history.load()
+        return history
+
+    def test_takeover_of_finished_worker(self):
+        store = SQLStateStore(f"sqlite:///{os.path.join(self.workdir, 'shared.db')}")
+        try:
+            host = socket.gethostname()
+            dead = self._worker(store, f"{host}:999999")  # PID läuft nicht -> Lease übernehmbar
+            self._record(dead, 6)
+            remote = self._worker(store, 'anderer-host:1')  # anderer Host, Lease noch gültig
+            self._record(remote, 4)
+            current = self._worker(store, f"{host}:{os.getpid()}")
+            self.assertEqual(current.rounds, 10)
+            self._record(current, 2)
+
+            self.assertEqual(current.compact(), 1)
+            self.assertFalse(os.path.exists(dead.path))
+            self.assertTrue(os.path.exists(remote.path))
+            self.assertTrue(os.path.exists(current.path))
+
+            # Neuer Worker sieht alles genau einmal: Aggregat-Datei + laufende Dateien
+            self.assertEqual(self._reloaded(store).rounds, 12)
+            # Ohne übernommene Lease bleibt die Datei des entfernten Workers liegen
+            self.assertEqual(current.compact(), 0)
+            self.assertTrue(os.path.exists(remote.path))
+        finally:
+            store.close()
+
+    def test_compaction_lease_is_exclusive(self):
+        store = MemoryStateStore()
+        store.acquire_lease('history-compact', 'anderer-host:1', 60)
+        history = self._reloaded(store)
+        history._retire_previous()
+        legacy = os.path.join(self.workdir, 'round_history.4242.log')
+        with open(legacy, 'w', encoding='utf-8') as file:
+            file.write('{"t":1.0,"l":1,"r":1,"w":2,"p":"SPD","n":2,"a":[]}\n')
+        self.assertEqual(history.compact(), 0)
+        self.assertTrue(os.path.exists(legacy))
+
+
+if __name__ == '__main__':
+    unittest.main()